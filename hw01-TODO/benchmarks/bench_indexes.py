@@ -0,0 +1,113 @@
+"""
+Compare query plans and timings for the list access paths with and
+without the indexes declared in ``Todo.Meta.indexes``.
+
+The table is built by the current migrations and seeded once, with the
+rows spread over ``--owners`` owners; the indexes are then dropped and
+recreated in place, so the comparison always runs on the current schema
+and index set.  The list paths run as one owner, as in a request; the
+scheduler's deadline scan runs across every owner.
+
+Usage::
+
+    python benchmarks/bench_indexes.py --rows 1000000
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import seed_todos, setup_django, time_call
+
+
+def build_cases():
+    from django.db.models import Max
+    from django.utils import timezone
+    from myapp.models import Todo
+    from myapp.pagination import encode_cursor, paginate
+
+    now = timezone.now()
+    # Build a cursor a third of the way into the dated rows (setup only).
+    middle = (
+        Todo.objects.filter(due_date__isnull=False)
+        .order_by('due_date', 'created_at', 'id')
+        .filter(due_date__gte=now)
+        .first()
+    )
+    deep_cursor = encode_cursor(middle, 'next')
+
+    return [
+        ('list: first page', lambda: paginate(Todo.objects.all(), page_size=50)),
+        ('list: deep page', lambda: paginate(Todo.objects.all(), cursor=deep_cursor, page_size=50)),
+        ('overdue count', lambda: Todo.objects.filter(is_resolved=False, due_date__lt=now).count()),
+        ('admin: resolved, newest first',
+         lambda: list(Todo.objects.filter(is_resolved=True).order_by('-created_at')[:100])),
+        ('default ordering', lambda: list(Todo.objects.all()[:100])),
+        ('freshness: MAX(updated_at)', lambda: Todo.objects.aggregate(Max('updated_at'))),
+        ('scheduler: next deadlines, every owner',
+         lambda: list(Todo.all_owners.filter(is_resolved=False, due_date__gte=now)
+                      .order_by('due_date')[:100])),
+    ]
+
+
+def run_cases(label, owner, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from myapp import sharding
+
+    print(f'\n=== {label} ===')
+    with sharding.owner_scope(owner):
+        cases = build_cases()
+    for name, func in cases:
+        with sharding.owner_scope(owner), CaptureQueriesContext(connection) as ctx:
+            func()
+        with sharding.owner_scope(owner):
+            elapsed = time_call(func, repeat)
+        print(f'\n{name}: {elapsed:.2f} ms')
+        with connection.cursor() as cursor:
+            for query in ctx.captured_queries:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                for row in cursor.fetchall():
+                    print(f'    {row[-1]}')
+
+
+def set_indexes(create):
+    """Drop (or recreate) every index in ``Todo.Meta.indexes``."""
+    from django.db import connection
+    from myapp.models import Todo
+
+    with connection.schema_editor() as editor:
+        for index in Todo._meta.indexes:
+            if create:
+                editor.add_index(Todo, index)
+            else:
+                editor.remove_index(Todo, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--owners', type=int, default=10,
+                        help="Owners the rows are spread over; the list paths run as the first.")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    owners = tuple(f'user{i}' for i in range(args.owners))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        from django.core.management import call_command
+
+        call_command('migrate', verbosity=0)
+        print(f'Seeding {args.rows} rows for {len(owners)} owners...')
+        seed_todos(args.rows, owners=owners)
+
+        set_indexes(create=False)
+        run_cases('without indexes', owners[0], args.repeat)
+
+        set_indexes(create=True)
+        run_cases('with indexes', owners[0], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
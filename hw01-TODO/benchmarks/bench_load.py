@@ -0,0 +1,276 @@
+"""
+Replay a mixed list/create/edit/toggle/delete workload against the app
+under gunicorn (WSGI) or uvicorn (ASGI) and report throughput, latency
+percentiles and error rates per operation.
+
+Every server and configuration runs against its own copy of one seeded
+database, so runs are comparable.  Configurations are switched through
+``bench_settings``:
+
+    default   myproject.settings as is
+    wal       plus the production SQLite pragmas (WAL, busy_timeout, ...)
+    nocache   with the list fragment cache disabled
+
+Each client fetches the list once for a CSRF cookie, then loops over
+operations drawn from ``--mix``.  Writes go through the same form and
+fetch endpoints the browser uses.  Edits, toggles and deletes only touch
+the client's own share of the seeded rows, so clients never race each
+other into a 404.
+
+Requires ``gunicorn`` and ``uvicorn`` (``pip install gunicorn uvicorn``);
+the load generator uses only the standard library.  It shares the
+machine with the server, so keep ``--concurrency`` modest on small hosts.
+
+Usage::
+
+    python benchmarks/bench_load.py --rows 10000 --concurrency 20 --seconds 15 \\
+        --server wsgi asgi --config default wal --workers 2
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlencode
+
+from common import SERVERS, free_port, percentile, seed_todos, setup_django, start_server
+
+CONFIGS = {
+    'default': {},
+    'wal': {'TODO_BENCH_WAL': '1'},
+    'nocache': {'TODO_BENCH_CACHE': '0'},
+}
+
+DEFAULT_MIX = 'list=70,create=10,edit=8,toggle=8,delete=4'
+
+LIST_QUERIES = ('', '?status=pending', '?sort=newest', '?q=task')
+
+# Status each operation answers with when it succeeds.
+EXPECTED_STATUS = {
+    'list': 200,
+    'create': 302,
+    'edit': 302,
+    'toggle': 200,
+    'delete': 200,
+}
+
+
+def parse_mix(value):
+    """Parse ``list=70,create=10,...`` into ``{operation: weight}``."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in EXPECTED_STATUS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f'invalid mix entry: {part!r}')
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError('the mix needs at least one non-zero weight')
+    return mix
+
+
+async def request(port, method, path, headers=None, body=b''):
+    """Issue one request on a fresh connection; return ``(status, headers)``."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f'{method} {path} HTTP/1.1', 'Host: localhost', 'Connection: close',
+             f'Content-Length: {len(body)}']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = []
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        response_headers.append((name.strip().lower(), value.strip()))
+    await reader.read()
+    writer.close()
+    return status, response_headers
+
+
+class Client:
+    """One simulated browser: a CSRF cookie and its own share of the rows."""
+
+    def __init__(self, port, rng, pks):
+        self.port = port
+        self.rng = rng
+        self.pks = pks
+        self.created = 0
+        self.csrf_token = None
+
+    async def login(self):
+        """Fetch the list page for the ``csrftoken`` cookie."""
+        _, headers = await request(self.port, 'GET', '/')
+        for name, value in headers:
+            if name == 'set-cookie':
+                cookie = SimpleCookie(value)
+                if 'csrftoken' in cookie:
+                    self.csrf_token = cookie['csrftoken'].value
+        if self.csrf_token is None:
+            raise RuntimeError('the list page set no csrftoken cookie')
+
+    def post(self, path, fields=None, accept=None):
+        headers = {
+            'Cookie': f'csrftoken={self.csrf_token}',
+            'X-CSRFToken': self.csrf_token,
+            'Content-Type': 'application/x-www-form-urlencoded',
+        }
+        if accept:
+            headers['Accept'] = accept
+        return request(self.port, 'POST', path, headers, urlencode(fields or {}).encode())
+
+    def run(self, operation):
+        """Start ``operation``; return the request coroutine."""
+        if operation == 'list' or (operation != 'create' and not self.pks):
+            return request(self.port, 'GET', '/' + self.rng.choice(LIST_QUERIES))
+        if operation == 'create':
+            self.created += 1
+            return self.post('/create/', {
+                'title': f'Load test {id(self)}-{self.created}',
+                'description': 'Created by bench_load',
+            })
+        if operation == 'edit':
+            pk = self.rng.choice(self.pks)
+            return self.post(f'/edit/{pk}/', {
+                'title': f'Edited {pk} {self.rng.random():.6f}',
+                'description': 'Edited by bench_load',
+            })
+        if operation == 'toggle':
+            return self.post(f'/toggle/{self.rng.choice(self.pks)}/', accept='application/json')
+        pk = self.pks.pop(self.rng.randrange(len(self.pks)))
+        return self.post(f'/delete/{pk}/', accept='application/json')
+
+
+async def load(port, rows, concurrency, seconds, mix, seed):
+    """Run ``concurrency`` clients for ``seconds``; return per-operation results."""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    operations, weights = zip(*mix.items())
+    clients = []
+    for index in range(concurrency):
+        rng = random.Random(seed + index)
+        pks = list(range(index + 1, rows + 1, concurrency))
+        client = Client(port, rng, pks)
+        await client.login()
+        clients.append(client)
+    deadline = time.perf_counter() + seconds
+
+    async def worker(client):
+        while time.perf_counter() < deadline:
+            operation = client.rng.choices(operations, weights)[0]
+            # A client with no rows left lists instead; the request is still
+            # reported under the operation that was drawn.
+            fallback = operation not in ('list', 'create') and not client.pks
+            expected = EXPECTED_STATUS['list' if fallback else operation]
+            start = time.perf_counter()
+            try:
+                status, _ = await asyncio.wait_for(client.run(operation), timeout=30)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = None
+            if status == expected:
+                latencies[operation].append(time.perf_counter() - start)
+            else:
+                errors[operation] += 1
+
+    await asyncio.gather(*(worker(client) for client in clients))
+    return {
+        operation: {'latencies': latencies[operation], 'errors': errors[operation]}
+        for operation in operations
+    }
+
+
+def summarize(results, seconds):
+    """Throughput, percentiles (ms) and error rate per operation and in total."""
+    everything = {
+        'latencies': [value for result in results.values() for value in result['latencies']],
+        'errors': sum(result['errors'] for result in results.values()),
+    }
+    summary = {}
+    for name, result in [*results.items(), ('total', everything)]:
+        ok, errors = len(result['latencies']), result['errors']
+        summary[name] = {
+            'requests': ok + errors,
+            'rps': round(ok / seconds, 1),
+            'p50_ms': round(percentile(result['latencies'], 0.50) * 1000, 1),
+            'p95_ms': round(percentile(result['latencies'], 0.95) * 1000, 1),
+            'p99_ms': round(percentile(result['latencies'], 0.99) * 1000, 1),
+            'error_rate': round(errors / (ok + errors), 4) if ok + errors else 0.0,
+        }
+    return summary
+
+
+def print_summary(label, summary):
+    print(f'\n{label}')
+    print(f'    {"operation":<10} {"requests":>9} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8}'
+          f' {"p99 ms":>8} {"errors":>7}')
+    for name, row in summary.items():
+        print(f'    {name:<10} {row["requests"]:>9} {row["rps"]:>8.1f} {row["p50_ms"]:>8.1f}'
+              f' {row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} {row["error_rate"]:>7.1%}')
+
+
+def prepare(db_path, rows):
+    setup_django(db_path)
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    seed_todos(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'operation weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--server', nargs='+', choices=SERVERS, default=['wsgi'])
+    parser.add_argument('--config', nargs='+', choices=CONFIGS, default=['default'])
+    parser.add_argument('--workers', type=int, default=1, help='server processes')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', type=Path, help='also write the results to this file')
+    args = parser.parse_args()
+
+    missing = [name for name in args.server
+               if importlib.util.find_spec(SERVERS[name][0]) is None]
+    if missing:
+        sys.exit(f'Missing benchmark dependencies: {", ".join(SERVERS[name][0] for name in missing)}')
+
+    report = {'rows': args.rows, 'concurrency': args.concurrency, 'seconds': args.seconds,
+              'workers': args.workers, 'threads': args.threads, 'mix': args.mix, 'runs': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = Path(tmp) / 'seeded.sqlite3'
+        print(f'Seeding {args.rows} rows...')
+        prepare(seeded, args.rows)
+        print(f'{args.concurrency} clients for {args.seconds:g}s, {args.workers} worker(s), '
+              f'mix {",".join(f"{k}={v}" for k, v in args.mix.items())}')
+
+        for kind in args.server:
+            for config in args.config:
+                db_path = Path(tmp) / f'{kind}-{config}.sqlite3'
+                shutil.copyfile(seeded, db_path)
+                port = free_port()
+                server = start_server(kind, db_path, port, args.threads, args.workers,
+                                      env=CONFIGS[config])
+                try:
+                    results = asyncio.run(load(port, args.rows, args.concurrency,
+                                               args.seconds, args.mix, args.seed))
+                finally:
+                    server.terminate()
+                    server.wait()
+                label = f'{kind} / {config}'
+                summary = summarize(results, args.seconds)
+                report['runs'][label] = summary
+                print_summary(label, summary)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + '\n')
+        print(f'\nWrote {args.json}')
+
+
+if __name__ == '__main__':
+    main()
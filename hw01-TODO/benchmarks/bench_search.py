@@ -0,0 +1,58 @@
+"""
+Compare ``LIKE '%term%'`` scans with the FTS5 search index.
+
+Usage::
+
+    python benchmarks/bench_search.py --rows 200000
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import seed_todos, setup_django, time_call
+
+TERMS = ('task 12345', 'benchmark row', 'nothing matches this')
+
+
+def build_cases(term):
+    from django.db.models import Q
+    from myapp.models import Todo
+    from myapp.search import filter_todos, rank_todos
+
+    words = term.split()
+
+    def like():
+        queryset = Todo.objects.all()
+        for word in words:
+            queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word))
+        return list(queryset[:50])
+
+    return [
+        ('LIKE scan', like),
+        ('FTS filter', lambda: list(filter_todos(Todo.objects.all(), term)[:50])),
+        ('FTS ranked', lambda: list(rank_todos(Todo.objects.all(), term)[:50])),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        from django.core.management import call_command
+
+        call_command('migrate', verbosity=0)
+        print(f'Seeding {args.rows} rows...')
+        seed_todos(args.rows)
+
+        for term in TERMS:
+            print(f'\n{term!r}')
+            for name, func in build_cases(term):
+                print(f'    {name:<12} {time_call(func, args.repeat):8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Count the queries sessions and flash messages add to each request.
+
+Runs the same request flows, as an anonymous visitor and as a logged-in
+user, under each session/message storage profile and reports the queries
+per request, how many of them touched ``django_session``, and the time.
+
+Usage::
+
+    python benchmarks/bench_sessions.py --rows 1000 --repeat 20
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from common import seed_todos, setup_django
+
+PROFILES = {
+    'database': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    },
+    'cache': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cache',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage',
+    },
+    'signed cookie': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage',
+    },
+}
+
+
+def flows():
+    """``(name, steps)``; each step is ``(method, url, data)``."""
+    from django.urls import reverse
+
+    list_url = reverse('todo_list')
+    return [
+        ('list', [('get', list_url, None)]),
+        ('create + list', [
+            ('post', reverse('todo_create'), {'title': 'Benchmark create'}),
+            ('get', list_url, None),
+        ]),
+    ]
+
+
+def run_flow(client, steps):
+    """Run ``steps`` once; return (queries, session queries, seconds)."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        for method, url, data in steps:
+            getattr(client, method)(url, data)
+        elapsed = time.perf_counter() - start
+    sessions = sum('django_session' in query['sql'] for query in ctx.captured_queries)
+    return len(ctx.captured_queries), sessions, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(
+            Path(tmp) / 'bench.sqlite3',
+            ALLOWED_HOSTS=['testserver'],
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        )
+        from django.contrib.auth.models import User
+        from django.core.management import call_command
+        from django.test import Client, override_settings
+
+        call_command('migrate', verbosity=0)
+        print(f'Seeding {args.rows} rows...')
+        # Half the rows each, so both visitors list a full page.
+        seed_todos(args.rows, owners=('', 'bench'))
+        user = User.objects.create_user('bench')
+
+        print(f'\n{"profile":<14} {"visitor":<10} {"flow":<14} '
+              f'{"queries/req":>11} {"session/req":>11} {"ms/req":>8}')
+        for profile, overrides in PROFILES.items():
+            with override_settings(**overrides):
+                for visitor in ('anonymous', 'logged in'):
+                    client = Client()
+                    if visitor == 'logged in':
+                        client.force_login(user)
+                    for name, steps in flows():
+                        run_flow(client, steps)  # warm up
+                        totals = [0, 0, 0.0]
+                        for _ in range(args.repeat):
+                            for i, value in enumerate(run_flow(client, steps)):
+                                totals[i] += value
+                        requests = args.repeat * len(steps)
+                        print(f'{profile:<14} {visitor:<10} {name:<14} '
+                              f'{totals[0] / requests:>11.2f} {totals[1] / requests:>11.2f} '
+                              f'{totals[2] * 1000 / requests:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""
+Settings for benchmark servers started in a subprocess.
+
+Reads the database path from ``TODO_BENCH_DB`` so the server never
+touches ``db.sqlite3``.
+"""
+import os
+
+from myproject.settings import *  # noqa: F401,F403
+from myproject.settings import DATABASES
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+DATABASES['default']['NAME'] = os.environ['TODO_BENCH_DB']
+
+# Configuration variants compared by bench_load.py.
+
+if os.environ.get('TODO_BENCH_WAL') == '1':
+    from myproject.sqlite_pragmas import SQLITE_PRAGMAS  # noqa: F401
+
+if os.environ.get('TODO_BENCH_CACHE') == '0':
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
@@ -0,0 +1,105 @@
+"""
+Measure throughput and lock errors with several processes sharing one
+SQLite file, with the default settings and with the production pragmas.
+
+Each worker runs a mixed workload (by default 80% list-page reads, 20%
+inserts) for a fixed duration.
+
+Usage::
+
+    python benchmarks/bench_sqlite_concurrency.py --workers 8 --seconds 10
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import PROJECT_DIR, seed_todos, setup_django
+
+
+def production_pragmas():
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    from myproject.sqlite_pragmas import SQLITE_PRAGMAS
+    return dict(SQLITE_PRAGMAS)
+
+
+def prepare(db_path, pragmas, rows):
+    setup_django(db_path, SQLITE_PRAGMAS=pragmas)
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    seed_todos(rows)
+
+
+def worker(db_path, pragmas, seconds, write_ratio, seed, results):
+    setup_django(db_path, SQLITE_PRAGMAS=pragmas)
+    from django.db import OperationalError
+    from myapp.models import Todo
+    from myapp.pagination import paginate
+
+    rng = random.Random(seed)
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                Todo.objects.create(title=f'Concurrent {seed}-{writes}')
+                writes += 1
+            else:
+                list(paginate(Todo.objects.all(), page_size=50))
+                reads += 1
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            errors += 1
+    results.put((reads, writes, errors))
+
+
+def run_profile(label, pragmas, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'bench.sqlite3'
+        setup = multiprocessing.Process(target=prepare, args=(db_path, pragmas, args.rows))
+        setup.start()
+        setup.join()
+
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(
+                target=worker,
+                args=(db_path, pragmas, args.seconds, args.write_ratio, seed, results),
+            )
+            for seed in range(args.workers)
+        ]
+        for proc in procs:
+            proc.start()
+        totals = [0, 0, 0]
+        for _ in procs:
+            for i, value in enumerate(results.get()):
+                totals[i] += value
+        for proc in procs:
+            proc.join()
+
+    reads, writes, errors = totals
+    ops = (reads + writes) / args.seconds
+    print(f'{label:<12} {ops:>10.0f} ops/s  reads={reads}  writes={writes}  locked errors={errors}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    profiles = {'default': {}, 'production': production_pragmas()}
+    print(f'{args.workers} processes, {args.seconds:g}s each, {args.write_ratio:.0%} writes')
+    for label, pragmas in profiles.items():
+        run_profile(label, pragmas, args)
+
+
+if __name__ == '__main__':
+    main()
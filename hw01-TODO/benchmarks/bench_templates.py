@@ -0,0 +1,108 @@
+"""
+Measure list rendering time and response size for large pages.
+
+Times loading the list templates with an uncached and a cached loader,
+renders the list fragment for 1k and 10k rows, then fetches the whole
+page through the test client with the fragment cache disabled.  Sizes
+are reported raw and gzipped.
+
+Usage::
+
+    python benchmarks/bench_templates.py --rows 1000 10000
+"""
+import argparse
+import gzip
+import tempfile
+from pathlib import Path
+
+from common import PROJECT_DIR, seed_todos, setup_django, time_call
+
+TEMPLATES = (
+    'myapp/base.html',
+    'myapp/todo_list.html',
+    'myapp/todo_list_items.html',
+    'myapp/todo_item.html',
+)
+
+STATIC_FILES = (
+    'myapp/css/taskflow.css',
+    'myapp/css/todo_list.css',
+    'myapp/js/taskflow.js',
+    'myapp/js/todo_list.js',
+)
+
+
+def make_engine(cached):
+    from django.template import Engine
+
+    loaders = ['django.template.loaders.app_directories.Loader']
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    return Engine(loaders=loaders, libraries={'static': 'django.templatetags.static'})
+
+
+def sizes(content):
+    return len(content) / 1024, len(gzip.compress(content)) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        largest = max(args.rows)
+        setup_django(
+            Path(tmp) / 'bench.sqlite3',
+            ALLOWED_HOSTS=['testserver'],
+            TODO_MAX_PAGE_SIZE=largest,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        )
+        from django.core.management import call_command
+        from django.template import Context
+        from django.test import Client
+        from myapp.models import Todo
+
+        call_command('migrate', verbosity=0)
+        print(f'Seeding {largest} rows...')
+        seed_todos(largest)
+
+        print('\nLoading the list page templates')
+        for name, cached in (('uncached loader', False), ('cached loader', True)):
+            engine = make_engine(cached)
+
+            def load():
+                for template_name in TEMPLATES:
+                    engine.get_template(template_name)
+
+            load()
+            print(f'    {name:<16} {time_call(load, args.repeat * 20):8.3f} ms')
+
+        engine = make_engine(cached=True)
+        template = engine.get_template('myapp/todo_list_items.html')
+        client = Client()
+        for rows in args.rows:
+            todos = list(Todo.objects.with_due_status()[:rows])
+            print(f'\n{rows} rows')
+
+            def render():
+                return template.render(Context({'todos': todos, 'page': todos}))
+
+            raw, packed = sizes(render().encode())
+            print(f'    {"list fragment":<16} {time_call(render, args.repeat):8.2f} ms'
+                  f'  {raw:8.1f} KiB ({packed:7.1f} KiB gzip)')
+
+            def fetch():
+                return client.get('/', {'page_size': rows})
+
+            raw, packed = sizes(fetch().content)
+            print(f'    {"full page":<16} {time_call(fetch, args.repeat):8.2f} ms'
+                  f'  {raw:8.1f} KiB ({packed:7.1f} KiB gzip)')
+
+    static = sum((PROJECT_DIR / 'myapp' / 'static' / name).stat().st_size for name in STATIC_FILES)
+    print(f'\nCSS/JS served once as static files and cached: {static / 1024:.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
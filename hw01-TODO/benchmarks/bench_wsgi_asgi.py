@@ -0,0 +1,125 @@
+"""
+Compare requests/sec and latency of the read endpoints under WSGI
+(gunicorn, threaded) and ASGI (uvicorn).
+
+Requires ``gunicorn`` and ``uvicorn`` (``pip install gunicorn uvicorn``).
+The load generator uses only the standard library.  ``--slow-clients``
+opens extra connections that trickle their request headers, the way
+slow mobile clients do, and hold them open for the whole run.
+
+Usage::
+
+    python benchmarks/bench_wsgi_asgi.py --rows 10000 --concurrency 50 --slow-clients 100
+"""
+import argparse
+import asyncio
+import importlib.util
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import SERVERS, free_port, percentile, seed_todos, setup_django, start_server
+
+PATHS = ('/', '/api/todos/', '/api/todos/?page_size=200')
+
+
+async def fetch(port, path):
+    """Issue one GET on a fresh connection; return the status code."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    return int(status_line.split()[1])
+
+
+async def slow_client(port, delay, stop):
+    """Hold a connection open, sending one header line every ``delay`` seconds."""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET / HTTP/1.1\r\nHost: localhost\r\n')
+        while not stop.is_set():
+            await asyncio.sleep(delay)
+            writer.write(b'X-Slow: 1\r\n')
+            await writer.drain()
+        writer.close()
+    except OSError:
+        pass
+
+
+async def load(port, concurrency, seconds, slow_clients, slow_delay):
+    stop = asyncio.Event()
+    slow = [asyncio.create_task(slow_client(port, slow_delay, stop)) for _ in range(slow_clients)]
+    await asyncio.sleep(0.5 if slow_clients else 0)
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(index):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            path = PATHS[(index + len(latencies)) % len(PATHS)]
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(fetch(port, path), timeout=30)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    stop.set()
+    await asyncio.gather(*slow)
+    return latencies, errors
+
+
+def prepare(db_path, rows):
+    setup_django(db_path)
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    seed_todos(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads')
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--slow-delay', type=float, default=1.0)
+    args = parser.parse_args()
+
+    missing = [name for name in ('gunicorn', 'uvicorn') if importlib.util.find_spec(name) is None]
+    if missing:
+        sys.exit(f'Missing benchmark dependencies: {", ".join(missing)}')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'bench.sqlite3'
+        print(f'Seeding {args.rows} rows...')
+        prepare(db_path, args.rows)
+        print(f'{args.concurrency} clients, {args.slow_clients} slow clients, {args.seconds:g}s')
+
+        for kind in SERVERS:
+            port = free_port()
+            server = start_server(kind, db_path, port, args.threads)
+            try:
+                latencies, errors = asyncio.run(
+                    load(port, args.concurrency, args.seconds, args.slow_clients, args.slow_delay)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f'{kind}: {len(latencies) / args.seconds:8.1f} req/s  '
+                f'p50 {percentile(latencies, 0.50) * 1000:7.1f} ms  '
+                f'p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  errors {errors}'
+            )
+
+
+if __name__ == '__main__':
+    main()
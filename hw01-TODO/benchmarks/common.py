@@ -0,0 +1,141 @@
+"""
+Shared helpers for the standalone benchmark scripts.
+
+Each script runs against a throwaway SQLite file, never ``db.sqlite3``.
+"""
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+SERVERS = {
+    'wsgi': ['gunicorn', 'myproject.wsgi:application', '--workers', '{workers}',
+             '--threads', '{threads}', '--bind', '127.0.0.1:{port}'],
+    'asgi': ['uvicorn', 'myproject.asgi:application', '--workers', '{workers}',
+             '--host', '127.0.0.1', '--port', '{port}', '--no-access-log'],
+}
+
+
+def setup_django(db_path, **overrides):
+    """
+    Configure Django to use ``db_path`` as the default database.
+
+    Extra keyword arguments are set on ``settings`` before setup, e.g.
+    ``SQLITE_PRAGMAS={...}``.
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    settings.DEBUG = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    import django
+    django.setup()
+
+
+def seed_todos(rows, batch_size=50000, seed=42, owners=('',)):
+    """
+    Insert ``rows`` synthetic todos with raw ``executemany`` batches.
+
+    About a third have no due date and 40% are resolved; due dates span a
+    year either side of now.  Rows are dealt round-robin to ``owners``
+    (usernames, '' for the anonymous list).  Counters are rebuilt at the
+    end.
+    """
+    from django.db import connection, transaction
+    from myapp.stats import rebuild_counters
+
+    rng = random.Random(seed)
+    now = datetime.now(dt_timezone.utc).replace(tzinfo=None)
+    year = 365 * 24 * 3600
+    sql = (
+        'INSERT INTO myapp_todo '
+        '(owner, title, description, due_date, is_resolved, created_at, updated_at) '
+        'VALUES (%s, %s, %s, %s, %s, %s, %s)'
+    )
+
+    def row(i):
+        created = now - timedelta(seconds=rng.randrange(year))
+        due = None
+        if rng.random() > 0.33:
+            due = now + timedelta(seconds=rng.randrange(-year, year))
+        return (
+            owners[i % len(owners)],
+            f'Task {i}',
+            'Benchmark row' if i % 4 else '',
+            due.isoformat(' ') if due else None,
+            rng.random() < 0.4,
+            created.isoformat(' '),
+            created.isoformat(' '),
+        )
+
+    for start in range(0, rows, batch_size):
+        stop = min(start + batch_size, rows)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, [row(i) for i in range(start, stop)])
+    for owner in owners:
+        rebuild_counters(owner)
+
+
+def time_call(func, repeat=5):
+    """Return the best wall time of ``repeat`` calls to ``func``, in ms."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def percentile(values, fraction):
+    """Percentile of ``values`` (unsorted), or NaN when there are none."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else float('nan')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, db_path, port, threads=8, workers=1, env=None):
+    """
+    Start gunicorn (``wsgi``) or uvicorn (``asgi``) on ``port`` with
+    ``bench_settings`` and wait until it accepts connections.
+
+    ``env`` adds environment variables, e.g. the ``TODO_BENCH_*``
+    switches read by ``bench_settings``.
+    """
+    env = {
+        **os.environ,
+        **(env or {}),
+        'DJANGO_SETTINGS_MODULE': 'bench_settings',
+        'TODO_BENCH_DB': str(db_path),
+        'PYTHONPATH': os.pathsep.join([str(PROJECT_DIR), str(BENCH_DIR)]),
+    }
+    command = [part.format(port=port, threads=threads, workers=workers) for part in SERVERS[kind]]
+    command[0:1] = [sys.executable, '-m', command[0]]
+    server = subprocess.Popen(command, cwd=PROJECT_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f'{kind} server did not start')
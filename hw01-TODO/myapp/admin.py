@@ -1,10 +1,41 @@
 from django.contrib import admin
-from .models import Todo
+from . import archive, search, sharding
+from .models import ArchivedTodo, Todo
+
+
+class ShardAdmin(admin.ModelAdmin):
+    """
+    Admin over every owner's rows on one shard (``shard``, default: the first).
+
+    Each extra shard gets its own admin site under ``admin/<alias>/``, as in
+    Django's multiple-database admin recipe.
+    """
+    shard = None
+
+    def get_shard(self):
+        return self.shard or sharding.get_shards()[0]
+
+    def get_queryset(self, request):
+        queryset = self.model.all_owners.using(self.get_shard())
+        ordering = self.get_ordering(request)
+        return queryset.order_by(*ordering) if ordering else queryset
+
+    def changelist_view(self, request, extra_context=None):
+        with sharding.use_shard(self.get_shard()):
+            return super().changelist_view(request, extra_context)
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        with sharding.use_shard(self.get_shard()):
+            return super().changeform_view(request, object_id, form_url, extra_context)
+
+    def delete_view(self, request, object_id, extra_context=None):
+        with sharding.use_shard(self.get_shard()):
+            return super().delete_view(request, object_id, extra_context)
 
 
 @admin.register(Todo)
-class TodoAdmin(admin.ModelAdmin):
-    list_display = ('title', 'due_date', 'is_resolved', 'created_at', 'updated_at')
+class TodoAdmin(ShardAdmin):
+    list_display = ('title', 'owner', 'due_date', 'is_resolved', 'created_at', 'updated_at')
     list_filter = ('is_resolved', 'created_at', 'due_date')
     search_fields = ('title', 'description')
     date_hierarchy = 'created_at'
@@ -18,9 +49,44 @@ class TodoAdmin(admin.ModelAdmin):
             'fields': ('is_resolved', 'due_date')
         }),
         ('Timestamps', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('owner', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('owner', 'created_at', 'updated_at')
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search through the full-text index instead of LIKE scans."""
+        if not search_term.strip():
+            return queryset, False
+        return search.filter_todos(queryset, search_term), False
+
+
+@admin.register(ArchivedTodo)
+class ArchivedTodoAdmin(ShardAdmin):
+    """Read-only view of the archive; rows only leave it by restore or purge."""
+    list_display = ('title', 'owner', 'due_date', 'updated_at', 'archived_at')
+    search_fields = ('title', 'description')
+    date_hierarchy = 'archived_at'
+    actions = ['restore']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="Restore selected archived TODOs")
+    def restore(self, request, queryset):
+        restored = archive.restore_archived(queryset.values_list('pk', flat=True))
+        self.message_user(request, f"{restored} TODO(s) restored.")
+
+
+# One admin site per extra shard, mounted in myproject.urls.
+shard_sites = {}
+for _alias in sharding.get_shards()[1:]:
+    shard_sites[_alias] = admin.AdminSite(name=f'admin_{_alias}')
+    shard_sites[_alias].site_header = f"TODO administration ({_alias})"
+    for _model, _model_admin in ((Todo, TodoAdmin), (ArchivedTodo, ArchivedTodoAdmin)):
+        shard_sites[_alias].register(_model, type(_model_admin.__name__, (_model_admin,), {'shard': _alias}))
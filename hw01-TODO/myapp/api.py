@@ -0,0 +1,301 @@
+"""
+JSON API for TODO items.
+
+Single-item endpoints reuse ``TodoForm`` validation; the bulk endpoints
+go through ``myapp.bulk`` so a whole batch costs one transaction and a
+fixed number of statements.  The read endpoints are async views on the
+async ORM; writes run in a worker thread.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from django.utils import timezone
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from . import archive, bulk
+from .conditional import item_etag
+from .forms import TodoForm
+from .models import ConcurrentUpdateError, Todo
+from .pagination import apaginate, get_page_size
+from .replicas import replica_reads
+
+DUE_DATE_FORMAT = '%Y-%m-%dT%H:%M'
+
+BULK_ACTIONS = {
+    'resolve': True,
+    'unresolve': False,
+    'toggle': None,
+}
+
+
+def serialize_todo(todo, now=None):
+    """Return a JSON-serializable dict for ``todo``."""
+    return {
+        'id': todo.pk,
+        'title': todo.title,
+        'description': todo.description,
+        'due_date': todo.due_date.isoformat() if todo.due_date else None,
+        'is_resolved': todo.is_resolved,
+        'is_overdue': todo.is_overdue(now=now),
+        'seconds_until_due': todo.seconds_until_due(now=now),
+        'created_at': todo.created_at.isoformat(),
+        'updated_at': todo.updated_at.isoformat(),
+    }
+
+
+def serialize_archived(todo):
+    """Return a JSON-serializable dict for an ``ArchivedTodo``."""
+    return {
+        'id': todo.pk,
+        'title': todo.title,
+        'description': todo.description,
+        'due_date': todo.due_date.isoformat() if todo.due_date else None,
+        'created_at': todo.created_at.isoformat(),
+        'updated_at': todo.updated_at.isoformat(),
+        'archived_at': todo.archived_at.isoformat(),
+    }
+
+
+def _error(message, status=400, **extra):
+    return JsonResponse({'error': message, **extra}, status=status)
+
+
+def _parse_body(request):
+    """Decode a JSON object body, or return ``None`` if it is not one."""
+    try:
+        data = json.loads(request.body or b'{}')
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _is_json(request):
+    """
+    Whether the request body is declared as JSON.
+
+    The write endpoints are CSRF-exempt.  A cross-site page can only send
+    form-encoded or ``text/plain`` bodies without a CORS preflight, so
+    insisting on ``application/json`` keeps it from writing.
+    """
+    return request.content_type == 'application/json'
+
+
+def _unsupported_media_type():
+    return _error('Content-Type must be application/json.', status=415)
+
+
+def _form_data(todo):
+    """Current field values of ``todo`` in the shape ``TodoForm`` expects."""
+    data = model_to_dict(todo, fields=TodoForm._meta.fields)
+    if todo.due_date:
+        data['due_date'] = timezone.localtime(todo.due_date).strftime(DUE_DATE_FORMAT)
+    return data
+
+
+def _parse_ids(data):
+    """Validate the ``ids`` list of a bulk request."""
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return None, _error('"ids" must be a non-empty list.')
+    if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+        return None, _error('"ids" must contain integers only.')
+    if len(ids) > bulk.get_max_batch_size():
+        return None, _error(f'At most {bulk.get_max_batch_size()} items per request.')
+    return ids, None
+
+
+# The API is used by non-browser integrations that hold no CSRF cookie.
+
+def async_api_view(methods):
+    """
+    ``require_http_methods`` plus ``csrf_exempt`` for async views.
+
+    Django 4.2's own decorators wrap views in a synchronous function,
+    which would hide the coroutine from the handler.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+def _create(data, now):
+    form = TodoForm(data=data)
+    if not form.is_valid():
+        return _error('Validation failed.', errors=form.errors.get_json_data())
+    todo = form.save()
+    return JsonResponse(serialize_todo(todo, now), status=201)
+
+
+@replica_reads
+@async_api_view(['GET', 'POST'])
+async def todo_collection(request):
+    """List todos (cursor-paginated) or create one."""
+    now = timezone.now()
+    if request.method == 'GET':
+        page = await apaginate(
+            Todo.objects.with_due_status(now),
+            cursor=request.GET.get('cursor'),
+            page_size=request.GET.get('page_size'),
+        )
+        return JsonResponse({
+            'results': [serialize_todo(todo, now) for todo in page],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        })
+
+    if not _is_json(request):
+        return _unsupported_media_type()
+    data = _parse_body(request)
+    if data is None:
+        return _error('Request body must be a JSON object.')
+    return await sync_to_async(_create)(data, now)
+
+
+def _item_response(todo):
+    response = JsonResponse(serialize_todo(todo))
+    response['ETag'] = item_etag(todo.pk, todo.updated_at)
+    return response
+
+
+def _precondition_failed():
+    return _error('The todo was changed since it was fetched.', status=412)
+
+
+def _if_match_fails(request, todo):
+    """Whether an ``If-Match`` header names a version other than ``todo``'s."""
+    header = request.headers.get('If-Match')
+    if header is None:
+        return False
+    etags = parse_etags(header)
+    return '*' not in etags and item_etag(todo.pk, todo.updated_at) not in etags
+
+
+def _update(todo, data, if_match=False):
+    data = {**_form_data(todo), **data}
+    if if_match:
+        # The client's ETag matched what we just read; make the UPDATE
+        # itself conditional so a write in between is not overwritten.
+        data['version'] = todo.updated_at.isoformat()
+    form = TodoForm(data=data, instance=todo)
+    if not form.is_valid():
+        return _error('Validation failed.', errors=form.errors.get_json_data())
+    try:
+        todo = form.save()
+    except ConcurrentUpdateError:
+        return _precondition_failed()
+    return _item_response(todo)
+
+
+@async_api_view(['GET', 'PATCH', 'DELETE'])
+async def todo_item(request, pk):
+    """Fetch, partially update or delete a single todo."""
+    try:
+        todo = await Todo.objects.aget(pk=pk)
+    except Todo.DoesNotExist:
+        raise Http404('No Todo matches the given query.')
+    if request.method == 'GET':
+        return _item_response(todo)
+
+    if request.method == 'DELETE':
+        await todo.adelete()
+        return JsonResponse({'deleted': 1})
+
+    if not _is_json(request):
+        return _unsupported_media_type()
+    if _if_match_fails(request, todo):
+        return _precondition_failed()
+    data = _parse_body(request)
+    if data is None:
+        return _error('Request body must be a JSON object.')
+    return await sync_to_async(_update)(todo, data, if_match='If-Match' in request.headers)
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+def todo_bulk_create(request):
+    """Validate every item with ``TodoForm`` and insert them in one batch."""
+    if not _is_json(request):
+        return _unsupported_media_type()
+    data = _parse_body(request)
+    items = data.get('items') if data else None
+    if not isinstance(items, list) or not items:
+        return _error('"items" must be a non-empty list.')
+    if len(items) > bulk.get_max_batch_size():
+        return _error(f'At most {bulk.get_max_batch_size()} items per request.')
+
+    todos, errors = [], {}
+    for index, item in enumerate(items):
+        form = TodoForm(data=item if isinstance(item, dict) else {})
+        if form.is_valid():
+            todos.append(form.save(commit=False))
+        else:
+            errors[index] = form.errors.get_json_data()
+    if errors:
+        # All or nothing: report every invalid row and insert none.
+        return _error('Validation failed.', errors=errors)
+
+    created = bulk.create_todos(todos)
+    return JsonResponse({'created': [todo.pk for todo in created]}, status=201)
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+def todo_bulk_update(request):
+    """Resolve, unresolve or toggle many todos with one ``UPDATE``."""
+    if not _is_json(request):
+        return _unsupported_media_type()
+    data = _parse_body(request)
+    if data is None:
+        return _error('Request body must be a JSON object.')
+    ids, error = _parse_ids(data)
+    if error:
+        return error
+    action = data.get('action')
+    if action not in BULK_ACTIONS:
+        return _error(f'"action" must be one of: {", ".join(BULK_ACTIONS)}.')
+    changed = bulk.set_resolved(ids, BULK_ACTIONS[action])
+    return JsonResponse({'updated': changed})
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+def todo_bulk_delete(request):
+    """Delete many todos with one ``DELETE``."""
+    if not _is_json(request):
+        return _unsupported_media_type()
+    data = _parse_body(request)
+    if data is None:
+        return _error('Request body must be a JSON object.')
+    ids, error = _parse_ids(data)
+    if error:
+        return error
+    deleted = bulk.delete_todos(ids)
+    return JsonResponse({'deleted': deleted})
+
+
+@replica_reads
+@async_api_view(['GET'])
+async def archive_collection(request):
+    """Search archived todos with ``?q=``, newest first; ``?before=<id>`` pages."""
+    before = request.GET.get('before')
+    if before not in (None, '') and not before.isdigit():
+        return _error('"before" must be an id.')
+    page_size = get_page_size(request.GET.get('page_size'))
+    results = await sync_to_async(archive.search_archive)(
+        request.GET.get('q', ''), int(before) if before else None, page_size,
+    )
+    return JsonResponse({
+        'results': [serialize_archived(todo) for todo in results],
+        'next': results[-1].pk if len(results) == page_size else None,
+    })
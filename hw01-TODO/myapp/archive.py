@@ -0,0 +1,210 @@
+"""
+Archival of old resolved todos into ``ArchivedTodo``.
+
+``archive_resolved`` moves todos resolved (last changed) more than
+``TODO_ARCHIVE_AFTER_DAYS`` ago out of the hot table, so lists, counts
+and the admin only work on live rows.  Each batch is one transaction of
+``INSERT ... SELECT`` plus ``DELETE``, at most ``TODO_ARCHIVE_BATCH_SIZE``
+rows, so a run can be stopped at any point and simply started again.
+``purge_archive`` deletes archived rows past ``TODO_ARCHIVE_RETENTION_DAYS``
+the same way, and ``restore_archived`` moves rows back.
+
+Like the live table, the archive is sharded by owner; maintenance runs
+cover every owner on one shard (see ``myapp.sharding.use_shard``).
+
+The archive has no full-text index: it is searched on demand with
+``search_archive``, a ``LIKE`` scan that the hot table never pays for.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import search
+from .models import ArchivedTodo, Todo
+from .pagination import get_page_size
+from .signals import todos_bulk_changed
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 30
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_BATCH_SIZE = 500
+
+# Columns copied between the two tables, in the same order on both sides.
+COPIED_FIELDS = ('id', 'owner', 'title', 'description', 'due_date', 'created_at', 'updated_at')
+
+
+def get_archive_after_days():
+    return getattr(settings, 'TODO_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+
+
+def get_retention_days():
+    """Days archived rows are kept, or ``None`` to keep them forever."""
+    return getattr(settings, 'TODO_ARCHIVE_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def get_batch_size():
+    return getattr(settings, 'TODO_ARCHIVE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+
+def _columns(qn, model, names):
+    return ', '.join(qn(model._meta.get_field(name).column) for name in names)
+
+
+def _send_by_owner(action, rows, sign):
+    """Send ``todos_bulk_changed`` once per owner in ``rows`` of ``(pk, owner)``."""
+    by_owner = {}
+    for pk, owner in rows:
+        by_owner.setdefault(owner, []).append(pk)
+    for owner, pks in by_owner.items():
+        # Only resolved todos are archived, so both counters move together.
+        todos_bulk_changed.send(
+            sender=Todo,
+            action=action,
+            pks=pks,
+            total_delta=sign * len(pks),
+            resolved_delta=sign * len(pks),
+            owner=owner,
+        )
+
+
+def _run_batches(move, batch_size, max_batches, pause):
+    """Call ``move(batch_size)`` until a batch comes back short; return the row total."""
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = move(batch_size)
+        total += moved
+        batches += 1
+        if moved < batch_size:
+            break
+        if pause:
+            # Let waiting writers take the database lock between batches.
+            time.sleep(pause)
+    return total
+
+
+def _archive_batch(cutoff, batch_size):
+    connection = connections[router.db_for_write(Todo)]
+    qn = connection.ops.quote_name
+    todo_table, archive_table = qn(Todo._meta.db_table), qn(ArchivedTodo._meta.db_table)
+    id_column = qn(Todo._meta.pk.column)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic(using=connection.alias):
+        # Oldest changes first, walking the updated_at index.
+        rows = list(
+            Todo.objects.using(connection.alias)
+            .filter(is_resolved=True, updated_at__lt=cutoff)
+            .order_by('updated_at')
+            .values_list('pk', 'owner')[:batch_size]
+        )
+        if not rows:
+            return 0
+        pks = [pk for pk, _ in rows]
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {archive_table} '
+                f'({_columns(qn, ArchivedTodo, COPIED_FIELDS + ("archived_at",))}) '
+                f'SELECT {_columns(qn, Todo, COPIED_FIELDS)}, %s FROM {todo_table} '
+                f'WHERE {id_column} IN ({placeholders})',
+                [now, *pks],
+            )
+            cursor.execute(f'DELETE FROM {todo_table} WHERE {id_column} IN ({placeholders})', pks)
+            moved = cursor.rowcount
+        _send_by_owner('deleted', rows, -1)
+    return moved
+
+
+def archive_resolved(older_than_days=None, batch_size=None, max_batches=None, pause=0):
+    """
+    Move todos resolved more than ``older_than_days`` ago into the archive.
+
+    Works in transactions of ``batch_size`` rows, stopping after
+    ``max_batches`` if given.  Returns the number of todos moved.
+    """
+    days = get_archive_after_days() if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    return _run_batches(
+        lambda size: _archive_batch(cutoff, size),
+        batch_size or get_batch_size(), max_batches, pause,
+    )
+
+
+def _purge_batch(cutoff, batch_size):
+    with transaction.atomic(using=router.db_for_write(ArchivedTodo)):
+        pks = list(
+            ArchivedTodo.objects.filter(archived_at__lt=cutoff)
+            .order_by('archived_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return 0
+        deleted, _ = ArchivedTodo.objects.filter(pk__in=pks).delete()
+    return deleted
+
+
+def purge_archive(retention_days=None, batch_size=None, max_batches=None, pause=0):
+    """
+    Delete archived todos archived more than ``retention_days`` ago.
+
+    Does nothing when the retention is ``None``.  Returns the number of
+    rows deleted.
+    """
+    days = get_retention_days() if retention_days is None else retention_days
+    if days is None:
+        return 0
+    cutoff = timezone.now() - timedelta(days=days)
+    return _run_batches(
+        lambda size: _purge_batch(cutoff, size),
+        batch_size or get_batch_size(), max_batches, pause,
+    )
+
+
+def restore_archived(pks):
+    """
+    Move archived todos back into ``Todo``, resolved, with their original
+    ids.  Returns the number restored.
+    """
+    connection = connections[router.db_for_write(Todo)]
+    qn = connection.ops.quote_name
+    todo_table, archive_table = qn(Todo._meta.db_table), qn(ArchivedTodo._meta.db_table)
+    id_column = qn(ArchivedTodo._meta.pk.column)
+    # updated_at moves to now so list ETags and the scheduler see the row.
+    copied = [name for name in COPIED_FIELDS if name != 'updated_at']
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic(using=connection.alias):
+        # Only the current owner's rows (every owner's under use_shard()).
+        rows = list(
+            ArchivedTodo.objects.using(connection.alias)
+            .filter(pk__in=list(pks)).values_list('pk', 'owner')
+        )
+        if not rows:
+            return 0
+        pks = [pk for pk, _ in rows]
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {todo_table} '
+                f'({_columns(qn, Todo, copied + ["is_resolved", "updated_at"])}) '
+                f'SELECT {_columns(qn, ArchivedTodo, copied)}, %s, %s FROM {archive_table} '
+                f'WHERE {id_column} IN ({placeholders})',
+                [True, now, *pks],
+            )
+            restored = cursor.rowcount
+            cursor.execute(f'DELETE FROM {archive_table} WHERE {id_column} IN ({placeholders})', pks)
+        _send_by_owner('created', rows, 1)
+    return restored
+
+
+def search_archive(text, before=None, page_size=None):
+    """
+    Archived todos matching ``text``, newest id first.
+
+    ``before`` is the last id of the previous page.  Returns the page as a
+    list; an empty query matches nothing.
+    """
+    queryset = search.filter_like(ArchivedTodo.objects.order_by('-id'), text)
+    if before is not None:
+        queryset = queryset.filter(pk__lt=before)
+    return list(queryset[:get_page_size(page_size)])
@@ -0,0 +1,139 @@
+"""
+Set-based write paths for many TODO items at once.
+
+Each function runs in one transaction and issues a fixed number of
+statements regardless of how many rows it touches.  They bypass the
+per-row ``post_save``/``post_delete`` signals, so each one sends
+``todos_bulk_changed`` with the net counter deltas instead.
+"""
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Case, Count, Q, Value, When
+from django.utils import timezone
+
+from . import sharding
+from .models import Todo
+from .signals import todos_bulk_changed
+
+DEFAULT_MAX_BATCH_SIZE = 1000
+
+
+def get_max_batch_size():
+    """Largest number of items accepted by a single bulk request."""
+    return getattr(settings, 'TODO_BULK_MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE)
+
+
+def _counts(queryset):
+    return queryset.order_by().aggregate(
+        total=Count('pk'),
+        resolved=Count('pk', filter=Q(is_resolved=True)),
+    )
+
+
+def _atomic():
+    return transaction.atomic(using=router.db_for_write(Todo))
+
+
+def create_todos(todos, batch_size=None):
+    """Insert unsaved ``Todo`` instances with ``bulk_create``."""
+    with _atomic():
+        created = Todo.objects.bulk_create(todos, batch_size=batch_size)
+        todos_bulk_changed.send(
+            sender=Todo,
+            action='created',
+            pks=[todo.pk for todo in created],
+            total_delta=len(created),
+            resolved_delta=sum(1 for todo in created if todo.is_resolved),
+        )
+    return created
+
+
+def set_resolved(pks, value=None):
+    """
+    Resolve (``True``), unresolve (``False``) or toggle (``None``) todos.
+
+    Runs as a single ``UPDATE ... WHERE id IN (...)``.  Returns the number
+    of rows whose status changed.
+    """
+    now = timezone.now()
+    with _atomic():
+        queryset = Todo.objects.filter(pk__in=pks)
+        if value is None:
+            counts = _counts(queryset)
+            changed = queryset.update(
+                is_resolved=Case(
+                    When(is_resolved=True, then=Value(False)),
+                    default=Value(True),
+                ),
+                updated_at=now,
+            )
+            resolved_delta = counts['total'] - 2 * counts['resolved']
+        else:
+            changed = queryset.exclude(is_resolved=value).update(is_resolved=value, updated_at=now)
+            resolved_delta = changed if value else -changed
+        todos_bulk_changed.send(
+            sender=Todo,
+            action='updated',
+            pks=list(pks),
+            total_delta=0,
+            resolved_delta=resolved_delta,
+        )
+    return changed
+
+
+def toggle_resolved(pk):
+    """
+    Flip one todo's ``is_resolved`` with a single ``UPDATE ... RETURNING``.
+
+    Nothing is read first and only ``is_resolved`` and ``updated_at`` are
+    written, so concurrent toggles cannot overwrite each other's edits.
+    Returns the updated ``Todo``, or ``None`` if there is no such row.
+    """
+    connection = connections[router.db_for_write(Todo)]
+    opts = Todo._meta
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(field.column) for field in opts.concrete_fields)
+    where, params = f'{qn(opts.pk.column)} = %s', [pk]
+    owner = sharding.current_owner()
+    if owner is not None:
+        # The raw statement skips the owner filter of Todo.objects.
+        where, params = f'{where} AND {qn("owner")} = %s', [pk, owner]
+    sql = (
+        f'UPDATE {qn(opts.db_table)} '
+        f'SET {qn("is_resolved")} = NOT {qn("is_resolved")}, {qn("updated_at")} = %s '
+        f'WHERE {where} '
+        f'RETURNING {columns}'
+    )
+    params = [connection.ops.adapt_datetimefield_value(timezone.now()), *params]
+    with transaction.atomic(using=connection.alias):
+        updated = list(Todo.objects.db_manager(connection.alias).raw(sql, params))
+        if not updated:
+            return None
+        todo = updated[0]
+        todos_bulk_changed.send(
+            sender=Todo,
+            action='updated',
+            pks=[pk],
+            total_delta=0,
+            resolved_delta=1 if todo.is_resolved else -1,
+            owner=todo.owner,
+        )
+    return todo
+
+
+def delete_todos(pks):
+    """Delete todos with a single ``DELETE ... WHERE id IN (...)``."""
+    with _atomic():
+        queryset = Todo.objects.filter(pk__in=pks)
+        counts = _counts(queryset)
+        # _raw_delete skips the collector, which would otherwise load every
+        # row to send post_delete; nothing references Todo.
+        deleted = queryset._raw_delete(queryset.db)
+        todos_bulk_changed.send(
+            sender=Todo,
+            action='deleted',
+            pks=list(pks),
+            total_delta=-counts['total'],
+            resolved_delta=-counts['resolved'],
+        )
+    return deleted
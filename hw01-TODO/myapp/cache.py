@@ -0,0 +1,130 @@
+"""
+Versioned caching for rendered TODO list fragments.
+
+Every cached entry's key embeds a global version number and the owner
+whose list it is.  Any write to ``Todo`` bumps the version (see
+``myapp.signals``), which orphans every existing entry at once; stale
+entries simply age out of the backend.
+The backend is whichever cache ``TODO_CACHE_ALIAS`` names, so locmem,
+file and database caches all work.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import urlencode
+
+from . import replicas, sharding
+
+VERSION_KEY = 'todo:version'
+
+DEFAULT_TIMEOUT = 300
+
+
+def get_cache():
+    return caches[getattr(settings, 'TODO_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'TODO_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _initial_version():
+    # Seed from the clock so a version key evicted from the cache never
+    # restarts at a number that older entries were stored under.
+    return int(time.time() * 1000)
+
+
+def get_version():
+    """Return the current list version, creating it if needed."""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def aget_version():
+    """Async counterpart of ``get_version``."""
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, _initial_version(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def _bump():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _initial_version(), timeout=None)
+
+
+def bump_version():
+    """
+    Invalidate every cached list fragment.
+
+    Bumps immediately and, inside a transaction, once more on commit so a
+    reader that cached pre-commit data in between is invalidated too.
+    """
+    _bump()
+    using = sharding.current_shard()
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(_bump, using=using)
+
+
+def is_enabled():
+    """
+    Whether fragments may be read from or written to the cache.
+
+    Inside a transaction the rendered rows may include uncommitted writes
+    that could still roll back, so the cache is bypassed there.
+    """
+    return not transaction.get_connection(sharding.current_shard()).in_atomic_block
+
+
+def _fragment_key(name, params, version):
+    # Pages rendered from a replica may be behind; keep them apart from
+    # the primary's so a client that just wrote never gets one.
+    source = replicas.read_alias(sharding.current_shard())
+    query = urlencode(
+        [('owner', sharding.default_owner()), ('db', source), *sorted(params.items())], doseq=True,
+    )
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    return f'todo:{name}:{version}:{digest}'
+
+
+def fragment_key(name, params):
+    """Build a versioned cache key for ``name`` and the request ``params``."""
+    return _fragment_key(name, params, get_version())
+
+
+async def afragment_key(name, params):
+    """Async counterpart of ``fragment_key``."""
+    return _fragment_key(name, params, await aget_version())
+
+
+def page_timeout(page, now):
+    """
+    Seconds a rendered page stays accurate.
+
+    Overdue badges are rendered server-side, so the entry must expire no
+    later than the next pending due date on the page.  Countdown text is
+    computed client-side from timestamps and needs no expiry.
+    """
+    timeout = get_timeout()
+    shard = sharding.current_shard()
+    if replicas.read_alias(shard) != shard:
+        # The replica may have been behind; let the page expire once it
+        # has caught up.
+        timeout = min(timeout, replicas.get_replication_lag())
+    for todo in page:
+        if todo.due_date and not todo.is_resolved and todo.due_date > now:
+            timeout = min(timeout, (todo.due_date - now).total_seconds())
+    return max(1, math.ceil(timeout))
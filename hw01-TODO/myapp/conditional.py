@@ -0,0 +1,179 @@
+"""
+Conditional GET (ETag / Last-Modified) support for the HTML pages.
+
+Freshness is computed with one indexed query and compared against the
+request's validators before the view runs, so a 304 never touches the
+page query or the template.  The page also depends on the client: its
+CSRF token is mixed into the ETag, and requests with flash messages
+waiting to be shown always get the full page.
+"""
+import hashlib
+from asyncio import iscoroutinefunction
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.db.models import Subquery
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag,
+)
+from django.utils.http import http_date
+
+from .models import Todo
+from .stats import counter_queryset
+
+
+def _make_etag(*parts):
+    digest = hashlib.md5(':'.join(map(str, parts)).encode(), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def _list_freshness_query(now):
+    return (
+        counter_queryset()
+        .annotate(
+            max_updated=Subquery(
+                Todo.objects.order_by('-updated_at').values('updated_at')[:1]
+            ),
+            last_overdue=Subquery(
+                Todo.objects.filter(is_resolved=False, due_date__lte=now)
+                .order_by('-due_date')
+                .values('due_date')[:1]
+            ),
+        )
+        .values('total', 'modified_at', 'max_updated', 'last_overdue')
+    )
+
+
+def _list_validators(row, now):
+    if row is None:
+        return None, None
+    stamps = [row[name] for name in ('max_updated', 'modified_at', 'last_overdue') if row[name]]
+    last_modified = max(stamps) if stamps else None
+    etag = _make_etag(
+        row['max_updated'], row['modified_at'], row['last_overdue'], row['total'],
+        timezone.localdate(now),
+    )
+    return etag, last_modified
+
+
+def list_freshness(request, now=None):
+    """
+    Return ``(etag, last_modified)`` for the TODO list.
+
+    Derived from ``MAX(updated_at)`` and the row count, plus the counter's
+    ``modified_at`` (which moves on deletes) and the most recent pending
+    due date that has already passed (which moves when a todo turns
+    overdue without any write).  All of it comes from one statement.  The
+    local date is mixed into the ETag so "due today" pages roll over at
+    midnight.
+    """
+    if now is None:
+        now = timezone.now()
+    return _list_validators(_list_freshness_query(now).first(), now)
+
+
+async def alist_freshness(request, now=None):
+    """Async counterpart of ``list_freshness``."""
+    if now is None:
+        now = timezone.now()
+    return _list_validators(await _list_freshness_query(now).afirst(), now)
+
+
+def item_etag(pk, updated_at):
+    """ETag of a single todo, shared by the edit page and the JSON API."""
+    return _make_etag(pk, updated_at)
+
+
+def item_freshness(request, pk):
+    """Return ``(etag, last_modified)`` for a single todo, from its ``updated_at``."""
+    updated_at = Todo.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None, None
+    return item_etag(pk, updated_at), updated_at
+
+
+def _timestamp(last_modified):
+    return timegm(last_modified.utctimetuple()) if last_modified else None
+
+
+def _has_messages(request):
+    # ``len`` loads the queued messages without marking them as shown.
+    return bool(len(messages.get_messages(request)))
+
+
+def _client_etag(request, etag):
+    # The CSRF secret the page's token was made from; CsrfViewMiddleware
+    # reads it from the cookie, and ``get_token`` sets it while rendering.
+    return _make_etag(etag, request.META.get('CSRF_COOKIE', ''))
+
+
+def _add_validators(request, response, etag, timestamp):
+    response.headers.setdefault('ETag', _client_etag(request, etag))
+    if timestamp is not None:
+        response.headers.setdefault('Last-Modified', http_date(timestamp))
+    # Let browsers and proxies store the page but always revalidate.
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def _not_modified(request, etag, timestamp):
+    return get_conditional_response(
+        request, etag=_client_etag(request, etag), last_modified=timestamp,
+    )
+
+
+def conditional_page(freshness):
+    """
+    Decorator adding ETag/Last-Modified headers and 304 responses to a view.
+
+    Like ``django.views.decorators.http.condition`` but ``freshness``
+    returns both validators from a single query.  Views that find no
+    validators (e.g. a missing row), and requests with pending flash
+    messages, run normally.  Async views take an async ``freshness``
+    function such as ``alist_freshness``.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                # Messages may fall back to the session, which is a query.
+                if await sync_to_async(_has_messages)(request):
+                    return await view(request, *args, **kwargs)
+
+                etag, last_modified = await freshness(request, *args, **kwargs)
+                if etag is None:
+                    return await view(request, *args, **kwargs)
+
+                timestamp = _timestamp(last_modified)
+                response = _not_modified(request, etag, timestamp)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return _add_validators(request, response, etag, timestamp)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _has_messages(request):
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = freshness(request, *args, **kwargs)
+            if etag is None:
+                return view(request, *args, **kwargs)
+
+            timestamp = _timestamp(last_modified)
+            response = _not_modified(request, etag, timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return _add_validators(request, response, etag, timestamp)
+        return wrapper
+    return decorator
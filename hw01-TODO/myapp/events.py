@@ -0,0 +1,228 @@
+"""
+Live change events for open TODO lists, delivered over Server-Sent Events.
+
+Writes publish ``created``/``updated``/``deleted`` events once their
+transaction commits (see ``myapp.signals``); each open ``/events/``
+stream receives them through an in-process broker.  Events carry the
+rendered card and table row so the page can patch single rows.
+
+Each event belongs to the owner whose todos changed (see
+``myapp.sharding``) and only reaches that owner's streams.
+
+The broker lives in one process: with several server workers each
+stream only sees writes made by its own worker, and clients fall back
+to a ``resync`` event when they reconnect to a different one.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+DEFAULT_HEARTBEAT = 15      # seconds between keep-alive comments
+DEFAULT_MAX_AGE = 300       # seconds before a stream closes and the client reconnects
+DEFAULT_QUEUE_SIZE = 100    # pending events per stream before it is told to resync
+HISTORY_SIZE = 100          # events kept for Last-Event-ID replay
+RETRY_MS = 3000
+
+
+def get_heartbeat():
+    return getattr(settings, 'TODO_EVENTS_HEARTBEAT', DEFAULT_HEARTBEAT)
+
+
+def get_max_age():
+    return getattr(settings, 'TODO_EVENTS_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+class Event:
+    """A published event; ``id`` is unique to the publishing process."""
+
+    def __init__(self, id, type, data, owner=''):
+        self.id = id
+        self.type = type
+        self.data = data
+        self.owner = owner
+
+    def encode(self):
+        """Format the event for a ``text/event-stream`` response."""
+        payload = json.dumps(self.data, ensure_ascii=False)
+        # Events without an id (resync) leave the client's Last-Event-ID alone.
+        head = f'id: {self.id}\n' if self.id else ''
+        return f'{head}event: {self.type}\ndata: {payload}\n\n'
+
+
+class Subscription:
+    """One stream's queue of events, fed from any thread."""
+
+    def __init__(self, broker, queue_size, owner=''):
+        self.broker = broker
+        self.owner = owner
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Queue ``event``; safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's event loop is gone.
+            self.close()
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Return the next event, or ``None`` after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Thread-safe in-process publish/subscribe hub."""
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history_size)
+        self._counter = itertools.count(1)
+        # Event ids embed a per-process token so ids from another process
+        # (or from before a restart) are recognised on reconnect.
+        self._token = uuid.uuid4().hex[:8]
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, type, data, owner=''):
+        """Publish an event to ``owner``'s subscribers and return it."""
+        with self._lock:
+            event = Event(f'{self._token}-{next(self._counter)}', type, data, owner)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.owner == owner:
+                subscription.deliver(event)
+        return event
+
+    def subscribe(self, queue_size=DEFAULT_QUEUE_SIZE, last_event_id=None, owner=''):
+        """
+        Register a subscription to ``owner``'s events from inside an event loop.
+
+        Returns ``(subscription, replay)`` where ``replay`` lists the events
+        published after ``last_event_id``, or is ``None`` when they can no
+        longer be replayed and the client must resync.
+        """
+        subscription = Subscription(self, queue_size, owner)
+        with self._lock:
+            self._subscribers.add(subscription)
+            replay = self._replay(last_event_id)
+        if replay:
+            replay = [event for event in replay if event.owner == owner]
+        return subscription, replay
+
+    def _replay(self, last_event_id):
+        if not last_event_id:
+            return []
+        token, _, number = last_event_id.partition('-')
+        if token != self._token or not number.isdigit():
+            return None
+        history = list(self._history)
+        if history and int(history[0].id.partition('-')[2]) > int(number) + 1:
+            return None  # Some events already fell out of the history.
+        return [event for event in history if int(event.id.partition('-')[2]) > int(number)]
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+broker = Broker()
+
+
+def render_todo(todo):
+    """Payload for one changed todo: its JSON form and rendered list item."""
+    from .api import serialize_todo
+
+    return {
+        'id': todo.pk,
+        'todo': serialize_todo(todo),
+        'html': render_to_string('myapp/todo_item.html', {'todo': todo}),
+    }
+
+
+def publish_changes(action, pks, owner=''):
+    """
+    Publish ``action`` ('created', 'updated' or 'deleted') for ``owner``'s ``pks``.
+
+    Called after commit.  Does nothing, and runs no queries, when no
+    stream is listening in this process.
+    """
+    if not broker.has_subscribers() or not pks:
+        return
+    from .models import Todo
+    from .sharding import owner_scope
+    from .stats import get_stats
+
+    now = timezone.now()
+    with owner_scope(owner):
+        data = {'stats': get_stats(now=now)}
+        if action == 'deleted':
+            data['ids'] = list(pks)
+        else:
+            todos = Todo.objects.with_due_status(now).filter(pk__in=pks).order_by('pk')
+            data['todos'] = [render_todo(todo) for todo in todos]
+            if not data['todos']:
+                return
+    broker.publish(action, data, owner)
+
+
+async def stream(last_event_id=None, heartbeat=None, max_age=None, owner=''):
+    """
+    Yield ``owner``'s ``text/event-stream`` chunks until ``max_age`` seconds pass.
+
+    Sends a keep-alive comment every ``heartbeat`` seconds and a
+    ``resync`` event when events were missed (queue overflow or a
+    Last-Event-ID that cannot be replayed).
+    """
+    heartbeat = get_heartbeat() if heartbeat is None else heartbeat
+    max_age = get_max_age() if max_age is None else max_age
+    subscription, replay = broker.subscribe(last_event_id=last_event_id, owner=owner)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        if replay is None:
+            yield Event(None, 'resync', {}).encode()
+        else:
+            for event in replay:
+                yield event.encode()
+
+        while (remaining := deadline - loop.time()) > 0:
+            event = await subscription.get(min(heartbeat, remaining))
+            if subscription.overflowed:
+                subscription.overflowed = False
+                subscription.drain()
+                yield Event(None, 'resync', {}).encode()
+            elif event is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield event.encode()
+    finally:
+        subscription.close()
@@ -0,0 +1,157 @@
+"""
+Streaming CSV/NDJSON export of TODO items.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` so no
+model instances are built and memory stays flat whatever the row count.
+"""
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Todo
+
+EXPORT_FIELDS = ('id', 'title', 'description', 'due_date', 'is_resolved', 'created_at', 'updated_at')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def parse_boundary(value):
+    """
+    Parse an ISO date or datetime into an aware datetime.
+
+    A bare date means midnight in the current time zone.  Raises
+    ``ValueError`` for anything else.
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date or datetime: {value!r}')
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_bool(value):
+    """Parse ``true``/``false`` (and ``1``/``0``), raising ``ValueError`` otherwise."""
+    lowered = str(value).lower()
+    if lowered in ('true', '1'):
+        return True
+    if lowered in ('false', '0'):
+        return False
+    raise ValueError(f'Invalid boolean: {value!r}')
+
+
+def filter_todos(queryset, is_resolved=None, due_after=None, due_before=None):
+    """
+    Apply the export filters given as raw strings.
+
+    ``due_after`` is inclusive and ``due_before`` exclusive.  Raises
+    ``ValueError`` on malformed input.
+    """
+    if is_resolved not in (None, ''):
+        queryset = queryset.filter(is_resolved=parse_bool(is_resolved))
+    if due_after:
+        queryset = queryset.filter(due_date__gte=parse_boundary(due_after))
+    if due_before:
+        queryset = queryset.filter(due_date__lt=parse_boundary(due_before))
+    return queryset
+
+
+def _export_rows(queryset):
+    if queryset is None:
+        queryset = Todo.objects.all()
+    return queryset.order_by('pk').values_list(*EXPORT_FIELDS)
+
+
+def iter_rows(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield export rows as tuples in primary-key order."""
+    return _export_rows(queryset).iterator(chunk_size=chunk_size)
+
+
+async def aiter_rows(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Async counterpart of ``iter_rows``, for streaming under ASGI.
+
+    Reads primary-key chunks with keyset queries instead of one open
+    cursor, so a slow client never keeps a read transaction open.
+    (Django 4.2's ``aiterator()`` does not support ``values_list()``.)
+    """
+    rows = _export_rows(queryset)
+    last_pk = None
+    while True:
+        chunk_query = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+        chunk = [row async for row in chunk_query[:chunk_size]]
+        for row in chunk:
+            yield row
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1][0]  # EXPORT_FIELDS starts with the id
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_formatter():
+    writer = csv.writer(_Echo())
+
+    def format_row(row):
+        return writer.writerow([_format_value(value) for value in row])
+    return writer.writerow(EXPORT_FIELDS), format_row
+
+
+def _ndjson_line(row):
+    record = {field: _format_value(value) for field, value in zip(EXPORT_FIELDS, row)}
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _formatter(export_format):
+    """Return ``(header, format_row)`` for ``export_format``."""
+    if export_format == 'csv':
+        return _csv_formatter()
+    if export_format == 'ndjson':
+        return None, _ndjson_line
+    raise ValueError(f'Unknown export format: {export_format!r}')
+
+
+def iter_export(export_format, rows):
+    """Serialize ``rows``: a header line (CSV only), then one line per row."""
+    header, format_row = _formatter(export_format)
+
+    def lines():
+        if header is not None:
+            yield header
+        for row in rows:
+            yield format_row(row)
+    return lines()
+
+
+def aiter_export(export_format, rows):
+    """Serialize an async iterator of rows; see ``iter_export``."""
+    header, format_row = _formatter(export_format)
+
+    async def lines():
+        if header is not None:
+            yield header
+        async for row in rows:
+            yield format_row(row)
+    return lines()
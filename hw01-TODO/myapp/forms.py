@@ -1,5 +1,9 @@
+from datetime import datetime, time, timedelta
+
 from django import forms
+from django.utils import timezone
 from .models import Todo
+from .pagination import DEFAULT_SORT
 
 
 class TodoForm(forms.ModelForm):
@@ -22,3 +26,145 @@ class TodoForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Enter description (optional)'}),
             'is_resolved': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
+
+    # The ``updated_at`` the user started editing from.  When present the
+    # save only succeeds if nobody else has written the row since.
+    version = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    CONFLICT_MESSAGE = (
+        'This TODO was changed by someone else while you were editing it. '
+        'The form now shows your changes; save again to overwrite theirs.'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None and self.instance.updated_at:
+            self.initial.setdefault('version', self.instance.updated_at.isoformat())
+
+    def clean_version(self):
+        version = self.cleaned_data['version']
+        if not version:
+            return None
+        try:
+            value = datetime.fromisoformat(version)
+        except ValueError:
+            raise forms.ValidationError('Invalid version.')
+        if timezone.is_naive(value):
+            raise forms.ValidationError('Invalid version.')
+        return value
+
+    def save(self, commit=True):
+        """
+        Save the todo.
+
+        Edits write only ``changed_data`` and raise ``ConcurrentUpdateError``
+        if the form carried a version that is no longer current.
+        """
+        if not commit or self.instance._state.adding:
+            return super().save(commit=commit)
+        if self.errors:
+            raise ValueError('The TODO could not be changed because the data didn\'t validate.')
+        self.instance.save_changes(
+            [name for name in self.changed_data if name in self._meta.fields],
+            expected_updated_at=self.cleaned_data.get('version'),
+        )
+        return self.instance
+
+
+def _start_of_day(day):
+    """Midnight at the start of ``day`` in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class TodoFilterForm(forms.Form):
+    """
+    Query-string filters and sort order for the TODO list.
+
+    Every filter maps to an indexed condition on ``is_resolved`` and
+    ``due_date``.  Invalid values are dropped rather than failing the page.
+    """
+
+    STATUS_CHOICES = [('', 'All statuses'), ('pending', 'Pending'), ('resolved', 'Resolved')]
+    DUE_CHOICES = [('', 'Any due date'), ('today', 'Due today'), ('week', 'Due this week')]
+    SORT_CHOICES = [('due', 'Due date'), ('newest', 'Newest first'), ('oldest', 'Oldest first')]
+
+    status = forms.ChoiceField(
+        choices=STATUS_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select', 'aria-label': 'Status'}),
+    )
+    overdue = forms.BooleanField(
+        required=False, label='Overdue only',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+    due = forms.ChoiceField(
+        choices=DUE_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select', 'aria-label': 'Due date'}),
+    )
+    due_after = forms.DateField(
+        required=False, label='Due from',
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+    )
+    due_before = forms.DateField(
+        required=False, label='Due until',
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+    )
+    sort = forms.ChoiceField(
+        choices=SORT_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select', 'aria-label': 'Sort by'}),
+    )
+
+    FILTER_FIELDS = ('status', 'overdue', 'due', 'due_after', 'due_before')
+
+    def _value(self, name):
+        self.is_valid()
+        return self.cleaned_data.get(name)
+
+    @property
+    def sort_key(self):
+        return self._value('sort') or DEFAULT_SORT
+
+    @property
+    def has_filters(self):
+        """Whether any filter (not just the sort order) is applied."""
+        return any(self._value(name) for name in self.FILTER_FIELDS)
+
+    @property
+    def time_sensitive(self):
+        """Whether the matching rows change as time passes, without any write."""
+        return bool(self._value('overdue') or self._value('due'))
+
+    def due_window(self, now):
+        """Return the ``(start, end)`` due date window; either may be ``None``."""
+        start = end = None
+        today = timezone.localtime(now).date()
+        window = self._value('due')
+        if window == 'today':
+            start, end = _start_of_day(today), _start_of_day(today + timedelta(days=1))
+        elif window == 'week':
+            monday = today - timedelta(days=today.weekday())
+            start, end = _start_of_day(monday), _start_of_day(monday + timedelta(days=7))
+
+        # The custom range narrows the preset window; "until" is inclusive.
+        if self._value('due_after'):
+            custom = _start_of_day(self._value('due_after'))
+            start = max(start, custom) if start else custom
+        if self._value('due_before'):
+            custom = _start_of_day(self._value('due_before') + timedelta(days=1))
+            end = min(end, custom) if end else custom
+        return start, end
+
+    def filter_queryset(self, queryset, now=None):
+        """Apply the valid filters to ``queryset``."""
+        if now is None:
+            now = timezone.now()
+        status = self._value('status')
+        if status:
+            queryset = queryset.filter(is_resolved=status == 'resolved')
+        if self._value('overdue'):
+            queryset = queryset.filter(is_resolved=False, due_date__lt=now)
+        start, end = self.due_window(now)
+        if start:
+            queryset = queryset.filter(due_date__gte=start)
+        if end:
+            queryset = queryset.filter(due_date__lt=end)
+        return queryset
@@ -0,0 +1,188 @@
+"""
+Bulk import of TODO items from CSV or NDJSON files.
+
+Records are validated in batches with ``TodoForm`` (optionally in worker
+processes) and inserted through ``myapp.bulk.create_todos``, one
+transaction per batch.
+"""
+import csv
+import json
+import multiprocessing
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+
+from .bulk import create_todos
+from .export import parse_bool
+from .forms import TodoForm
+from .models import Todo
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def detect_format(path):
+    """Guess the import format from the file extension."""
+    if str(path).lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+
+def read_records(fh, import_format):
+    """
+    Yield ``(line_number, record)`` pairs from an open text file.
+
+    CSV rows are yielded as dicts.  NDJSON lines are yielded unparsed so
+    that decoding happens in the (possibly parallel) validation stage.
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(fh)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(fh, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def batched(records, size):
+    """Group an iterable into lists of at most ``size`` items."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class RecordValidator:
+    """
+    Validate records with the fields of a single ``TodoForm``.
+
+    Building a bound ``TodoForm`` per row deep-copies every field, which
+    dominates import time.  The fields themselves are stateless, so one
+    form's fields are reused for the whole batch: same widgets, same
+    ``input_formats`` and the same validators as the HTML form.
+    """
+
+    def __init__(self):
+        # Only the model fields; ``version`` is an edit-form concern.
+        self.fields = {
+            name: field for name, field in TodoForm().fields.items()
+            if name in TodoForm._meta.fields
+        }
+
+    def __call__(self, record):
+        """Return ``(cleaned_data, None)`` or ``(None, errors)``."""
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except ValueError:
+                record = None
+        if not isinstance(record, dict):
+            return None, {'__all__': ['Record is not a JSON object.']}
+        data = dict(record)
+        resolved = data.get('is_resolved')
+        if isinstance(resolved, str):
+            # CheckboxInput would treat any non-empty string (even "0") as True.
+            try:
+                data['is_resolved'] = parse_bool(resolved) if resolved else False
+            except ValueError:
+                return None, {'is_resolved': [f'Invalid boolean: {resolved!r}']}
+
+        cleaned, errors = {}, {}
+        for name, field in self.fields.items():
+            value = field.widget.value_from_datadict(data, {}, name)
+            try:
+                cleaned[name] = field.clean(value)
+            except ValidationError as exc:
+                errors[name] = exc.messages
+        if errors:
+            return None, errors
+        return cleaned, None
+
+
+def validate_batch(batch):
+    """Validate a batch of ``(line, record)`` pairs; picklable for workers."""
+    validate = RecordValidator()
+    valid, rejected = [], []
+    for line_number, record in batch:
+        cleaned, errors = validate(record)
+        if errors is None:
+            valid.append(cleaned)
+        else:
+            rejected.append({'line': line_number, 'errors': errors, 'record': record})
+    return valid, rejected
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _validate_in_pool(pool, batches, workers):
+    """
+    Validate ``batches`` in ``pool``, one batch per worker at a time.
+
+    ``Pool.imap`` would read the whole input ahead of the workers; taking
+    ``workers`` batches at a time keeps memory bounded by the batch size.
+    """
+    while True:
+        chunk = list(islice(batches, workers))
+        if not chunk:
+            return
+        yield from pool.imap(validate_batch, chunk)
+
+
+class ImportResult:
+    """Running totals for an import."""
+
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+
+    @property
+    def processed(self):
+        return self.imported + self.rejected
+
+
+def import_records(records, batch_size=DEFAULT_BATCH_SIZE, workers=1,
+                   on_error=None, on_progress=None):
+    """
+    Validate and insert ``(line, record)`` pairs.
+
+    ``on_error`` is called with each rejected row, ``on_progress`` with the
+    running ``ImportResult`` after every committed batch.  With
+    ``workers > 1`` validation runs in a process pool while the parent
+    process does the inserts; at most ``workers`` batches are read ahead.
+    """
+    result = ImportResult()
+    batches = batched(records, batch_size)
+
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker)
+        validated = _validate_in_pool(pool, batches, workers)
+    else:
+        validated = map(validate_batch, batches)
+
+    try:
+        for valid, rejected in validated:
+            if valid:
+                create_todos([Todo(**cleaned) for cleaned in valid])
+            result.imported += len(valid)
+            result.rejected += len(rejected)
+            if on_error:
+                for row in rejected:
+                    on_error(row)
+            if on_progress:
+                on_progress(result)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return result
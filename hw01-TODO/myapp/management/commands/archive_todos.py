@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from myapp import archive
+from myapp.sharding import get_shards, use_shard
+
+
+class Command(BaseCommand):
+    help = (
+        "Move old resolved TODOs into the archive table in batches, then purge "
+        "archived TODOs past the retention period. Safe to interrupt and rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=None, metavar='DAYS',
+            help=f"Archive TODOs resolved more than DAYS ago (default: {archive.get_archive_after_days()}).",
+        )
+        parser.add_argument(
+            '--retention', type=int, default=None, metavar='DAYS',
+            help=f"Purge TODOs archived more than DAYS ago (default: {archive.get_retention_days()}).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help=f"Rows per transaction (default: {archive.get_batch_size()}).",
+        )
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help="Stop after this many batches of each step; the next run carries on.",
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help="Seconds to sleep between batches so other writers get the lock.",
+        )
+        parser.add_argument('--no-purge', action='store_true', help="Only archive; do not purge.")
+
+    def handle(self, *args, **options):
+        batching = {
+            'batch_size': options['batch_size'],
+            'max_batches': options['max_batches'],
+            'pause': options['pause'],
+        }
+        moved = purged = 0
+        # Every owner, one shard at a time.
+        for shard in get_shards():
+            with use_shard(shard):
+                moved += archive.archive_resolved(older_than_days=options['older_than'], **batching)
+                if not options['no_purge']:
+                    purged += archive.purge_archive(retention_days=options['retention'], **batching)
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} TODO(s)."))
+        if not options['no_purge']:
+            self.stdout.write(self.style.SUCCESS(f"Purged {purged} archived TODO(s)."))
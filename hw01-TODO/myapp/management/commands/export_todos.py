@@ -0,0 +1,57 @@
+import sys
+from itertools import chain
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import export
+from myapp.models import Todo
+from myapp.sharding import get_shards, shard_for_owner
+
+
+class Command(BaseCommand):
+    help = "Stream every owner's Todo rows, shard by shard, to a CSV or NDJSON file (or stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(export.EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="Output file path (default: stdout).")
+        parser.add_argument('--is-resolved', help="Only export resolved (true) or pending (false) items.")
+        parser.add_argument('--due-after', help="Inclusive lower bound on due_date (ISO date or datetime).")
+        parser.add_argument('--due-before', help="Exclusive upper bound on due_date (ISO date or datetime).")
+        parser.add_argument('--chunk-size', type=int, default=export.DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--owner', help="Only export this owner's items ('' for anonymous).")
+
+    def handle(self, *args, **options):
+        owner = options['owner']
+        shards = get_shards() if owner is None else [shard_for_owner(owner)]
+        querysets = []
+        for shard in shards:
+            todos = Todo.all_owners.using(shard)
+            if owner is not None:
+                todos = todos.filter(owner=owner)
+            try:
+                querysets.append(export.filter_todos(
+                    todos,
+                    is_resolved=options['is_resolved'],
+                    due_after=options['due_after'],
+                    due_before=options['due_before'],
+                ))
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        rows = chain.from_iterable(
+            export.iter_rows(todos, chunk_size=options['chunk_size']) for todos in querysets
+        )
+        chunks = export.iter_export(options['format'], rows)
+        if not options['output']:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        lines = 0
+        with open(options['output'], 'w', encoding='utf-8', newline='') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+                lines += 1
+        if options['format'] == 'csv':
+            lines -= 1  # header
+        self.stderr.write(self.style.SUCCESS(f"Exported {lines} rows to {options['output']}."))
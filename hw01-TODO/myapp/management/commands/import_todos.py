@@ -0,0 +1,67 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Import Todo rows from a CSV or NDJSON file. Rows are validated with "
+        "TodoForm and inserted with bulk_create, one transaction per batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or NDJSON file to import.")
+        parser.add_argument('--format', choices=importer.IMPORT_FORMATS,
+                            help="Input format (default: guessed from the extension).")
+        parser.add_argument('--batch-size', type=int, default=importer.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Processes used to parse and validate rows.")
+        parser.add_argument('--errors',
+                            help="Where to write rejected rows as NDJSON "
+                                 "(default: <path>.errors.ndjson).")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        import_format = options['format'] or importer.detect_format(options['path'])
+        errors_path = options['errors'] or f"{options['path']}.errors.ndjson"
+        started = time.monotonic()
+
+        def report(result):
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stderr.write(
+                f"{result.processed} rows processed, {result.imported} imported, "
+                f"{result.rejected} rejected ({result.processed / elapsed:,.0f} rows/s)"
+            )
+
+        errors_fh = None
+
+        def write_error(row):
+            # Only a run with rejected rows leaves an errors file behind.
+            nonlocal errors_fh
+            if errors_fh is None:
+                errors_fh = open(errors_path, 'w', encoding='utf-8')
+            errors_fh.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as fh:
+                result = importer.import_records(
+                    importer.read_records(fh, import_format),
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    on_error=write_error,
+                    on_progress=report,
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if errors_fh is not None:
+                errors_fh.close()
+
+        message = f"Imported {result.imported} rows."
+        if result.rejected:
+            message += f" {result.rejected} rejected rows written to {errors_path}."
+        self.stdout.write(self.style.SUCCESS(message))
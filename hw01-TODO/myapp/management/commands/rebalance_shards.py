@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.sharding import get_shards, misplaced_owners, move_owner, shard_for_owner
+
+
+class Command(BaseCommand):
+    help = (
+        "Move an owner's TODOs to another shard and pin them there, or, with no "
+        "--owner, move rows found outside their owner's shard (e.g. after "
+        "TODO_SHARD_COUNT changed) back home."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', help="Username whose TODOs to move.")
+        parser.add_argument('--to', metavar='ALIAS', help="Shard to move the owner to.")
+        parser.add_argument(
+            '--dry-run', action='store_true', help="Only list the moves that would be made.",
+        )
+
+    def handle(self, *args, **options):
+        shards = get_shards()
+        if options['owner'] is not None:
+            if options['to'] not in shards:
+                raise CommandError(f"--to must be one of: {', '.join(shards)}.")
+            moves = [(options['owner'], shard_for_owner(options['owner']), options['to'])]
+        elif options['to']:
+            raise CommandError("--to needs --owner.")
+        else:
+            moves = list(misplaced_owners())
+
+        for owner, source, target in moves:
+            if options['dry_run']:
+                self.stdout.write(f"Would move {owner!r} from {source} to {target}.")
+                continue
+            try:
+                moved = move_owner(owner, target, source=source)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(
+                f"Moved {moved} TODO(s) of {owner!r} from {source} to {target}."
+            ))
+        if not moves:
+            self.stdout.write("Every owner is on its shard.")
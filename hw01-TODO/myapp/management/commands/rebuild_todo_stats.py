@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from myapp.models import Todo, TodoCounter
+from myapp.sharding import get_shards, use_shard
+from myapp.stats import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the Todo table and reset every owner's materialized header counters."
+
+    def handle(self, *args, **options):
+        total = resolved = 0
+        for shard in get_shards():
+            with use_shard(shard):
+                owners = set(Todo.all_owners.values_list('owner', flat=True).distinct())
+                owners.update(TodoCounter.objects.values_list('owner', flat=True))
+                owners.add('')
+                for owner in sorted(owners):
+                    stats = rebuild_counters(owner)
+                    total += stats['total']
+                    resolved += stats['resolved']
+        self.stdout.write(self.style.SUCCESS(
+            f"Counters rebuilt: {total} total, {resolved} resolved."
+        ))
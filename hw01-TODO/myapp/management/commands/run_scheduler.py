@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.scheduler import DueScheduler, get_reminder_lead, get_sync_interval
+from myapp.sharding import get_shards, use_shard
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire due-soon reminders and overdue notices at each pending todo's "
+        "due time, until interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lead', type=int, default=None,
+            help=f"Seconds before the due date to send the reminder (default: {get_reminder_lead()}).",
+        )
+        parser.add_argument(
+            '--sync-interval', type=float, default=None,
+            help=f"Seconds between checks for changed todos (default: {get_sync_interval()}).",
+        )
+        parser.add_argument(
+            '--database', default=None,
+            help="Shard to watch (default: the first); run one worker per shard.",
+        )
+
+    def handle(self, *args, **options):
+        shard = options['database'] or get_shards()[0]
+        if shard not in get_shards():
+            raise CommandError(f"{shard!r} is not one of TODO_SHARDS.")
+        scheduler = DueScheduler(reminder_lead=options['lead'], sync_interval=options['sync_interval'])
+        self.stdout.write(f"Scheduler running on {shard}; press Ctrl+C to stop.")
+        try:
+            with use_shard(shard):
+                scheduler.run()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Scheduler stopped."))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp.replicas import get_replicas, get_replication_lag, sync_replicas
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy each SQLite primary over its read replicas (TODO_READ_REPLICAS). "
+        "With --interval, keep doing so until interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help=(
+                "Seconds between refreshes; keep it well under TODO_REPLICATION_LAG "
+                f"({get_replication_lag()}s) or replicas are skipped as stale."
+            ),
+        )
+        parser.add_argument(
+            '--force', action='store_true', help="Copy even when the primary has not changed.",
+        )
+
+    def handle(self, *args, **options):
+        if not get_replicas():
+            self.stdout.write("No read replicas configured (set TODO_REPLICA_COUNT).")
+            return
+        try:
+            while True:
+                copied = sync_replicas(force=options['force'])
+                if copied or options['interval'] is None:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Refreshed {len(copied)} replica(s): {', '.join(copied) or 'none changed'}."
+                    ))
+                if options['interval'] is None:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Replica sync stopped."))
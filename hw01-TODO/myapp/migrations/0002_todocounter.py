@@ -0,0 +1,37 @@
+# Generated by Django 4.2.26 on 2026-10-17 06:18
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def seed_counter(apps, schema_editor):
+    Todo = apps.get_model('myapp', 'Todo')
+    TodoCounter = apps.get_model('myapp', 'TodoCounter')
+    counts = Todo.objects.aggregate(
+        total=Count('pk'),
+        resolved=Count('pk', filter=Q(is_resolved=True)),
+    )
+    TodoCounter.objects.update_or_create(pk=1, defaults=counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'TODO counter',
+                'verbose_name_plural': 'TODO counters',
+            },
+        ),
+        migrations.RunPython(seed_counter, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.26 on 2026-10-17 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0002_todocounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['due_date', 'created_at'], name='todo_due_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('is_resolved', False)), fields=['due_date'], name='todo_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['is_resolved', '-created_at'], name='todo_resolved_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['-created_at'], name='todo_created_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.26 on 2026-10-17 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_todo_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='todocounter',
+            name='modified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['updated_at'], name='todo_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# External-content FTS5 index over Todo.title/description.  Triggers keep
+# it in sync for every write path, including bulk and raw SQL ones.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE myapp_todo_fts USING fts5(
+        title, description,
+        content='myapp_todo', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER myapp_todo_fts_insert AFTER INSERT ON myapp_todo BEGIN
+        INSERT INTO myapp_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER myapp_todo_fts_delete AFTER DELETE ON myapp_todo BEGIN
+        INSERT INTO myapp_todo_fts(myapp_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER myapp_todo_fts_update AFTER UPDATE OF title, description ON myapp_todo
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+        INSERT INTO myapp_todo_fts(myapp_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO myapp_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    # Title matches weigh ten times as much as description matches.
+    "INSERT INTO myapp_todo_fts(myapp_todo_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO myapp_todo_fts(myapp_todo_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS myapp_todo_fts_insert',
+    'DROP TRIGGER IF EXISTS myapp_todo_fts_delete',
+    'DROP TRIGGER IF EXISTS myapp_todo_fts_update',
+    'DROP TABLE IF EXISTS myapp_todo_fts',
+]
+
+
+def run_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for sql in statements:
+                schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_counter_modified_at_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.26 on 2026-10-17 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_todo_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='todo',
+            name='todo_resolved_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='todo',
+            name='todo_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['is_resolved', 'created_at'], name='todo_resolved_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['created_at'], name='todo_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.26 on 2026-10-17 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_created_indexes_ascending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTodo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('due_date', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'archived TODO',
+                'verbose_name_plural': 'archived TODOs',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['archived_at'], name='archived_todo_archived_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.26 on 2026-10-17 07:46
+
+from importlib import import_module
+
+from django.db import migrations, models
+import myapp.sharding
+
+# SQLite adds the owner column by rebuilding myapp_todo, which drops the
+# full-text index triggers from 0005; put them back afterwards.
+todo_search = import_module('myapp.migrations.0005_todo_search')
+FTS_TRIGGERS = [sql for sql in todo_search.CREATE_SQL if 'CREATE TRIGGER' in sql]
+DROP_FTS_TRIGGERS = [sql for sql in todo_search.DROP_SQL if 'DROP TRIGGER' in sql]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_archivedtodo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnerShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(max_length=150, unique=True)),
+                ('shard', models.CharField(max_length=100)),
+            ],
+            options={
+                'verbose_name': 'owner shard',
+                'verbose_name_plural': 'owner shards',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='todo',
+            name='todo_due_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='todo',
+            name='todo_resolved_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='todo',
+            name='todo_created_idx',
+        ),
+        migrations.AddField(
+            model_name='archivedtodo',
+            name='owner',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.RunPython(
+            todo_search.run_sqlite(DROP_FTS_TRIGGERS), todo_search.run_sqlite(FTS_TRIGGERS),
+        ),
+        migrations.AddField(
+            model_name='todo',
+            name='owner',
+            field=models.CharField(blank=True, default=myapp.sharding.default_owner, editable=False, help_text="Username of the owner ('' for anonymous); decides the shard", max_length=150),
+        ),
+        migrations.RunPython(
+            todo_search.run_sqlite(FTS_TRIGGERS), todo_search.run_sqlite(DROP_FTS_TRIGGERS),
+        ),
+        migrations.AddField(
+            model_name='todocounter',
+            name='owner',
+            field=models.CharField(default='', max_length=150, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['owner', 'due_date', 'created_at'], name='todo_owner_due_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['owner', 'is_resolved', 'created_at'], name='todo_owner_resolved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['owner', 'created_at'], name='todo_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('is_resolved', False)), fields=['owner', 'due_date'], name='todo_owner_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['owner', 'updated_at'], name='todo_owner_updated_idx'),
+        ),
+    ]
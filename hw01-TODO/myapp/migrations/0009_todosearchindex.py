@@ -0,0 +1,26 @@
+# Generated by Django 4.2.26 on 2026-10-17 09:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_todo_owner_sharding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoSearchIndex',
+            fields=[
+                ('todo', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='myapp.todo')),
+                ('document', models.TextField(db_column='myapp_todo_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'myapp_todo_fts',
+                'managed': False,
+            },
+        ),
+    ]
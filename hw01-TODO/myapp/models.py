@@ -1,6 +1,65 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Case, ExpressionWrapper, F, Value, When
 from django.utils import timezone
 
+from . import replicas, sharding
+
+
+class ConcurrentUpdateError(Exception):
+    """A conditional save found the row changed (or deleted) since it was read."""
+
+
+class TodoQuerySet(models.QuerySet):
+    """QuerySet with helpers shared by the list views."""
+
+    def with_due_status(self, now=None):
+        """
+        Annotate ``overdue`` and ``time_remaining`` against a single ``now``.
+
+        Computing both in SQL means every row of a page agrees on the
+        current time and templates never call ``timezone.now()`` per row.
+        ``time_remaining`` is negative for past due dates and ``None`` when
+        there is no due date.
+        """
+        if now is None:
+            now = timezone.now()
+        return self.annotate(
+            overdue=Case(
+                When(is_resolved=False, due_date__lt=now, then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+            time_remaining=ExpressionWrapper(
+                F('due_date') - Value(now, output_field=models.DateTimeField()),
+                output_field=models.DurationField(),
+            ),
+        )
+
+
+class OwnedManager(models.Manager):
+    """
+    Manager limited to the current owner's rows, bound to their shard.
+
+    See ``myapp.sharding``: outside any scope that is the anonymous owner
+    on the first shard, and inside ``use_shard()`` every owner on that
+    shard.  Binding the shard (or, in ``replica_reads`` views, its replica)
+    when the queryset is built keeps lazily evaluated (e.g. streamed)
+    querysets on it after the scope has ended.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        owner = sharding.current_owner()
+        if owner is not None:
+            queryset = queryset.filter(owner=owner)
+        if self._db is None:
+            queryset = queryset.using(replicas.read_alias(sharding.current_shard()))
+        return queryset
+
+
+class TodoManager(OwnedManager.from_queryset(TodoQuerySet)):
+    pass
+
 
 class Todo(models.Model):
     """
@@ -12,17 +71,220 @@ class Todo(models.Model):
     is_resolved = models.BooleanField(default=False, help_text="Whether the TODO is completed")
     created_at = models.DateTimeField(auto_now_add=True, help_text="When the TODO was created")
     updated_at = models.DateTimeField(auto_now=True, help_text="When the TODO was last updated")
+    owner = models.CharField(
+        max_length=150, blank=True, default=sharding.default_owner, editable=False,
+        help_text="Username of the owner ('' for anonymous); decides the shard",
+    )
+
+    objects = TodoManager()
+    # Every owner's rows on the current shard, for maintenance code.
+    all_owners = TodoQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = "TODO"
         verbose_name_plural = "TODOs"
+        indexes = [
+            # List queries are always limited to one owner, so the list
+            # indexes lead with it.
+            # Keyset pagination of the list: dated rows walk (due_date,
+            # created_at), undated rows walk the due_date IS NULL prefix.
+            models.Index(fields=['owner', 'due_date', 'created_at'], name='todo_owner_due_created_idx'),
+            # Overdue counts and upcoming-deadline scans only look at
+            # pending rows: per owner for the list, across owners for the
+            # scheduler.
+            models.Index(
+                fields=['owner', 'due_date'],
+                condition=models.Q(is_resolved=False),
+                name='todo_owner_pending_due_idx',
+            ),
+            models.Index(
+                fields=['due_date'],
+                condition=models.Q(is_resolved=False),
+                name='todo_pending_due_idx',
+            ),
+            # Admin and list filtered by is_resolved, ordered by created_at.
+            # Ascending columns (plus the implicit trailing rowid) serve
+            # both (created_at, id) and (-created_at, -id) without a sort.
+            models.Index(
+                fields=['owner', 'is_resolved', 'created_at'], name='todo_owner_resolved_idx',
+            ),
+            # Default Meta ordering, newest/oldest list sorts and the admin
+            # date hierarchy.
+            models.Index(fields=['owner', 'created_at'], name='todo_owner_created_idx'),
+            # MAX(updated_at) for conditional GET freshness checks, per
+            # owner and across owners.
+            models.Index(fields=['owner', 'updated_at'], name='todo_owner_updated_idx'),
+            models.Index(fields=['updated_at'], name='todo_updated_idx'),
+        ]
     
     def __str__(self):
         return self.title
+
+    def save_changes(self, fields, expected_updated_at=None):
+        """
+        Write only ``fields`` (plus ``updated_at``) back to the row.
+
+        With ``expected_updated_at`` the UPDATE also requires the row's
+        ``updated_at`` to still match, and ``ConcurrentUpdateError`` is
+        raised instead of overwriting someone else's edit.  Returns
+        ``False`` without a query when there is nothing to write.
+        """
+        fields = [name for name in fields if name != 'updated_at']
+        if not fields:
+            return False
+        self._expected_updated_at = expected_updated_at
+        try:
+            # A savepoint keeps a conflict from breaking the caller's transaction.
+            with transaction.atomic(using=router.db_for_write(Todo, instance=self)):
+                self.save(update_fields=[*fields, 'updated_at'])
+        finally:
+            del self._expected_updated_at
+        return True
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = getattr(self, '_expected_updated_at', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        updated = super()._do_update(
+            base_qs.filter(updated_at=expected), using, pk_val, values, update_fields, forced_update,
+        )
+        if not updated:
+            raise ConcurrentUpdateError(f'Todo {pk_val} was changed by another request.')
+        return updated
     
-    def is_overdue(self):
-        """Check if the TODO is overdue."""
+    def is_overdue(self, now=None):
+        """
+        Check if the TODO is overdue.
+
+        Uses the ``overdue`` annotation from ``with_due_status()`` when the
+        instance was loaded with it.
+        """
+        if 'overdue' in self.__dict__:
+            return self.overdue
         if self.due_date and not self.is_resolved:
-            return timezone.now() > self.due_date
+            return (now or timezone.now()) > self.due_date
         return False
+
+    def seconds_until_due(self, now=None):
+        """
+        Seconds until the due date (negative once past), or ``None``.
+
+        Uses the ``time_remaining`` annotation when present.
+        """
+        if 'time_remaining' in self.__dict__:
+            remaining = self.time_remaining
+        elif self.due_date:
+            remaining = self.due_date - (now or timezone.now())
+        else:
+            remaining = None
+        return None if remaining is None else int(remaining.total_seconds())
+
+
+class Match(models.Lookup):
+    """``column MATCH query`` against an SQLite FTS5 table."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TodoSearchIndex(models.Model):
+    """
+    The ``myapp_todo_fts`` full-text index (``myapp.0005_todo_search``).
+
+    Read-only and maintained by triggers; mapped so the ORM can join a
+    todo to its index entry, filter on ``MATCH`` and order by ``rank``
+    (see ``myapp.search``).
+    """
+    todo = models.OneToOneField(
+        Todo, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_index',
+    )
+    # FTS5's hidden column named after the table: MATCH on it searches
+    # every indexed column.
+    document = models.TextField(db_column='myapp_todo_fts')
+    # BM25 score for the current MATCH, lower is better.
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'myapp_todo_fts'
+
+
+TodoSearchIndex._meta.get_field('document').register_lookup(Match)
+
+
+class TodoCounter(models.Model):
+    """
+    Materialized row counts for the TODO table.
+
+    One row per owner, on the owner's shard, kept in sync by the signal
+    handlers in ``myapp.signals`` so the list header never has to scan
+    ``Todo``.
+    """
+    owner = models.CharField(max_length=150, unique=True, default='')
+    total = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    # Touched on every counter change, so deletions (which leave no
+    # updated_at behind) still move the list's Last-Modified time.
+    modified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "TODO counter"
+        verbose_name_plural = "TODO counters"
+
+    def __str__(self):
+        return f"{self.total} total, {self.resolved} resolved"
+
+
+class ArchivedTodo(models.Model):
+    """
+    A resolved TODO moved out of ``Todo`` by ``myapp.archive``.
+
+    Keeps the original id and timestamps; ``updated_at`` is when it was
+    last changed (usually resolved) before being archived.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.CharField(max_length=150, blank=True, default='')
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    due_date = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    objects = OwnedManager()
+    all_owners = models.Manager()
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = "archived TODO"
+        verbose_name_plural = "archived TODOs"
+        indexes = [
+            # Retention purge walks the oldest archived rows first.
+            models.Index(fields=['archived_at'], name='archived_todo_archived_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class OwnerShard(models.Model):
+    """
+    Shard an owner was moved to by ``rebalance_shards``.
+
+    Lives on ``default``; owners without a row are placed by hash (see
+    ``myapp.sharding.shard_for_owner``).
+    """
+    owner = models.CharField(max_length=150, unique=True)
+    shard = models.CharField(max_length=100)
+
+    class Meta:
+        verbose_name = "owner shard"
+        verbose_name_plural = "owner shards"
+
+    def __str__(self):
+        return f"{self.owner or '(anonymous)'} -> {self.shard}"
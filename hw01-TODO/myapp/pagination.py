@@ -0,0 +1,257 @@
+"""
+Keyset (cursor) pagination for TODO lists.
+
+Rows are ordered by ``(due_date, created_at, id)`` with NULL due dates
+sorted last, or by ``(created_at, id)`` in either direction.  Each page is
+fetched with a ``WHERE`` clause that seeks past the boundary row of the
+previous page instead of an ``OFFSET``, so page N costs the same as page 1.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = 'myapp.pagination.cursor'
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_MAX_PAGE_SIZE = 200
+
+# Rows with a due date come first, then rows without one.  Each segment is
+# read separately so that both walk the (due_date, created_at) index in
+# order; a single ``NULLS LAST`` ordering would force SQLite to sort.
+DATED_ORDERING = ('due_date', 'created_at', 'id')
+UNDATED_ORDERING = ('created_at', 'id')
+
+# Sort keys accepted by ``paginate``.  ``due`` is the default list order;
+# the others walk the created_at index.
+SORT_KEYS = ('due', 'newest', 'oldest')
+DEFAULT_SORT = 'due'
+
+
+def get_page_size(value=None):
+    """Return a page size clamped to ``TODO_MAX_PAGE_SIZE``."""
+    default = getattr(settings, 'TODO_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    maximum = getattr(settings, 'TODO_MAX_PAGE_SIZE', DEFAULT_MAX_PAGE_SIZE)
+    try:
+        size = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def encode_cursor(todo, direction, sort=DEFAULT_SORT):
+    """Build an opaque, signed cursor pointing at ``todo``."""
+    payload = {
+        'd': todo.due_date.isoformat() if todo.due_date else None,
+        'c': todo.created_at.isoformat(),
+        'i': todo.pk,
+        'r': direction,
+        's': sort,
+    }
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token, sort=DEFAULT_SORT):
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Returns a ``(due_date, created_at, id, direction)`` tuple, or ``None``
+    when the token is missing, tampered with, malformed or was issued for
+    a different ``sort``.
+    """
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=CURSOR_SALT)
+        if payload.get('s', DEFAULT_SORT) != sort:
+            return None
+        due_date = datetime.fromisoformat(payload['d']) if payload['d'] else None
+        created_at = datetime.fromisoformat(payload['c'])
+        direction = payload['r']
+        if direction not in ('next', 'prev'):
+            return None
+        return due_date, created_at, int(payload['i']), direction
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+# Each predicate leads with an inclusive range on the first sort column so
+# SQLite can seek into the index and walk it in order from there.
+
+def _dated_after(due_date, created_at, pk):
+    """Q matching dated rows that sort strictly after the given key."""
+    return Q(due_date__gte=due_date) & (
+        Q(due_date__gt=due_date)
+        | Q(created_at__gt=created_at)
+        | Q(created_at=created_at, id__gt=pk)
+    )
+
+
+def _dated_before(due_date, created_at, pk):
+    """Q matching dated rows that sort strictly before the given key."""
+    return Q(due_date__lte=due_date) & (
+        Q(due_date__lt=due_date)
+        | Q(created_at__lt=created_at)
+        | Q(created_at=created_at, id__lt=pk)
+    )
+
+
+def _created_after(created_at, pk):
+    """Q matching rows after the given ``(created_at, id)`` key."""
+    return Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(id__gt=pk))
+
+
+def _created_before(created_at, pk):
+    """Q matching rows before the given ``(created_at, id)`` key."""
+    return Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(id__lt=pk))
+
+
+def _descending(ordering):
+    return ['-' + field for field in ordering]
+
+
+class CursorPage:
+    """A single page of results plus the cursors to its neighbours."""
+
+    def __init__(self, items, has_next, has_previous, page_size, sort=DEFAULT_SORT):
+        self.items = items
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.page_size = page_size
+        self.sort = sort
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.items:
+            return encode_cursor(self.items[-1], 'next', self.sort)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.items:
+            return encode_cursor(self.items[0], 'prev', self.sort)
+        return None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+# Fetching is split into planning (which ordered querysets to read, in
+# turn, until the page is full) and reading, so that ``paginate`` and
+# ``apaginate`` share the planning and differ only in how rows are read.
+
+def _forward_plan(queryset, key):
+    """Querysets yielding the rows after ``key`` in list order."""
+    dated = queryset.filter(due_date__isnull=False)
+    undated = queryset.filter(due_date__isnull=True)
+
+    if key is not None and key[0] is None:
+        # Already inside the undated tail.
+        return [undated.filter(_created_after(key[1], key[2])).order_by(*UNDATED_ORDERING)]
+
+    if key is not None:
+        dated = dated.filter(_dated_after(*key))
+    return [dated.order_by(*DATED_ORDERING), undated.order_by(*UNDATED_ORDERING)]
+
+
+def _backward_plan(queryset, key):
+    """Querysets yielding the rows before ``key``, nearest first."""
+    dated = queryset.filter(due_date__isnull=False)
+    undated = queryset.filter(due_date__isnull=True)
+
+    if key[0] is not None:
+        return [dated.filter(_dated_before(*key)).order_by(*_descending(DATED_ORDERING))]
+
+    undated = undated.filter(_created_before(key[1], key[2]))
+    return [
+        undated.order_by(*_descending(UNDATED_ORDERING)),
+        dated.order_by(*_descending(DATED_ORDERING)),
+    ]
+
+
+def _created_plan(queryset, key, ascending):
+    """Querysets yielding the rows after ``key`` in ``(created_at, id)`` order."""
+    if key is not None:
+        after = _created_after if ascending else _created_before
+        queryset = queryset.filter(after(key[1], key[2]))
+    ordering = UNDATED_ORDERING if ascending else _descending(UNDATED_ORDERING)
+    return [queryset.order_by(*ordering)]
+
+
+def _plan(queryset, cursor, sort):
+    """
+    Return ``(querysets, direction)`` for the page starting at ``cursor``.
+
+    ``direction`` is ``None`` for the first page, else ``'next'`` or
+    ``'prev'``.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f'Unknown sort key: {sort!r}')
+    decoded = decode_cursor(cursor, sort)
+    key, direction = (decoded[:3], decoded[3]) if decoded else (None, None)
+    backward = direction == 'prev'
+    if sort == 'due':
+        if backward:
+            return _backward_plan(queryset, key), direction
+        return _forward_plan(queryset, key), direction
+    ascending = (sort == 'oldest') != backward
+    return _created_plan(queryset, key, ascending), direction
+
+
+def _read(querysets, limit):
+    """Read up to ``limit`` rows from ``querysets`` in turn."""
+    rows = []
+    for queryset in querysets:
+        if len(rows) >= limit:
+            break
+        rows += list(queryset[:limit - len(rows)])
+    return rows
+
+
+async def _aread(querysets, limit):
+    """Async counterpart of ``_read``."""
+    rows = []
+    for queryset in querysets:
+        if len(rows) >= limit:
+            break
+        rows += [row async for row in queryset[:limit - len(rows)]]
+    return rows
+
+
+def _make_page(rows, direction, size, sort):
+    if direction is None:
+        return CursorPage(rows[:size], len(rows) > size, False, size, sort)
+    if direction == 'next':
+        return CursorPage(rows[:size], len(rows) > size, True, size, sort)
+    items = rows[:size]
+    items.reverse()
+    return CursorPage(items, True, len(rows) > size, size, sort)
+
+
+def paginate(queryset, cursor=None, page_size=None, sort=DEFAULT_SORT):
+    """
+    Return a ``CursorPage`` of ``queryset`` starting at ``cursor``.
+
+    ``queryset`` may carry its own filters; ordering is always replaced by
+    the keyset ordering for ``sort`` so the cursor comparison stays valid.
+    A page costs one query, or two when a ``due`` page straddles the
+    dated/undated boundary.  A cursor issued for another sort order is
+    ignored and the first page is returned.
+    """
+    size = get_page_size(page_size)
+    querysets, direction = _plan(queryset, cursor, sort)
+    return _make_page(_read(querysets, size + 1), direction, size, sort)
+
+
+async def apaginate(queryset, cursor=None, page_size=None, sort=DEFAULT_SORT):
+    """Async counterpart of ``paginate``, reading rows with the async ORM."""
+    size = get_page_size(page_size)
+    querysets, direction = _plan(queryset, cursor, sort)
+    return _make_page(await _aread(querysets, size + 1), direction, size, sort)
@@ -0,0 +1,300 @@
+"""
+Request-level performance instrumentation.
+
+``PerformanceMiddleware`` measures each request's wall time, SQL query
+count and time, and template render time.  The numbers are written as
+one JSON log line on the ``myapp.perf`` logger and aggregated per URL
+name.  When ``TODO_PERF_EXPOSE`` is on (by default only with ``DEBUG``)
+they are also sent back in a ``Server-Timing`` header and served by the
+local ``/metrics/`` endpoint.
+
+Queries are counted by an execute wrapper installed on every database
+connection as it opens; templates are timed by ``TimedDjangoTemplates``,
+a drop-in for the Django template backend.  Both report into the
+current request's ``RequestStats`` through a context variable, which
+``sync_to_async`` carries into worker threads.
+"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, JsonResponse
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+logger = logging.getLogger('myapp.perf')
+
+DEFAULT_SAMPLE_SIZE = 1000
+
+DEFAULT_REPEAT_THRESHOLD = 3
+
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+_current = ContextVar('myapp_perf_request', default=None)
+
+
+class RequestStats:
+    """Timings collected while one request is handled."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.statements = Counter()
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.start
+
+    def repeated_queries(self, threshold):
+        """Statements run at least ``threshold`` times: likely N+1 loops."""
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+
+def record_query(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook counting and timing queries."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - start
+        stats.queries += 1
+        # ``sql`` still has its placeholders, so a query repeated with
+        # different parameters counts as the same statement.
+        stats.statements[sql] += 1
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Count the queries of every connection (the wrapper is a no-op outside requests)."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    """Backend template that adds its render time to the current request."""
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, with render times reported to the
+    performance middleware.  Includes and extends run inside the
+    top-level render, so they are not counted twice.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[rank - 1]
+
+
+class Metrics:
+    """
+    Per-URL-name request metrics for this process.
+
+    Keeps running totals plus the most recent ``sample_size`` durations,
+    from which the percentiles are computed when read.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def _route(self, name):
+        route = self._routes.get(name)
+        if route is None:
+            route = self._routes[name] = {
+                'count': 0,
+                'errors': 0,
+                'queries': 0,
+                'db_ms': 0.0,
+                'template_ms': 0.0,
+                'repeated_queries': 0,
+                'samples': deque(maxlen=self.sample_size),
+            }
+        return route
+
+    def record(self, name, status, stats, repeated):
+        duration_ms = stats.duration * 1000
+        with self._lock:
+            route = self._route(name)
+            route['count'] += 1
+            route['errors'] += status >= 500
+            route['queries'] += stats.queries
+            route['db_ms'] += stats.db_time * 1000
+            route['template_ms'] += stats.template_time * 1000
+            route['repeated_queries'] += bool(repeated)
+            route['samples'].append(duration_ms)
+
+    def snapshot(self):
+        """Return a JSON-serializable summary of every route."""
+        with self._lock:
+            routes = {name: {**route, 'samples': sorted(route['samples'])}
+                      for name, route in self._routes.items()}
+        summary = {}
+        for name, route in sorted(routes.items()):
+            samples = route.pop('samples')
+            count = route['count']
+            summary[name] = {
+                **route,
+                'db_ms': round(route['db_ms'], 3),
+                'template_ms': round(route['template_ms'], 3),
+                'queries_per_request': round(route['queries'] / count, 2),
+                'p50_ms': _round(percentile(samples, 0.50)),
+                'p95_ms': _round(percentile(samples, 0.95)),
+                'p99_ms': _round(percentile(samples, 0.99)),
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+metrics = Metrics(getattr(settings, 'TODO_PERF_SAMPLE_SIZE', DEFAULT_SAMPLE_SIZE))
+
+
+def get_repeat_threshold():
+    return getattr(settings, 'TODO_PERF_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+
+
+def is_exposed():
+    """Whether timings may be shown to clients (``Server-Timing``, ``/metrics/``)."""
+    return getattr(settings, 'TODO_PERF_EXPOSE', settings.DEBUG)
+
+
+def server_timing(stats):
+    """Format ``stats`` as a ``Server-Timing`` header value."""
+    return (
+        f'app;dur={stats.duration * 1000:.1f}, '
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+        f'tpl;dur={stats.template_time * 1000:.1f}'
+    )
+
+
+def _route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else '<unresolved>'
+
+
+class PerformanceMiddleware:
+    """
+    Time each request and report it through the ``myapp.perf`` logger,
+    the ``/metrics/`` endpoint and, when ``TODO_PERF_EXPOSE`` is on,
+    ``Server-Timing``.
+
+    Statements repeated ``TODO_PERF_REPEAT_THRESHOLD`` times or more in a
+    single request are logged as a warning, since they usually come from
+    a query inside a loop.  Streaming responses are measured up to the
+    point their headers are ready.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    def finish(self, request, response, stats):
+        name = _route_name(request)
+        repeated = stats.repeated_queries(get_repeat_threshold())
+        if is_exposed():
+            response['Server-Timing'] = server_timing(stats)
+        metrics.record(name, response.status_code, stats, repeated)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': name,
+            'status': response.status_code,
+            'duration_ms': round(stats.duration * 1000, 3),
+            'queries': stats.queries,
+            'db_ms': round(stats.db_time * 1000, 3),
+            'template_ms': round(stats.template_time * 1000, 3),
+        }))
+        for sql, count in repeated.items():
+            logger.warning(json.dumps({
+                'event': 'repeated_query',
+                'route': name,
+                'path': request.path,
+                'count': count,
+                'sql': sql,
+            }))
+        return response
+
+
+def metrics_view(request):
+    """
+    Aggregated request metrics for this process, as JSON.
+
+    Only answered when ``TODO_PERF_EXPOSE`` is on, and then only for
+    loopback addresses and ``INTERNAL_IPS``: behind a proxy on the same
+    host every request comes from loopback, so the address alone is not
+    enough.
+    """
+    if not is_exposed():
+        raise Http404
+    remote = request.META.get('REMOTE_ADDR')
+    if remote not in LOCAL_ADDRESSES and remote not in getattr(settings, 'INTERNAL_IPS', ()):
+        raise Http404
+    return JsonResponse({'routes': metrics.snapshot()})
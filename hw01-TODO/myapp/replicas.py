@@ -0,0 +1,229 @@
+"""
+Read replicas for the read-heavy TODO pages.
+
+``TODO_READ_REPLICAS`` maps each primary alias (each shard) to database
+aliases holding copies of it.  Views decorated with ``replica_reads``
+(the list with its stats, the export and the archive search) read TODO
+data from one of them on GET; everything else, and every write, uses
+the primary.
+
+Replicas trail the primary, so reads go back to the primary when:
+
+- the request already wrote something;
+- the client wrote something in the last ``TODO_REPLICATION_LAG``
+  seconds.  ``ReplicaMiddleware`` marks it with a short-lived cookie,
+  so after e.g. the redirect from ``todo_create`` the list always shows
+  the new todo;
+- the replica is a file last refreshed more than ``TODO_REPLICATION_LAG``
+  seconds ago, or never (see ``manage.py sync_replicas``).
+
+One replica is picked per primary per request, so a page never mixes
+two copies.
+"""
+import os
+import random
+import sqlite3
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_REPLICATION_LAG = 5     # seconds
+
+STICKY_COOKIE = 'todo_primary'
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Per-request state shared with threads the request hops to: whether
+# this request or client wrote recently, and the replica picked per
+# primary.  ``None`` outside requests, where reads use the primary.
+_state = ContextVar('myapp_replica_state', default=None)
+
+_reading = ContextVar('myapp_replica_reading', default=False)
+
+
+def get_replicas():
+    return getattr(settings, 'TODO_READ_REPLICAS', {})
+
+
+def get_replication_lag():
+    """Seconds a replica may trail its primary before reads avoid it."""
+    return getattr(settings, 'TODO_REPLICATION_LAG', DEFAULT_REPLICATION_LAG)
+
+
+def primary_of(alias):
+    """The primary ``alias`` is a replica of, or ``alias`` itself."""
+    for primary, replicas in get_replicas().items():
+        if alias in replicas:
+            return primary
+    return alias
+
+
+def file_age(name, now=None):
+    """Seconds since the SQLite file ``name`` was written, or ``None`` if it is not a file."""
+    try:
+        modified = os.stat(name).st_mtime
+    except (OSError, TypeError, ValueError):
+        return None
+    return (now or time.time()) - modified
+
+
+def _database_name(alias):
+    name = connections.settings.get(alias, {}).get('NAME')
+    return None if name is None else str(name)
+
+
+def is_fresh(alias):
+    """
+    Whether replica ``alias`` is recent enough to read from.
+
+    File replicas count as fresh for ``TODO_REPLICATION_LAG`` seconds
+    after ``sync_replicas`` last refreshed them, and not at all before
+    the first copy; others (in-memory test databases) always do.
+    """
+    name = _database_name(alias)
+    if name is None or name == ':memory:' or name.startswith('file:'):
+        return True
+    age = file_age(name)
+    return age is not None and age <= get_replication_lag()
+
+
+def is_usable(alias, primary):
+    """
+    Whether reads may go to replica ``alias`` of ``primary``.
+
+    A replica naming the primary's own database (as test mirrors do)
+    would only add a second connection to it, and one that cannot see
+    the primary's open transaction, so it is skipped.
+    """
+    return _database_name(alias) != _database_name(primary) and is_fresh(alias)
+
+
+def note_write():
+    """Send the rest of this request, and the client's next requests, to the primary."""
+    state = _state.get()
+    if state is not None:
+        state['wrote'] = True
+
+
+def reading_from_replica():
+    """Whether reads made now may go to a replica (before picking one)."""
+    state = _state.get()
+    return bool(_reading.get() and state is not None and not state['wrote'] and not state['sticky'])
+
+
+def read_alias(primary):
+    """The alias to read ``primary``'s data from in the current context."""
+    replicas = get_replicas().get(primary)
+    if not replicas or not reading_from_replica():
+        return primary
+    chosen = _state.get()['chosen']
+    if primary not in chosen:
+        usable = [alias for alias in replicas if is_usable(alias, primary)]
+        chosen[primary] = random.choice(usable) if usable else primary
+    return chosen[primary]
+
+
+def replica_reads(view):
+    """Let ``view`` read TODO data from a replica on GET and HEAD requests."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            token = _reading.set(request.method in SAFE_METHODS)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _reading.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _reading.set(request.method in SAFE_METHODS)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _reading.reset(token)
+    return wrapper
+
+
+class ReplicaMiddleware:
+    """
+    Give each request its replica state and keep writers on the primary.
+
+    A response to a request that wrote TODO data sets a cookie lasting
+    ``TODO_REPLICATION_LAG`` seconds; while it is present the client's
+    reads use the primary.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        return _state.set({
+            'wrote': False,
+            'sticky': STICKY_COOKIE in request.COOKIES,
+            'chosen': {},
+        })
+
+    def _finish(self, token, response):
+        state = _state.get()
+        _state.reset(token)
+        if state['wrote'] and get_replicas():
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=get_replication_lag(), httponly=True, samesite='Lax',
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self._start(request)
+        return self._finish(token, self.get_response(request))
+
+    async def __acall__(self, request):
+        token = self._start(request)
+        return self._finish(token, await self.get_response(request))
+
+
+def copy_database(source, target):
+    """Copy the SQLite database file ``source`` over ``target`` with the backup API."""
+    source_db, target_db = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        source_db.backup(target_db)
+    finally:
+        source_db.close()
+        target_db.close()
+    # The backup may leave the file untouched when nothing changed; the
+    # modification time is what marks the replica fresh.
+    os.utime(target)
+
+
+def sync_replicas(force=False):
+    """
+    Refresh every file replica from its primary; returns the aliases copied.
+
+    Replicas whose primary has not been written since the last copy are
+    only marked fresh.
+    """
+    copied = []
+    for primary, replicas in get_replicas().items():
+        source = str(connections.settings[primary]['NAME'])
+        # In WAL mode recent commits only touch the -wal file.
+        ages = [age for age in (file_age(source), file_age(f'{source}-wal')) if age is not None]
+        for alias in replicas:
+            target = str(connections.settings[alias]['NAME'])
+            replica_age = file_age(target)
+            if force or replica_age is None or min(ages, default=0) <= replica_age:
+                copy_database(source, target)
+                copied.append(alias)
+            else:
+                os.utime(target)
+    return copied
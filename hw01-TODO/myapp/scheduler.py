@@ -0,0 +1,187 @@
+"""
+Due-date reminders and overdue notices, fired by a long-running worker.
+
+``DueScheduler`` keeps the upcoming deadlines of pending todos in a heap
+and sleeps until the earliest one, so notices go out at the due time
+without the table ever being scanned:
+
+- deadlines are loaded ``TODO_SCHEDULER_HORIZON`` seconds at a time with
+  one range query on the partial ``(due_date) WHERE NOT is_resolved``
+  index;
+- between deadlines only rows whose ``updated_at`` moved since the last
+  sync are read (``updated_at`` index).  That picks up creates, edits,
+  toggles and bulk updates made by any process;
+- the entries about to fire are re-read by primary key, so todos
+  deleted, resolved or moved since the last sync are skipped.
+
+Each todo gets ``todo_due_soon`` ``TODO_REMINDER_LEAD`` seconds before
+its due date and ``todo_overdue`` at the due date.  Only deadlines that
+pass while the worker runs are announced.  A scheduler covers every
+owner on the current shard; run one ``manage.py run_scheduler
+--database ALIAS`` per shard.
+"""
+import heapq
+import itertools
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Todo
+from .signals import todo_due_soon, todo_overdue
+
+logger = logging.getLogger('myapp.scheduler')
+
+DEFAULT_REMINDER_LEAD = 900     # seconds before the due date
+DEFAULT_HORIZON = 86400         # seconds of deadlines held in memory
+DEFAULT_SYNC_INTERVAL = 5       # seconds between checks for changed rows
+
+# Re-read rows a little older than the newest ``updated_at`` seen, so a
+# write that committed late with an earlier timestamp is not missed.
+SYNC_OVERLAP = timedelta(seconds=2)
+
+DUE_SOON = 'due_soon'
+OVERDUE = 'overdue'
+
+SIGNALS = {DUE_SOON: todo_due_soon, OVERDUE: todo_overdue}
+
+
+def get_reminder_lead():
+    return getattr(settings, 'TODO_REMINDER_LEAD', DEFAULT_REMINDER_LEAD)
+
+
+def get_horizon():
+    return getattr(settings, 'TODO_SCHEDULER_HORIZON', DEFAULT_HORIZON)
+
+
+def get_sync_interval():
+    return getattr(settings, 'TODO_SCHEDULER_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)
+
+
+class DueScheduler:
+    """
+    Heap of upcoming reminder and overdue times for pending todos.
+
+    ``run()`` drives it in real time; ``start()``, ``sync()``,
+    ``extend()`` and ``run_pending()`` take an explicit ``now`` so they
+    can be stepped through in tests.
+    """
+
+    def __init__(self, reminder_lead=None, horizon=None, sync_interval=None):
+        self.reminder_lead = timedelta(
+            seconds=get_reminder_lead() if reminder_lead is None else reminder_lead)
+        self.horizon = timedelta(seconds=get_horizon() if horizon is None else horizon)
+        self.sync_interval = get_sync_interval() if sync_interval is None else sync_interval
+        self.heap = []
+        # pk -> (due_date, generation) of the live schedule; heap entries
+        # from older generations are skipped when they surface.
+        self.deadlines = {}
+        self.generations = itertools.count()
+        self.loaded_until = None
+        self.synced_at = None
+
+    def schedule(self, pk, due_date):
+        generation = next(self.generations)
+        self.deadlines[pk] = (due_date, generation)
+        heapq.heappush(self.heap, (due_date - self.reminder_lead, generation, pk, DUE_SOON, due_date))
+        heapq.heappush(self.heap, (due_date, generation, pk, OVERDUE, due_date))
+
+    def unschedule(self, pk):
+        self.deadlines.pop(pk, None)
+
+    def start(self, now):
+        """Note the newest write, then load the first window of deadlines."""
+        # Read the watermark first: a write landing in between is then
+        # seen twice (harmless) rather than not at all.
+        self.synced_at = (
+            Todo.all_owners.order_by('-updated_at').values_list('updated_at', flat=True).first() or now
+        )
+        self.loaded_until = now
+        return self.extend(now)
+
+    def extend(self, now):
+        """
+        Load pending deadlines up to ``now + horizon`` once half of the
+        loaded window has passed; returns how many were scheduled.
+        """
+        end = now + self.horizon
+        if self.loaded_until - now > self.horizon / 2:
+            return 0
+        rows = list(
+            Todo.all_owners
+            .filter(is_resolved=False, due_date__gte=self.loaded_until, due_date__lt=end)
+            .values_list('pk', 'due_date')
+        )
+        for pk, due_date in rows:
+            self.schedule(pk, due_date)
+        self.loaded_until = end
+        return len(rows)
+
+    def sync(self, now):
+        """Apply the rows written since the last sync; returns how many were read."""
+        rows = list(
+            Todo.all_owners
+            .filter(updated_at__gte=self.synced_at - SYNC_OVERLAP)
+            .values_list('pk', 'due_date', 'is_resolved', 'updated_at')
+        )
+        for pk, due_date, is_resolved, updated_at in rows:
+            self.synced_at = max(self.synced_at, updated_at)
+            if is_resolved or due_date is None or due_date >= self.loaded_until:
+                self.unschedule(pk)
+            elif due_date == self.deadlines.get(pk, (None,))[0]:
+                continue
+            elif due_date >= now:
+                self.schedule(pk, due_date)
+            else:
+                # Moved into the past: that deadline was not watched passing.
+                self.unschedule(pk)
+        return len(rows)
+
+    def run_pending(self, now):
+        """Send the signals due by ``now``; returns ``[(kind, todo), ...]``."""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, generation, pk, kind, due_date = heapq.heappop(self.heap)
+            if self.deadlines.get(pk) != (due_date, generation):
+                continue
+            if kind == OVERDUE:
+                del self.deadlines[pk]
+            elif due_date <= now:
+                # Running late: the overdue notice supersedes the reminder.
+                continue
+            due.append((kind, pk, due_date))
+        if not due:
+            return []
+
+        current = Todo.all_owners.in_bulk({pk for _, pk, _ in due})
+        fired = []
+        for kind, pk, due_date in due:
+            todo = current.get(pk)
+            if todo is None or todo.is_resolved or todo.due_date != due_date:
+                continue
+            SIGNALS[kind].send(sender=Todo, todo=todo)
+            fired.append((kind, todo))
+        return fired
+
+    def seconds_until_next(self, now):
+        """Sleep until the next entry, but no longer than the sync interval."""
+        wait = self.sync_interval
+        if self.heap:
+            wait = min(wait, (self.heap[0][0] - now).total_seconds())
+        return max(wait, 0)
+
+    def run(self, stop=None):
+        """Fire notices in real time until ``stop`` (a ``threading.Event``) is set."""
+        stop = stop or threading.Event()
+        loaded = self.start(timezone.now())
+        logger.info('Scheduler started with %d upcoming deadlines.', loaded)
+        while not stop.is_set():
+            now = timezone.now()
+            self.sync(now)
+            self.extend(now)
+            for kind, todo in self.run_pending(now):
+                logger.info('%s: todo %s "%s" due %s', kind, todo.pk, todo.title,
+                            todo.due_date.isoformat())
+            stop.wait(self.seconds_until_next(timezone.now()))
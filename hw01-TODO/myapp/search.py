@@ -0,0 +1,146 @@
+"""
+Full-text search over TODO titles and descriptions.
+
+Backed by the ``myapp_todo_fts`` FTS5 table created in
+``myapp.0005_todo_search``; triggers keep it in sync with ``myapp_todo``
+so every write path, bulk and raw SQL included, is indexed.  Results are
+ranked with BM25, title matches weighing more than description matches.
+"""
+import re
+
+from django.core import signing
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+from .models import TodoSearchIndex
+from .pagination import CursorPage, get_page_size
+
+FTS_TABLE = TodoSearchIndex._meta.db_table
+
+CURSOR_SALT = 'myapp.search.cursor'
+
+MAX_TERMS = 16
+
+_TERM_RE = re.compile(r'\w+')
+
+
+def parse_terms(text):
+    """Split user input into search terms, ignoring punctuation."""
+    return _TERM_RE.findall(text or '')[:MAX_TERMS]
+
+
+def build_match_query(text):
+    """
+    Turn user input into an FTS5 ``MATCH`` expression.
+
+    Every term must match, and each is a prefix match so results show up
+    while a word is still being typed.  Terms are quoted, so FTS5 operators
+    in the input are treated as plain words.
+    """
+    return ' '.join(f'"{term}"*' for term in parse_terms(text))
+
+
+def _fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def _fallback_filter(queryset, terms):
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    return queryset
+
+
+def filter_like(queryset, text):
+    """
+    Restrict ``queryset`` to rows whose title or description contains
+    every term of ``text``, for tables without an FTS index (the archive).
+    """
+    terms = parse_terms(text)
+    if not terms:
+        return queryset.none()
+    return _fallback_filter(queryset, terms)
+
+
+def filter_todos(queryset, text):
+    """Restrict ``queryset`` to todos matching ``text``, keeping its ordering."""
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not _fts_available():
+        return _fallback_filter(queryset, parse_terms(text))
+    rowids = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    return queryset.filter(pk__in=rowids)
+
+
+def rank_todos(queryset, text):
+    """
+    Return todos matching ``text``, best match first.
+
+    The FTS table drives the join, so only matching rows are read.  Each
+    result carries its BM25 score as ``search_rank`` (lower is better).
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not _fts_available():
+        return _fallback_filter(queryset, parse_terms(text)).order_by('-created_at', 'pk')
+    return (
+        queryset.filter(search_index__document__match=match)
+        .annotate(search_rank=F('search_index__rank'))
+        .order_by('search_rank', 'pk')
+    )
+
+
+def encode_cursor(offset):
+    return signing.dumps(offset, salt=CURSOR_SALT)
+
+
+def decode_cursor(token):
+    """Return the offset stored in a search cursor, or 0 if it is invalid."""
+    if not token:
+        return 0
+    try:
+        offset = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return 0
+    return offset if isinstance(offset, int) and offset >= 0 else 0
+
+
+class SearchPage(CursorPage):
+    """
+    A page of ranked search results.
+
+    Ranks only exist relative to one query, so pages are addressed by
+    offset rather than by keyset; the cursors are signed offsets.
+    """
+
+    def __init__(self, items, offset, has_next, page_size):
+        super().__init__(items, has_next, offset > 0, page_size)
+        self.offset = offset
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.offset + self.page_size) if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return None
+        return encode_cursor(max(0, self.offset - self.page_size))
+
+
+def search_page(queryset, text, cursor=None, page_size=None):
+    """Return a ``SearchPage`` of ranked matches for ``text``."""
+    size = get_page_size(page_size)
+    offset = decode_cursor(cursor)
+    rows = list(rank_todos(queryset, text)[offset:offset + size + 1])
+    return SearchPage(rows[:size], offset, len(rows) > size, size)
+
+
+async def asearch_page(queryset, text, cursor=None, page_size=None):
+    """Async counterpart of ``search_page``."""
+    size = get_page_size(page_size)
+    offset = decode_cursor(cursor)
+    rows = [row async for row in rank_todos(queryset, text)[offset:offset + size + 1]]
+    return SearchPage(rows[:size], offset, len(rows) > size, size)
@@ -0,0 +1,286 @@
+"""
+Per-owner sharding of TODO data across several SQLite databases.
+
+Every ``Todo`` (with its counters and archive rows) belongs to an owner:
+the logged-in user's username, or ``''`` for the shared anonymous list.
+An owner's rows all live in one database alias from ``TODO_SHARDS``; each
+alias is its own SQLite file with its own write lock, so owners on
+different shards write in parallel.
+
+An owner's shard is the one pinned in ``OwnerShard`` (on ``default``),
+or else a stable hash of the name.  The anonymous owner always lives on
+the first shard, and with a single shard nothing is looked up at all.
+
+``OwnerMiddleware`` resolves the request's owner and shard once and
+stores them in a context variable.  ``ShardRouter`` sends queries there,
+and ``Todo.objects`` only returns that owner's rows.  Code running
+outside requests uses ``owner_scope()`` for one owner or ``use_shard()``
+for every owner on one shard, e.g. the scheduler and archive commands.
+
+Ids are allocated by each shard, so they are only unique within one.
+``move_owner`` (and the ``rebalance_shards`` command) moves an owner's
+rows to another shard under new ids and pins the owner there.
+"""
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from . import replicas
+
+ANONYMOUS_OWNER = ''
+
+# (owner, shard): owner None means "every owner" (maintenance code).
+_scope = ContextVar('myapp_shard_scope', default=(ANONYMOUS_OWNER, None))
+
+
+def get_shards():
+    """Database aliases holding TODO data; the first also holds the anonymous owner."""
+    return list(getattr(settings, 'TODO_SHARDS', [DEFAULT_DB_ALIAS]))
+
+
+def current_owner():
+    """The owner queries are scoped to, or ``None`` for every owner."""
+    return _scope.get()[0]
+
+
+def current_shard():
+    return _scope.get()[1] or get_shards()[0]
+
+
+def default_owner():
+    """Default for ``Todo.owner``: the current owner (anonymous in maintenance code)."""
+    owner = current_owner()
+    return ANONYMOUS_OWNER if owner is None else owner
+
+
+def hashed_shard(owner, shards=None):
+    shards = shards or get_shards()
+    if not owner:
+        return shards[0]
+    return shards[zlib.crc32(owner.encode()) % len(shards)]
+
+
+def shard_for_owner(owner):
+    """The alias holding ``owner``'s rows: pinned, else hashed."""
+    from .models import OwnerShard
+
+    shards = get_shards()
+    if not owner or len(shards) == 1:
+        return shards[0]
+    pinned = (
+        OwnerShard.objects.using(DEFAULT_DB_ALIAS)
+        .filter(owner=owner).values_list('shard', flat=True).first()
+    )
+    return pinned if pinned in shards else hashed_shard(owner, shards)
+
+
+@contextmanager
+def _scoped(owner, shard):
+    token = _scope.set((owner, shard))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def owner_scope(owner):
+    """Scope ``Todo.objects`` and routing to ``owner`` on their shard."""
+    return _scoped(owner, shard_for_owner(owner))
+
+
+def use_shard(alias):
+    """Route to ``alias`` and see every owner's rows there."""
+    return _scoped(None, alias)
+
+
+class ShardRouter:
+    """
+    Send TODO models to the current shard and everything else (auth,
+    sessions, admin, ``OwnerShard``) to ``default``.
+    """
+
+    def _db(self, model, **hints):
+        if model._meta.model_name == 'ownershard':
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None:
+            if instance._state.db:
+                # Rows read from a replica are written back to its primary.
+                return replicas.primary_of(instance._state.db)
+            owner = getattr(instance, 'owner', None)
+            if owner is not None and owner != current_owner():
+                return shard_for_owner(owner)
+        return current_shard()
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != 'myapp':
+            return None
+        if model._meta.model_name == 'ownershard':
+            return DEFAULT_DB_ALIAS
+        return replicas.read_alias(self._db(model, **hints))
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != 'myapp':
+            return None
+        return self._db(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return obj1._state.db == obj2._state.db
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # A replica gets its primary's tables (in tests; in production it
+        # is a copy made by sync_replicas).
+        db = replicas.primary_of(db)
+        if app_label == 'myapp' and model_name != 'ownershard':
+            return db in get_shards()
+        return db == DEFAULT_DB_ALIAS
+
+
+def request_owner(request):
+    """The owner of a request's todos: the logged-in username, else anonymous."""
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return ANONYMOUS_OWNER  # No session, so no user; skip the lookup.
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_OWNER
+    return user.get_username()
+
+
+class OwnerMiddleware:
+    """
+    Scope each request to its owner's todos and shard.
+
+    Must come after ``AuthenticationMiddleware``.  The scope ends when the
+    view returns; streaming responses keep it because ``Todo.objects``
+    querysets are bound to the shard when they are built.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        owner = request_owner(request)
+        with _scoped(owner, shard_for_owner(owner)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            owner = await sync_to_async(request_owner)(request)
+            shard = await sync_to_async(shard_for_owner)(owner)
+        else:
+            owner, shard = ANONYMOUS_OWNER, get_shards()[0]
+        with _scoped(owner, shard):
+            return await self.get_response(request)
+
+
+def _take_rows(model, connection, owner):
+    """Delete ``owner``'s rows of ``model`` and return them, minus the primary key."""
+    qn = connection.ops.quote_name
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    with connection.cursor() as cursor:
+        # DELETE ... RETURNING takes the write lock before reading, so no
+        # write to the source can slip in between the copy and the delete.
+        cursor.execute(
+            f'DELETE FROM {qn(model._meta.db_table)} WHERE {qn("owner")} = %s '
+            f'RETURNING {", ".join(qn(field.column) for field in fields)}',
+            [owner],
+        )
+        return fields, cursor.fetchall()
+
+
+def _reserve_ids(connection, count):
+    """Reserve ``count`` todo ids on ``connection``'s shard; return the first."""
+    from .models import ArchivedTodo, Todo
+
+    qn = connection.ops.quote_name
+    todo_table = Todo._meta.db_table
+    highest = (
+        f'max(seq, (SELECT coalesce(max({qn("id")}), 0) FROM {qn(todo_table)}), '
+        f'(SELECT coalesce(max({qn("id")}), 0) FROM {qn(ArchivedTodo._meta.db_table)}))'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO sqlite_sequence (name, seq) SELECT %s, 0 '
+            'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)',
+            [todo_table, todo_table],
+        )
+        cursor.execute(
+            f'UPDATE sqlite_sequence SET seq = {highest} + %s WHERE name = %s RETURNING seq',
+            [count, todo_table],
+        )
+        return cursor.fetchone()[0] - count + 1
+
+
+def _insert_rows(model, connection, fields, rows, first_id):
+    qn = connection.ops.quote_name
+    columns = [qn(model._meta.pk.column)] + [qn(field.column) for field in fields]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {qn(model._meta.db_table)} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})',
+            [(first_id + offset, *row) for offset, row in enumerate(rows)],
+        )
+
+
+def move_owner(owner, target, source=None):
+    """
+    Move ``owner``'s todos, archived todos and counters from ``source``
+    (default: their current shard) to ``target`` and pin them there.
+    Returns the number of todos moved.
+
+    Moved rows get new ids from the target's sequence, since ids are only
+    unique within a shard.  The target and the pin commit before the
+    delete on the source does, so an interruption can leave a copy behind
+    but never loses rows.
+    """
+    from . import cache
+    from .models import ArchivedTodo, OwnerShard, Todo, TodoCounter
+    from .stats import rebuild_counters
+
+    if target not in get_shards():
+        raise ValueError(f'{target!r} is not one of TODO_SHARDS.')
+    if not owner and target != get_shards()[0]:
+        raise ValueError('The anonymous owner always lives on the first shard.')
+    source = source or shard_for_owner(owner)
+    if source == target:
+        OwnerShard.objects.update_or_create(owner=owner, defaults={'shard': target})
+        return 0
+    source_connection, target_connection = connections[source], connections[target]
+    with transaction.atomic(using=source):
+        todo_fields, todos = _take_rows(Todo, source_connection, owner)
+        archive_fields, archived = _take_rows(ArchivedTodo, source_connection, owner)
+        TodoCounter.objects.using(source).filter(owner=owner)._raw_delete(source)
+        with transaction.atomic(using=target):
+            first_id = _reserve_ids(target_connection, len(todos) + len(archived))
+            _insert_rows(Todo, target_connection, todo_fields, todos, first_id)
+            _insert_rows(ArchivedTodo, target_connection, archive_fields, archived, first_id + len(todos))
+            with _scoped(owner, target):
+                rebuild_counters(owner)
+        OwnerShard.objects.update_or_create(owner=owner, defaults={'shard': target})
+    cache.bump_version()
+    return len(todos)
+
+
+def misplaced_owners():
+    """Yield ``(owner, shard, home)`` for owners with rows outside their home shard."""
+    from .models import ArchivedTodo, Todo
+
+    for shard in get_shards():
+        with use_shard(shard):
+            owners = set(Todo.all_owners.values_list('owner', flat=True).distinct())
+            owners.update(ArchivedTodo.all_owners.values_list('owner', flat=True).distinct())
+        for owner in sorted(owners):
+            home = shard_for_owner(owner)
+            if home != shard:
+                yield owner, shard, home
@@ -0,0 +1,112 @@
+"""
+Signal handlers that keep derived data in sync with ``Todo`` writes.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from . import cache, events, replicas, sharding, stats
+from .models import Todo
+
+# Sent by the set-based write paths in ``myapp.bulk``, which bypass the
+# per-row model signals.  Arguments: ``action`` ('created', 'updated' or
+# 'deleted'), ``pks``, ``total_delta``, ``resolved_delta`` and optionally
+# ``owner`` (default: the current owner, see ``myapp.sharding``).
+todos_bulk_changed = Signal()
+
+# Sent by the ``run_scheduler`` worker (``myapp.scheduler``) with the
+# ``todo`` when its reminder time, then its due date, is reached.
+todo_due_soon = Signal()
+
+todo_overdue = Signal()
+
+
+@receiver(post_init, sender=Todo)
+def remember_resolved_state(sender, instance, **kwargs):
+    """Remember the loaded ``is_resolved`` value so saves can diff against it."""
+    # Read from __dict__ so deferred fields are not fetched.
+    instance._loaded_is_resolved = instance.__dict__.get('is_resolved')
+
+
+@receiver(post_save, sender=Todo)
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep ``TodoCounter`` in step with created and toggled todos, on the row's database."""
+    if raw:
+        return
+    if created:
+        stats.adjust_counters(
+            total=1, resolved=int(instance.is_resolved), owner=instance.owner, using=instance._state.db,
+        )
+    elif instance._loaded_is_resolved is None:
+        # The previous state is unknown (deferred field); recount.
+        stats.rebuild_counters(instance.owner, using=instance._state.db)
+    elif instance.is_resolved != instance._loaded_is_resolved:
+        stats.adjust_counters(
+            resolved=1 if instance.is_resolved else -1, owner=instance.owner, using=instance._state.db,
+        )
+    instance._loaded_is_resolved = instance.is_resolved
+
+
+@receiver(post_delete, sender=Todo)
+def update_counters_on_delete(sender, instance, **kwargs):
+    """Keep ``TodoCounter`` in step with deleted todos."""
+    was_resolved = instance._loaded_is_resolved
+    if was_resolved is None:
+        was_resolved = instance.is_resolved
+    stats.adjust_counters(
+        total=-1, resolved=-int(was_resolved), owner=instance.owner, using=instance._state.db,
+    )
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def update_counters_on_bulk_change(sender, total_delta=0, resolved_delta=0, owner=None, **kwargs):
+    """Apply the net effect of a bulk write to ``TodoCounter``."""
+    stats.adjust_counters(total=total_delta, resolved=resolved_delta, owner=owner)
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+@receiver(todos_bulk_changed, sender=Todo)
+def invalidate_list_cache(sender, **kwargs):
+    """Orphan every cached list fragment after any write."""
+    if kwargs.get('raw'):
+        return
+    cache.bump_version()
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+@receiver(todos_bulk_changed, sender=Todo)
+def stick_to_primary(sender, **kwargs):
+    """Keep the writing client's next reads off the read replicas."""
+    if not kwargs.get('raw'):
+        replicas.note_write()
+
+
+def _publish_on_commit(action, pks, owner, using):
+    if events.broker.has_subscribers():
+        transaction.on_commit(partial(events.publish_changes, action, pks, owner), using=using)
+
+
+@receiver(post_save, sender=Todo)
+def publish_save(sender, instance, created, raw=False, **kwargs):
+    """Tell open lists about a created or edited todo once it commits."""
+    if not raw:
+        _publish_on_commit(
+            'created' if created else 'updated', [instance.pk], instance.owner, instance._state.db,
+        )
+
+
+@receiver(post_delete, sender=Todo)
+def publish_delete(sender, instance, **kwargs):
+    """Tell open lists about a deleted todo once the delete commits."""
+    _publish_on_commit('deleted', [instance.pk], instance.owner, instance._state.db)
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def publish_bulk_change(sender, action, pks, owner=None, **kwargs):
+    """Tell open lists about a bulk write once it commits."""
+    owner = sharding.default_owner() if owner is None else owner
+    _publish_on_commit(action, list(pks), owner, sharding.current_shard())
@@ -0,0 +1,35 @@
+"""
+Per-connection SQLite tuning.
+
+``SQLITE_PRAGMAS`` (see ``myproject.sqlite_pragmas``) is applied to
+every new SQLite connection through the ``connection_created`` signal.
+Nothing is changed when the setting is empty or the backend is not SQLite.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Applied in this order; journal_mode must come first so later pragmas
+# see the final journaling mode.
+PRAGMA_ORDER = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')
+
+
+def _sorted_pragmas(pragmas):
+    def position(name):
+        return PRAGMA_ORDER.index(name) if name in PRAGMA_ORDER else len(PRAGMA_ORDER)
+    return sorted(pragmas.items(), key=lambda item: position(item[0]))
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Run the configured PRAGMA statements on a fresh SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in _sorted_pragmas(pragmas):
+            if not name.isidentifier():
+                raise ValueError(f'Invalid SQLite pragma name: {name!r}')
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,33 @@
+/* Site-wide scripts, loaded by base.html on every page. */
+
+function updateDateTime() {
+    const now = new Date();
+    const options = {
+        timeZone: 'America/New_York',
+        weekday: 'long',
+        year: 'numeric',
+        month: 'long',
+        day: 'numeric',
+        hour: '2-digit',
+        minute: '2-digit',
+        second: '2-digit',
+        hour12: true
+    };
+    const formatter = new Intl.DateTimeFormat('en-US', options);
+    const dateTimeString = formatter.format(now) + ' EST';
+    const dateTimeElement = document.getElementById('currentDateTime');
+    if (dateTimeElement) {
+        dateTimeElement.textContent = dateTimeString;
+        dateTimeElement.setAttribute('datetime', now.toISOString());
+    }
+}
+// Wait for DOM to be ready
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', function () {
+        updateDateTime();
+        setInterval(updateDateTime, 1000);
+    });
+} else {
+    updateDateTime();
+    setInterval(updateDateTime, 1000);
+}
@@ -0,0 +1,178 @@
+/*
+ * TODO list page: view switching, countdowns, fetch() row actions and
+ * live updates.  URLs come from the data-* attributes of this script tag.
+ */
+const config = document.currentScript.dataset;
+
+// Both views lay out the same rendered items; only the container class changes.
+function switchView(view) {
+    const items = document.getElementById('todoItems');
+    if (items) {
+        items.classList.toggle('view-card', view === 'card');
+        items.classList.toggle('view-list', view === 'list');
+    }
+    document.getElementById('cardViewBtn').classList.toggle('active', view === 'card');
+    document.getElementById('listViewBtn').classList.toggle('active', view === 'list');
+    localStorage.setItem('todoView', view);
+}
+
+// Load saved view preference
+document.addEventListener('DOMContentLoaded', function () {
+    const savedView = localStorage.getItem('todoView') || 'card';
+    switchView(savedView);
+    document.querySelectorAll('[data-view]').forEach(button => {
+        button.addEventListener('click', () => switchView(button.dataset.view));
+    });
+
+    // Initialize and update countdowns
+    updateCountdowns();
+    setInterval(updateCountdowns, 1000);
+
+    listenForChanges();
+    document.addEventListener('click', handleRowAction);
+    document.addEventListener('submit', handleRowAction);
+});
+
+function getCookie(name) {
+    const match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+    return match ? decodeURIComponent(match[1]) : null;
+}
+
+// Toggle and delete with fetch() and patch the page in place, instead
+// of a full round trip and redirect back to the list.  Without
+// JavaScript the toggle form posts and the delete link opens the
+// confirmation page.
+function handleRowAction(event) {
+    const control = event.type === 'submit'
+        ? event.target.closest('form[data-action]')
+        : event.target.closest('a[data-action]');
+    if (!control) return;
+    const action = control.dataset.action;
+    const url = control.getAttribute(event.type === 'submit' ? 'action' : 'href');
+    const message = action === 'delete' ? 'Delete this TODO?' : 'Toggle resolved status?';
+    event.preventDefault();
+    if (!confirm(message)) return;
+
+    fetch(url, {
+        method: 'POST',
+        headers: { 'Accept': 'application/json', 'X-CSRFToken': getCookie('csrftoken') },
+        credentials: 'same-origin',
+    })
+        .then(response => {
+            if (!response.ok) throw new Error(response.statusText);
+            return response.json();
+        })
+        .then(data => action === 'delete' ? removeTodo(data) : toggledTodo(data))
+        .catch(() => { window.location.href = config.listUrl; });
+}
+
+// Absolute counts, so a live update for the same toggle arriving first
+// does not get the change applied twice.
+function toggledTodo(data) {
+    replaceTodo(data);
+    updateStats(data.stats);
+    updateCountdowns();
+}
+
+function removeTodo(data) {
+    document.querySelectorAll(`[data-todo-id="${data.deleted}"]`).forEach(el => el.remove());
+    updateStats(data.stats);
+}
+
+// Patch rows in place when TODOs change in another tab or by another user.
+function listenForChanges() {
+    if (!window.EventSource) return;
+    const source = new EventSource(config.eventsUrl);
+
+    source.addEventListener('updated', event => {
+        const data = JSON.parse(event.data);
+        data.todos.forEach(replaceTodo);
+        updateStats(data.stats);
+    });
+    source.addEventListener('deleted', event => {
+        const data = JSON.parse(event.data);
+        data.ids.forEach(id => {
+            document.querySelectorAll(`[data-todo-id="${id}"]`).forEach(el => el.remove());
+        });
+        updateStats(data.stats);
+    });
+    // New rows may belong on another page or in another position, so
+    // offer a reload instead of guessing where to insert them.
+    source.addEventListener('created', event => {
+        updateStats(JSON.parse(event.data).stats);
+        showReloadBanner();
+    });
+    source.addEventListener('resync', showReloadBanner);
+}
+
+function replaceTodo(item) {
+    const el = document.querySelector(`[data-todo-id="${item.id}"]`);
+    if (el) el.outerHTML = item.html;
+}
+
+function updateStats(stats) {
+    Object.entries(stats).forEach(([name, value]) => {
+        const el = document.querySelector(`[data-stat="${name}"]`);
+        if (el) el.textContent = value;
+    });
+}
+
+function showReloadBanner() {
+    document.getElementById('liveUpdateBanner').classList.remove('d-none');
+}
+
+function updateCountdowns() {
+    const countdownElements = document.querySelectorAll('.countdown');
+    const now = new Date();
+
+    countdownElements.forEach(element => {
+        const dueDateStr = element.getAttribute('data-due-date');
+        if (!dueDateStr) return;
+
+        const dueDate = new Date(dueDateStr);
+        const diffMs = dueDate - now;
+
+        // Clear previous color classes
+        element.classList.remove('text-danger', 'text-warning', 'text-success');
+
+        if (diffMs <= 0) {
+            // Overdue
+            const overdueDiff = Math.abs(diffMs);
+            element.textContent = '⏱️ Overdue by ' + formatTimeDiff(overdueDiff);
+            element.classList.add('text-danger');
+        } else {
+            // Time remaining
+            element.textContent = '⏱️ ' + formatTimeDiff(diffMs) + ' left';
+
+            // Color code based on urgency
+            if (diffMs < 24 * 60 * 60 * 1000) { // Less than 24 hours
+                element.classList.add('text-danger');
+            } else if (diffMs < 3 * 24 * 60 * 60 * 1000) { // Less than 3 days
+                element.classList.add('text-warning');
+            } else {
+                element.classList.add('text-success');
+            }
+        }
+    });
+}
+
+function formatTimeDiff(milliseconds) {
+    const totalSeconds = Math.floor(milliseconds / 1000);
+    const totalMinutes = Math.floor(totalSeconds / 60);
+    const totalHours = Math.floor(totalMinutes / 60);
+    const days = Math.floor(totalHours / 24);
+
+    const hours = totalHours % 24;
+    const minutes = totalMinutes % 60;
+    const seconds = totalSeconds % 60;
+
+    if (days > 0) {
+        return `${days}d ${hours}h ${minutes}m`;
+    } else if (hours > 0) {
+        return `${hours}h ${minutes}m`;
+    } else if (minutes > 0) {
+        return `${minutes}m ${seconds}s`;
+    } else {
+        return `${seconds}s`;
+    }
+}
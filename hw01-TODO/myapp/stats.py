@@ -0,0 +1,128 @@
+"""
+Aggregate statistics for the TODO list header.
+
+Total and resolved counts are read from the owner's materialized
+``TodoCounter`` row, which the signal handlers in ``myapp.signals`` keep
+up to date.  The overdue count depends on the current time and cannot be
+materialized, so it is computed as a scalar subquery in the same
+statement.
+"""
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import sharding
+from .models import Todo, TodoCounter
+
+
+def counter_queryset(owner=None):
+    """The counter row of ``owner`` (default: the current owner)."""
+    return TodoCounter.objects.filter(owner=sharding.default_owner() if owner is None else owner)
+
+
+def compute_stats(queryset=None, now=None):
+    """
+    Compute stats for ``queryset`` with one conditional-aggregate query.
+
+    This scans the rows it counts; use ``get_stats`` for the whole table.
+    """
+    if queryset is None:
+        queryset = Todo.objects.all()
+    if now is None:
+        now = timezone.now()
+    stats = queryset.order_by().aggregate(
+        total=Count('pk'),
+        resolved=Count('pk', filter=Q(is_resolved=True)),
+        overdue=Count('pk', filter=Q(is_resolved=False, due_date__lt=now)),
+    )
+    stats['pending'] = stats['total'] - stats['resolved']
+    return stats
+
+
+def _overdue_subquery(now):
+    overdue = (
+        Todo.objects.filter(is_resolved=False, due_date__lt=now)
+        .order_by()
+        .annotate(group=Value(1))
+        .values('group')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    return Coalesce(Subquery(overdue), 0)
+
+
+def _stats_query(now):
+    return (
+        counter_queryset()
+        .annotate(overdue=_overdue_subquery(now))
+        .values('total', 'resolved', 'overdue')
+    )
+
+
+def get_stats(now=None):
+    """
+    Return ``total``, ``resolved``, ``pending`` and ``overdue`` counts.
+
+    Costs a single query whose price does not grow with the table size
+    (apart from the overdue rows themselves).
+    """
+    if now is None:
+        now = timezone.now()
+    row = _stats_query(now).first()
+    if row is None:
+        rebuild_counters()
+        return compute_stats(now=now)
+    row['pending'] = row['total'] - row['resolved']
+    return row
+
+
+async def aget_stats(now=None):
+    """Async counterpart of ``get_stats``."""
+    if now is None:
+        now = timezone.now()
+    row = await _stats_query(now).afirst()
+    if row is None:
+        await sync_to_async(rebuild_counters)()
+        return await sync_to_async(compute_stats)(now=now)
+    row['pending'] = row['total'] - row['resolved']
+    return row
+
+
+def adjust_counters(total=0, resolved=0, owner=None, using=None):
+    """
+    Apply a delta to ``owner``'s materialized counters on ``using``, the
+    database the todos were written to (default: the current shard).
+
+    Called from the ``Todo`` signal handlers and from bulk code paths that
+    bypass signals (``QuerySet.update`` and friends).
+    """
+    if not total and not resolved:
+        return
+    updated = counter_queryset(owner).using(using or sharding.current_shard()).update(
+        total=F('total') + total,
+        resolved=F('resolved') + resolved,
+        modified_at=timezone.now(),
+    )
+    if not updated:
+        rebuild_counters(owner, using)
+
+
+def rebuild_counters(owner=None, using=None):
+    """Recount ``owner``'s todos on ``using`` and overwrite their materialized counters."""
+    if owner is None:
+        owner = sharding.default_owner()
+    shard = using or sharding.current_shard()
+    # Always on the primary, even when the caller is reading a replica.
+    with transaction.atomic(using=shard):
+        stats = compute_stats(Todo.all_owners.using(shard).filter(owner=owner))
+        TodoCounter.objects.using(shard).update_or_create(
+            owner=owner,
+            defaults={
+                'total': stats['total'],
+                'resolved': stats['resolved'],
+                'modified_at': timezone.now(),
+            },
+        )
+    return stats
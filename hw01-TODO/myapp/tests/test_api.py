@@ -0,0 +1,207 @@
+"""
+Unit tests for the JSON API and bulk endpoints.
+"""
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from myapp.models import Todo
+from myapp.stats import compute_stats, get_stats, rebuild_counters
+
+
+class ApiTestCase(TestCase):
+    """Helpers shared by the API tests."""
+
+    def post_json(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+    def assertCountersConsistent(self):
+        self.assertEqual(get_stats(), compute_stats())
+
+
+class TodoCollectionApiTest(ApiTestCase):
+    """Test cases for the list/create endpoint."""
+
+    def setUp(self):
+        """Set up the collection URL."""
+        self.url = reverse('api_todo_collection')
+
+    def test_list_returns_json_page(self):
+        """Test GET returns serialized todos and cursors."""
+        Todo.objects.create(title="First", due_date=timezone.now() - timedelta(hours=1))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['results'][0]['title'], "First")
+        self.assertTrue(body['results'][0]['is_overdue'])
+        self.assertIsNone(body['next'])
+
+    def test_create_valid(self):
+        """Test POST creates a todo using TodoForm validation."""
+        response = self.post_json(self.url, {'title': 'API Todo', 'due_date': '2030-01-01T09:30'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Todo.objects.get().title, 'API Todo')
+        self.assertCountersConsistent()
+
+    def test_create_invalid(self):
+        """Test POST rejects data that TodoForm rejects."""
+        response = self.post_json(self.url, {'title': '', 'due_date': '01/01/2030'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()['errors'])
+        self.assertIn('due_date', response.json()['errors'])
+
+    def test_create_rejects_non_json(self):
+        """Test a malformed body is a 400."""
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TodoItemApiTest(ApiTestCase):
+    """Test cases for the single-item endpoint."""
+
+    def setUp(self):
+        """Set up a sample todo."""
+        self.todo = Todo.objects.create(title="Item", description="Keep me")
+        self.url = reverse('api_todo_item', args=[self.todo.pk])
+
+    def test_get(self):
+        """Test GET returns the todo."""
+        self.assertEqual(self.client.get(self.url).json()['title'], "Item")
+
+    def test_patch_keeps_untouched_fields(self):
+        """Test PATCH merges the given fields into the existing ones."""
+        response = self.client.patch(
+            self.url, json.dumps({'is_resolved': True}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.todo.refresh_from_db()
+        self.assertTrue(self.todo.is_resolved)
+        self.assertEqual(self.todo.description, "Keep me")
+        self.assertCountersConsistent()
+
+    def patch_json(self, data, **headers):
+        return self.client.patch(self.url, json.dumps(data), content_type='application/json', **headers)
+
+    def test_patch_if_match(self):
+        """Test PATCH with the ETag from GET succeeds and returns the new ETag."""
+        etag = self.client.get(self.url)['ETag']
+        response = self.patch_json({'title': "Renamed"}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.url)['ETag'], response['ETag'])
+
+    def test_patch_if_match_stale(self):
+        """Test PATCH with an outdated ETag is rejected without writing."""
+        etag = self.client.get(self.url)['ETag']
+        self.patch_json({'description': "Theirs"})
+        response = self.patch_json({'title': "Mine"}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.title, "Item")
+        self.assertEqual(self.todo.description, "Theirs")
+
+    def test_delete(self):
+        """Test DELETE removes the todo."""
+        self.assertEqual(self.client.delete(self.url).status_code, 200)
+        self.assertFalse(Todo.objects.exists())
+
+    def test_404(self):
+        """Test unknown ids return 404."""
+        response = self.client.get(reverse('api_todo_item', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class TodoBulkApiTest(ApiTestCase):
+    """Test cases for the bulk endpoints."""
+
+    def test_bulk_create(self):
+        """Test bulk create inserts every item in one INSERT."""
+        items = [{'title': f'Bulk {i}', 'is_resolved': i % 2 == 0} for i in range(10)]
+        with self.assertNumQueries(4):  # savepoint, INSERT, counter UPDATE, release
+            response = self.post_json(reverse('api_todo_bulk_create'), {'items': items})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['created']), 10)
+        self.assertEqual(Todo.objects.count(), 10)
+        self.assertCountersConsistent()
+
+    def test_bulk_create_is_all_or_nothing(self):
+        """Test one invalid item rejects the whole batch."""
+        items = [{'title': 'Good'}, {'title': ''}, {'title': 'x' * 201}]
+        response = self.post_json(reverse('api_todo_bulk_create'), {'items': items})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'1', '2'})
+        self.assertFalse(Todo.objects.exists())
+
+    @override_settings(TODO_BULK_MAX_BATCH_SIZE=2)
+    def test_bulk_batch_size_limit(self):
+        """Test batches over the configured limit are rejected."""
+        items = [{'title': 'a'}, {'title': 'b'}, {'title': 'c'}]
+        response = self.post_json(reverse('api_todo_bulk_create'), {'items': items})
+        self.assertEqual(response.status_code, 400)
+        response = self.post_json(reverse('api_todo_bulk_delete'), {'ids': [1, 2, 3]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_resolve_and_toggle(self):
+        """Test bulk update changes status with a single UPDATE."""
+        todos = [Todo.objects.create(title=f'T{i}', is_resolved=i == 0) for i in range(3)]
+        ids = [todo.pk for todo in todos]
+        url = reverse('api_todo_bulk_update')
+
+        response = self.post_json(url, {'ids': ids, 'action': 'resolve'})
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(Todo.objects.filter(is_resolved=True).count(), 3)
+        self.assertCountersConsistent()
+
+        Todo.objects.filter(pk=ids[0]).update(is_resolved=False)
+        rebuild_counters()
+        response = self.post_json(url, {'ids': ids, 'action': 'toggle'})
+        self.assertEqual(response.json()['updated'], 3)
+        self.assertEqual(list(Todo.objects.filter(is_resolved=True).values_list('pk', flat=True)), [ids[0]])
+        self.assertCountersConsistent()
+
+    def test_bulk_update_bumps_updated_at(self):
+        """Test bulk updates touch updated_at like a normal save."""
+        todo = Todo.objects.create(title='T')
+        before = todo.updated_at
+        self.post_json(reverse('api_todo_bulk_update'), {'ids': [todo.pk], 'action': 'resolve'})
+        todo.refresh_from_db()
+        self.assertGreater(todo.updated_at, before)
+
+    def test_bulk_update_rejects_unknown_action(self):
+        """Test an unknown action is a 400."""
+        response = self.post_json(reverse('api_todo_bulk_update'), {'ids': [1], 'action': 'archive'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_delete(self):
+        """Test bulk delete removes the given todos only."""
+        todos = [Todo.objects.create(title=f'T{i}', is_resolved=i == 0) for i in range(3)]
+        response = self.post_json(
+            reverse('api_todo_bulk_delete'), {'ids': [todos[0].pk, todos[1].pk]}
+        )
+        self.assertEqual(response.json()['deleted'], 2)
+        self.assertEqual(list(Todo.objects.values_list('title', flat=True)), ['T2'])
+        self.assertCountersConsistent()
+
+    def test_writes_require_json_content_type(self):
+        """Test form and text/plain bodies (which skip CORS preflight) get 415."""
+        todo = Todo.objects.create(title="Keep me")
+        body = json.dumps({'ids': [todo.pk]})
+        for name in ('api_todo_bulk_delete', 'api_todo_bulk_update', 'api_todo_bulk_create'):
+            with self.subTest(endpoint=name):
+                response = self.client.post(reverse(name), body, content_type='text/plain')
+                self.assertEqual(response.status_code, 415)
+        response = self.client.post(reverse('api_todo_collection'), {'title': "Forged"})
+        self.assertEqual(response.status_code, 415)
+        response = self.client.patch(
+            reverse('api_todo_item', args=[todo.pk]), json.dumps({'title': "Forged"}), content_type='text/plain',
+        )
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(list(Todo.objects.values_list('title', flat=True)), ["Keep me"])
+
+    def test_bulk_rejects_bad_ids(self):
+        """Test ids must be a non-empty list of integers."""
+        url = reverse('api_todo_bulk_delete')
+        self.assertEqual(self.post_json(url, {'ids': []}).status_code, 400)
+        self.assertEqual(self.post_json(url, {'ids': ['1']}).status_code, 400)
@@ -0,0 +1,154 @@
+"""
+Unit tests for archiving, purging and restoring resolved todos.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from myapp import archive, search
+from myapp.models import ArchivedTodo, Todo
+from myapp.stats import compute_stats, get_stats
+
+
+class ArchiveTestCase(TestCase):
+    """Helpers shared by the archive tests."""
+
+    def make_todo(self, title, resolved=True, days_ago=60, **fields):
+        todo = Todo.objects.create(title=title, is_resolved=resolved, **fields)
+        # update() skips auto_now, so the row looks untouched for days_ago.
+        Todo.objects.filter(pk=todo.pk).update(updated_at=timezone.now() - timedelta(days=days_ago))
+        return todo
+
+    def assertCountersConsistent(self):
+        self.assertEqual(get_stats(), compute_stats())
+
+
+class ArchiveResolvedTest(ArchiveTestCase):
+    """Test cases for archive_resolved."""
+
+    def setUp(self):
+        """Create old and recent, resolved and pending todos."""
+        self.old = [self.make_todo(f"Old report {i}", description="quarterly") for i in range(5)]
+        self.recent = self.make_todo("Recent", days_ago=1)
+        self.pending = self.make_todo("Old but pending", resolved=False)
+
+    def test_moves_only_old_resolved_todos(self):
+        """Test resolved todos past the age move; recent and pending ones stay."""
+        moved = archive.archive_resolved(older_than_days=30)
+        self.assertEqual(moved, 5)
+        self.assertEqual(
+            set(Todo.objects.values_list('title', flat=True)),
+            {"Recent", "Old but pending"},
+        )
+        self.assertEqual(
+            sorted(ArchivedTodo.objects.values_list('pk', flat=True)),
+            sorted(todo.pk for todo in self.old),
+        )
+        self.assertCountersConsistent()
+
+    def test_keeps_original_fields(self):
+        """Test archived rows keep their id, text and timestamps."""
+        archive.archive_resolved(older_than_days=30)
+        source = self.old[0]
+        archived = ArchivedTodo.objects.get(pk=source.pk)
+        self.assertEqual(archived.title, source.title)
+        self.assertEqual(archived.description, "quarterly")
+        self.assertEqual(archived.created_at, source.created_at)
+        self.assertLess(archived.updated_at, timezone.now() - timedelta(days=59))
+        self.assertIsNotNone(archived.archived_at)
+
+    def test_archived_todos_leave_the_search_index(self):
+        """Test the FTS index no longer returns archived todos."""
+        archive.archive_resolved(older_than_days=30)
+        self.assertFalse(search.filter_todos(Todo.objects.all(), "quarterly").exists())
+
+    def test_bounded_and_resumable_batches(self):
+        """Test max_batches stops early and the next run carries on."""
+        self.assertEqual(archive.archive_resolved(older_than_days=30, batch_size=2, max_batches=1), 2)
+        self.assertEqual(ArchivedTodo.objects.count(), 2)
+        self.assertEqual(archive.archive_resolved(older_than_days=30, batch_size=2), 3)
+        self.assertEqual(ArchivedTodo.objects.count(), 5)
+        self.assertCountersConsistent()
+
+    def test_batch_statement_count_is_fixed(self):
+        """Test one batch costs the same statements whatever its size."""
+        def statements(batch_size):
+            with CaptureQueriesContext(connection) as ctx:
+                archive.archive_resolved(older_than_days=30, batch_size=batch_size, max_batches=1)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(statements(1), statements(3))
+
+
+class PurgeAndRestoreTest(ArchiveTestCase):
+    """Test cases for purge_archive and restore_archived."""
+
+    # archive_todos visits every shard.
+    databases = '__all__'
+
+    def setUp(self):
+        """Archive two old resolved todos."""
+        self.todos = [self.make_todo("Invoice March"), self.make_todo("Invoice April")]
+        archive.archive_resolved(older_than_days=30)
+
+    def test_purge_respects_retention(self):
+        """Test only rows archived before the retention period are deleted."""
+        ArchivedTodo.objects.filter(pk=self.todos[0].pk).update(
+            archived_at=timezone.now() - timedelta(days=400))
+        self.assertEqual(archive.purge_archive(retention_days=365), 1)
+        self.assertEqual(list(ArchivedTodo.objects.values_list('pk', flat=True)), [self.todos[1].pk])
+
+    @override_settings(TODO_ARCHIVE_RETENTION_DAYS=None)
+    def test_no_retention_keeps_everything(self):
+        """Test a retention of None never purges."""
+        ArchivedTodo.objects.update(archived_at=timezone.now() - timedelta(days=4000))
+        self.assertEqual(archive.purge_archive(), 0)
+        self.assertEqual(ArchivedTodo.objects.count(), 2)
+
+    def test_restore(self):
+        """Test restored todos come back resolved, with their ids, and searchable."""
+        pk = self.todos[0].pk
+        self.assertEqual(archive.restore_archived([pk]), 1)
+        todo = Todo.objects.get(pk=pk)
+        self.assertTrue(todo.is_resolved)
+        self.assertEqual(todo.title, "Invoice March")
+        self.assertEqual(todo.created_at, self.todos[0].created_at)
+        self.assertFalse(ArchivedTodo.objects.filter(pk=pk).exists())
+        self.assertEqual(list(search.filter_todos(Todo.objects.all(), "invoice")), [todo])
+        self.assertCountersConsistent()
+
+    def test_search_archive(self):
+        """Test archived todos are found by every term, newest id first, with paging."""
+        march, april = self.todos
+        self.assertEqual([t.pk for t in archive.search_archive("invoice")], [april.pk, march.pk])
+        self.assertEqual([t.pk for t in archive.search_archive("invoice march")], [march.pk])
+        self.assertEqual([t.pk for t in archive.search_archive("invoice", before=april.pk)], [march.pk])
+        self.assertEqual(archive.search_archive(""), [])
+
+    def test_archive_api(self):
+        """Test the archive search endpoint returns matches and a next cursor."""
+        url = reverse('api_archive_collection')
+        response = self.client.get(url, {'q': 'invoice', 'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([item['title'] for item in data['results']], ["Invoice April"])
+        self.assertEqual(data['next'], self.todos[1].pk)
+
+        data = self.client.get(url, {'q': 'invoice', 'before': data['next']}).json()
+        self.assertEqual([item['title'] for item in data['results']], ["Invoice March"])
+        self.assertIsNone(data['next'])
+        self.assertEqual(self.client.get(url, {'before': 'x'}).status_code, 400)
+
+    def test_command(self):
+        """Test archive_todos archives then purges."""
+        self.make_todo("Old memo")
+        out = StringIO()
+        call_command('archive_todos', '--retention', '0', stdout=out)
+        self.assertIn("Archived 1 TODO(s).", out.getvalue())
+        self.assertIn("Purged 3 archived TODO(s).", out.getvalue())
+        self.assertFalse(ArchivedTodo.objects.exists())
@@ -0,0 +1,80 @@
+"""
+Unit tests for the async views and async ORM helpers.
+"""
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from myapp.export import aiter_rows
+from myapp.models import Todo
+from myapp.pagination import apaginate, paginate
+from myapp.stats import aget_stats, get_stats
+
+
+class AsyncHelpersTest(TestCase):
+    """Test cases for the async counterparts of the read helpers."""
+
+    def setUp(self):
+        """Create dated and undated todos."""
+        Todo.objects.create(title="Undated")
+        for i in range(3):
+            Todo.objects.create(title=f"Dated {i}", due_date=f"2030-01-0{i + 1}T09:00Z")
+
+    async def test_apaginate_matches_paginate(self):
+        """Test both paginators return the same pages."""
+        for sort in ('due', 'newest'):
+            expected = await sync_to_async(paginate)(Todo.objects.all(), page_size=3, sort=sort)
+            page = await apaginate(Todo.objects.all(), page_size=3, sort=sort)
+            self.assertEqual(list(page), list(expected))
+            page = await apaginate(Todo.objects.all(), cursor=page.next_cursor, page_size=3, sort=sort)
+            self.assertEqual(len(page), 1)
+            self.assertTrue(page.has_previous)
+
+    async def test_aiter_rows_reads_in_chunks(self):
+        """Test the async export reader walks every row across chunks."""
+        rows = [row async for row in aiter_rows(chunk_size=3)]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row[0] for row in rows], sorted(row[0] for row in rows))
+
+    async def test_aget_stats(self):
+        """Test the async stats read the same counters."""
+        self.assertEqual(await aget_stats(), await sync_to_async(get_stats)())
+
+
+class AsyncViewTest(TestCase):
+    """Test cases for the async views served through ASGI."""
+
+    def setUp(self):
+        """Create a sample todo."""
+        self.todo = Todo.objects.create(title="Async todo", description="Served by ASGI")
+
+    async def test_todo_list(self):
+        """Test the list page renders under ASGI."""
+        response = await self.async_client.get(reverse('todo_list'), {'q': 'asgi'})
+        self.assertContains(response, "Async todo")
+        self.assertIn('ETag', response.headers)
+
+    async def test_api_item(self):
+        """Test the JSON item endpoint reads with the async ORM."""
+        response = await self.async_client.get(reverse('api_todo_item', args=[self.todo.pk]))
+        self.assertEqual(response.json()['title'], "Async todo")
+        response = await self.async_client.get(reverse('api_todo_item', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_api_rejects_unknown_method(self):
+        """Test the async API decorator still enforces allowed methods."""
+        response = await self.async_client.put(reverse('api_todo_collection'))
+        self.assertEqual(response.status_code, 405)
+
+    async def test_export_streams_async_iterator(self):
+        """Test exports stream from the async ORM under ASGI."""
+        response = await self.async_client.get(reverse('todo_export'), {'format': 'ndjson'})
+        self.assertTrue(response.is_async)
+        lines = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(lines), 1)
+        self.assertIn(b'"Async todo"', lines[0])
+
+    def test_export_streams_sync_iterator_under_wsgi(self):
+        """Test exports use a plain iterator under WSGI."""
+        response = self.client.get(reverse('todo_export'), {'format': 'ndjson'})
+        self.assertFalse(response.is_async)
+        self.assertIn(b'"Async todo"', b''.join(response.streaming_content))
@@ -0,0 +1,106 @@
+"""
+Unit tests for the versioned list fragment cache.
+"""
+import json
+import re
+
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from myapp import cache as todo_cache
+from myapp import views
+from myapp.models import Todo
+
+
+class TodoListCacheTest(TransactionTestCase):
+    """Test cases for caching in todo_list (outside test transactions)."""
+
+    def setUp(self):
+        """Start from an empty cache."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.url = reverse('todo_list')
+
+    def test_second_request_served_from_cache(self):
+        """Test a repeated GET skips the page query and render."""
+        Todo.objects.create(title="Cached")
+        self.client.get(self.url)
+        # Only the freshness check and the header stats query remain.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Cached")
+
+    def test_cached_rows_get_each_clients_csrf_token(self):
+        """Test the toggle forms in a cached page carry the requesting client's token."""
+        todo = Todo.objects.create(title="Cached")
+        self.client.get(self.url)
+        other = Client(enforce_csrf_checks=True)
+        html = other.get(self.url).content.decode()
+        self.assertNotIn(views.CSRF_SLOT, html)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html).group(1)
+        response = other.post(reverse('todo_toggle_resolved', args=[todo.pk]), {'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 302)
+
+    def test_csrf_marker_in_todo_text_is_left_alone(self):
+        """Test a todo mentioning the marker does not get the token written into it."""
+        Todo.objects.create(title=f"Title {views.CSRF_SLOT}", description="csrf-token-slot")
+        self.client.get(self.url)
+        html = self.client.get(self.url).content.decode()
+        self.assertIn("Title &lt;csrf-token-slot&gt;", html)
+        self.assertRegex(html, r'todo-description[^>]*>\s*csrf-token-slot\s*</p>')
+        self.assertNotIn(views.CSRF_SLOT, html)
+
+    def test_query_params_are_part_of_the_key(self):
+        """Test different pages are cached separately."""
+        self.assertNotEqual(
+            todo_cache.fragment_key('list', {'page_size': '1'}),
+            todo_cache.fragment_key('list', {'page_size': '2'}),
+        )
+
+    def test_save_invalidates(self):
+        """Test creating, editing and deleting a todo bump the version."""
+        todo = Todo.objects.create(title="Before")
+        self.client.get(self.url)
+
+        todo.title = "After"
+        todo.save()
+        self.assertContains(self.client.get(self.url), "After")
+
+        todo.delete()
+        self.assertContains(self.client.get(self.url), "No TODOs yet!")
+
+    def test_toggle_view_invalidates(self):
+        """Test the toggle view invalidates the cached page."""
+        todo = Todo.objects.create(title="Toggle me")
+        self.client.get(self.url)
+        self.client.post(reverse('todo_toggle_resolved', args=[todo.pk]))
+        self.assertContains(self.client.get(self.url), "Unresolve")
+
+    def test_bulk_paths_invalidate(self):
+        """Test bulk API writes bump the version."""
+        todo = Todo.objects.create(title="Bulk")
+        self.client.get(self.url)
+        self.client.post(
+            reverse('api_todo_bulk_update'),
+            json.dumps({'ids': [todo.pk], 'action': 'resolve'}),
+            content_type='application/json',
+        )
+        self.assertContains(self.client.get(self.url), "Unresolve")
+
+    def test_version_survives_eviction(self):
+        """Test a lost version key restarts above any previous version."""
+        old = todo_cache.get_version()
+        cache.delete(todo_cache.VERSION_KEY)
+        self.assertGreaterEqual(todo_cache.get_version(), old)
+
+    @override_settings(TODO_CACHE_TIMEOUT=300)
+    def test_timeout_ends_at_next_due_date(self):
+        """Test a page expires when its next pending item becomes overdue."""
+        now = timezone.now()
+        Todo.objects.create(title="Soon", due_date=now + timedelta(seconds=42))
+        Todo.objects.create(title="Done", due_date=now + timedelta(seconds=5), is_resolved=True)
+        page = list(Todo.objects.all())
+        self.assertEqual(todo_cache.page_timeout(page, now), 42)
+        self.assertEqual(todo_cache.page_timeout([], now), 300)
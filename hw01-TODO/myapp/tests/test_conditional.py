@@ -0,0 +1,122 @@
+"""
+Unit tests for conditional GET on the list and edit pages.
+"""
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from myapp.conditional import list_freshness
+from myapp.models import Todo
+
+
+class ListConditionalGetTest(TestCase):
+    """Test cases for ETag/Last-Modified on todo_list."""
+
+    def setUp(self):
+        """Set up a sample todo and the list URL."""
+        self.url = reverse('todo_list')
+        self.todo = Todo.objects.create(title="First")
+
+    def get_etag(self):
+        response = self.client.get(self.url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        return response['ETag']
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        """Test a fresh validator short-circuits without rendering."""
+        etag = self.get_etag()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since(self):
+        """Test Last-Modified validation on its own."""
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_changes_etag(self):
+        """Test an update produces a new ETag."""
+        etag = self.get_etag()
+        self.todo.title = "Changed"
+        self.todo.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Changed")
+
+    def test_delete_changes_etag(self):
+        """Test deleting a row changes the ETag even though MAX(updated_at) may not."""
+        older = Todo.objects.create(title="Older")
+        Todo.objects.filter(pk=older.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        etag = self.get_etag()
+        older.delete()
+        self.assertNotEqual(self.get_etag(), etag)
+
+    def test_passing_due_date_changes_etag(self):
+        """Test a todo turning overdue invalidates the page without any write."""
+        due = timezone.now() + timedelta(hours=1)
+        Todo.objects.create(title="Soon", due_date=due)
+        before, _ = list_freshness(None, now=due - timedelta(minutes=1))
+        after, _ = list_freshness(None, now=due + timedelta(minutes=1))
+        self.assertNotEqual(before, after)
+
+    def test_pending_message_is_not_hidden(self):
+        """Test a queued flash message gets the full page even with a fresh ETag."""
+        etag = self.get_etag()
+        storage = CookieStorage(RequestFactory().get(self.url))
+        storage.add(messages.SUCCESS, 'Saved elsewhere')
+        response = HttpResponse()
+        storage.update(response)
+        self.client.cookies['messages'] = response.cookies['messages'].value
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Saved elsewhere')
+
+    def test_new_csrf_cookie_changes_etag(self):
+        """Test a page rendered with another CSRF token is not reused."""
+        etag = self.get_etag()
+        self.client.cookies['csrftoken'] = 'a' * 32
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_is_not_conditional(self):
+        """Test non-GET requests bypass the check."""
+        response = self.client.post(reverse('todo_create'), {'title': 'New'})
+        self.assertNotIn('ETag', response)
+
+
+class EditConditionalGetTest(TestCase):
+    """Test cases for ETag/Last-Modified on todo_edit."""
+
+    def setUp(self):
+        """Set up a sample todo and its edit URL."""
+        self.todo = Todo.objects.create(title="Edit me")
+        self.url = reverse('todo_edit', args=[self.todo.pk])
+
+    def test_edit_page_304(self):
+        """Test the edit page honours If-None-Match with one query."""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_page_changes_after_save(self):
+        """Test the row's updated_at drives the ETag."""
+        etag = self.client.get(self.url)['ETag']
+        self.todo.description = "New"
+        self.todo.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_todo_still_404(self):
+        """Test missing rows fall through to the view's 404."""
+        response = self.client.get(reverse('todo_edit', args=[9999]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,159 @@
+"""
+Unit tests for live change events.
+"""
+import asyncio
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from myapp import events
+from myapp.bulk import delete_todos, set_resolved
+from myapp.models import Todo
+
+
+def parse(chunk):
+    """Parse one text/event-stream chunk into a dict of its fields."""
+    fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines() if ': ' in line)
+    if 'data' in fields:
+        fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+class BrokerTest(TestCase):
+    """Test cases for the in-process broker."""
+
+    async def test_publish_reaches_subscribers(self):
+        """Test events are queued for every subscriber."""
+        broker = events.Broker()
+        first, _ = broker.subscribe()
+        second, _ = broker.subscribe()
+        broker.publish('updated', {'n': 1})
+        self.assertEqual((await first.get(1)).data, {'n': 1})
+        self.assertEqual((await second.get(1)).type, 'updated')
+        first.close()
+        second.close()
+        self.assertFalse(broker.has_subscribers())
+
+    async def test_replay_after_last_event_id(self):
+        """Test reconnecting clients receive the events they missed."""
+        broker = events.Broker(history_size=3)
+        published = [broker.publish('updated', {'n': n}) for n in range(5)]
+        subscription, replay = broker.subscribe(last_event_id=published[2].id)
+        self.assertEqual([event.data['n'] for event in replay], [3, 4])
+        subscription.close()
+
+        # Too old, or from another process: the client must resync.
+        self.assertIsNone(broker.subscribe(last_event_id=published[0].id)[1])
+        self.assertIsNone(broker.subscribe(last_event_id='other-1')[1])
+
+    async def test_overflow_marks_subscription(self):
+        """Test a full queue flags the stream for a resync."""
+        broker = events.Broker()
+        subscription, _ = broker.subscribe(queue_size=1)
+        broker.publish('updated', {})
+        broker.publish('updated', {})
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.overflowed)
+
+
+class PublishTest(TestCase):
+    """Test cases for events published from Todo writes."""
+
+    def setUp(self):
+        """Register a subscriber on the shared broker."""
+        self.published = []
+        self.original_publish = events.broker.publish
+        events.broker.publish = lambda type, data, owner='': self.published.append((type, data))
+        events.broker._subscribers.add(object())
+        self.addCleanup(self.restore)
+
+    def restore(self):
+        events.broker.publish = self.original_publish
+        events.broker._subscribers.clear()
+
+    def test_save_and_delete_publish_after_commit(self):
+        """Test saves and deletes publish rendered rows on commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            todo = Todo.objects.create(title="Live")
+        with self.captureOnCommitCallbacks(execute=True):
+            todo.is_resolved = True
+            todo.save()
+        pk = todo.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            todo.delete()
+
+        self.assertEqual([type for type, _ in self.published], ['created', 'updated', 'deleted'])
+        updated = self.published[1][1]
+        self.assertTrue(updated['todos'][0]['todo']['is_resolved'])
+        self.assertIn(f'data-todo-id="{pk}"', updated['todos'][0]['html'])
+        self.assertEqual(updated['stats']['resolved'], 1)
+        self.assertEqual(self.published[2][1]['ids'], [pk])
+
+    def test_nothing_published_before_commit(self):
+        """Test events wait for the transaction to commit."""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Todo.objects.create(title="Pending commit")
+        self.assertEqual(self.published, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.published[0][0], 'created')
+
+    def test_bulk_writes_publish(self):
+        """Test the bulk paths publish one event per batch."""
+        todos = [Todo.objects.create(title=f"T{i}") for i in range(3)]
+        pks = [todo.pk for todo in todos]
+        with self.captureOnCommitCallbacks(execute=True):
+            set_resolved(pks, True)
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_todos(pks[:2])
+        self.assertEqual(self.published[0][0], 'updated')
+        self.assertEqual(len(self.published[0][1]['todos']), 3)
+        self.assertEqual(self.published[1], ('deleted', {'ids': pks[:2], 'stats': self.published[1][1]['stats']}))
+
+    def test_no_subscribers_no_work(self):
+        """Test nothing is scheduled when no stream is open."""
+        events.broker._subscribers.clear()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Todo.objects.create(title="Unwatched")
+        # Only the cache invalidation callback is registered.
+        self.assertEqual(len(callbacks), 1)
+
+
+class EventStreamViewTest(TestCase):
+    """Test cases for the /events/ endpoint."""
+
+    @override_settings(TODO_EVENTS_HEARTBEAT=0.05, TODO_EVENTS_MAX_AGE=5)
+    async def test_stream_delivers_events(self):
+        """Test the stream sends retry, events and keep-alives."""
+        response = await self.async_client.get(reverse('todo_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content.__aiter__()
+        self.assertEqual(await chunks.__anext__(), b'retry: 3000\n\n')
+
+        events.broker.publish('deleted', {'ids': [1], 'stats': {}})
+        event = parse((await chunks.__anext__()).decode())
+        self.assertEqual(event['event'], 'deleted')
+        self.assertEqual(event['data']['ids'], [1])
+        self.assertEqual(await chunks.__anext__(), b': keep-alive\n\n')
+        await chunks.aclose()
+        events.broker._subscribers.clear()
+
+    async def test_stream_closes_after_max_age(self):
+        """Test streams end on their own and unsubscribe."""
+        chunks = [chunk async for chunk in events.stream(heartbeat=0.05, max_age=0.2)]
+        self.assertEqual(chunks[0], 'retry: 3000\n\n')
+        self.assertIn(': keep-alive\n\n', chunks)
+        self.assertFalse(events.broker.has_subscribers())
+
+    async def test_stream_resyncs_unknown_last_event_id(self):
+        """Test a Last-Event-ID that cannot be replayed triggers a resync."""
+        stream = events.stream(last_event_id='gone-42', heartbeat=1, max_age=1)
+        await stream.__anext__()
+        self.assertEqual(parse(await stream.__anext__())['event'], 'resync')
+        await stream.aclose()
+        self.assertFalse(events.broker.has_subscribers())
+
+    def test_wsgi_gets_no_content(self):
+        """Test WSGI clients are told not to reconnect."""
+        response = self.client.get(reverse('todo_events'))
+        self.assertEqual(response.status_code, 204)
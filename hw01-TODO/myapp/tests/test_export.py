@@ -0,0 +1,120 @@
+"""
+Unit tests for the streaming export endpoint and command.
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from datetime import datetime, timedelta
+from myapp import export, sharding
+from myapp.models import Todo
+
+
+class TodoExportTest(TestCase):
+    """Test cases for todo_export and export_todos."""
+
+    databases = '__all__'  # export_todos visits every shard.
+
+    def setUp(self):
+        """Set up sample todos across due dates and statuses."""
+        self.url = reverse('todo_export')
+        due = timezone.make_aware(datetime(2030, 6, 15, 12, 0))
+        Todo.objects.create(title="June", due_date=due)
+        Todo.objects.create(title="July", due_date=due + timedelta(days=30), is_resolved=True)
+        Todo.objects.create(title='Quote "and", comma', description="Line\nbreak")
+
+    def read_stream(self, response):
+        self.assertFalse(hasattr(response, 'content'))
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        """Test the CSV export streams a header and every row."""
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read_stream(response))))
+        self.assertEqual([row['title'] for row in rows], ["June", "July", 'Quote "and", comma'])
+        self.assertEqual(rows[2]['description'], "Line\nbreak")
+
+    def test_ndjson_export(self):
+        """Test the NDJSON export emits one object per line."""
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        lines = self.read_stream(response).splitlines()
+        self.assertEqual(len(lines), 3)
+        record = json.loads(lines[1])
+        self.assertEqual(record['title'], "July")
+        self.assertTrue(record['is_resolved'])
+
+    def test_export_filters(self):
+        """Test is_resolved and due date range filters."""
+        response = self.client.get(self.url, {'format': 'ndjson', 'is_resolved': 'false'})
+        titles = [json.loads(line)['title'] for line in self.read_stream(response).splitlines()]
+        self.assertEqual(titles, ["June", 'Quote "and", comma'])
+
+        response = self.client.get(
+            self.url, {'format': 'ndjson', 'due_after': '2030-07-01', 'due_before': '2030-08-01'}
+        )
+        titles = [json.loads(line)['title'] for line in self.read_stream(response).splitlines()]
+        self.assertEqual(titles, ["July"])
+
+    def test_export_rejects_bad_input(self):
+        """Test malformed parameters return 400."""
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'due_after': 'soon'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'is_resolved': 'maybe'}).status_code, 400)
+
+    async def test_sync_and_async_exports_match(self):
+        """Test both serializers produce the same lines in every format."""
+        rows = [(1, 'A, "quoted"', '', timezone.now(), False, timezone.now(), timezone.now())]
+
+        async def arows():
+            for row in rows:
+                yield row
+
+        for export_format in export.EXPORT_FORMATS:
+            with self.subTest(export_format=export_format):
+                lines = [line async for line in export.aiter_export(export_format, arows())]
+                self.assertEqual(list(export.iter_export(export_format, rows)), lines)
+
+    def test_export_command(self):
+        """Test export_todos writes the filtered rows to a file."""
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        call_command('export_todos', '--output', path, '--is-resolved', 'true', stderr=io.StringIO())
+        with open(path, newline='', encoding='utf-8') as fh:
+            rows = list(csv.DictReader(fh))
+        self.assertEqual([row['title'] for row in rows], ["July"])
+
+
+class ExportCommandOwnersTest(TestCase):
+    """Test cases for export_todos with several owners (on any shard)."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        Todo.objects.create(title="Anonymous")
+        with sharding.owner_scope('alice'):
+            Todo.objects.create(title="Alice's")
+
+    def export_titles(self, *args):
+        fd, path = tempfile.mkstemp(suffix='.ndjson')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        call_command('export_todos', '--format', 'ndjson', '--output', path, *args, stderr=io.StringIO())
+        with open(path, encoding='utf-8') as fh:
+            return sorted(json.loads(line)['title'] for line in fh)
+
+    def test_exports_every_owner(self):
+        """Test the command exports all owners' todos by default."""
+        self.assertEqual(self.export_titles(), ["Alice's", "Anonymous"])
+
+    def test_exports_one_owner(self):
+        """Test --owner limits the export to that owner."""
+        self.assertEqual(self.export_titles('--owner', 'alice'), ["Alice's"])
+        self.assertEqual(self.export_titles('--owner', ''), ["Anonymous"])
@@ -1,10 +1,11 @@
 """
-Unit tests for TodoForm.
+Unit tests for TodoForm and TodoFilterForm.
 """
 from django.test import TestCase
 from django.utils import timezone
-from datetime import timedelta
-from myapp.forms import TodoForm
+from datetime import datetime, timedelta
+from myapp.forms import TodoFilterForm, TodoForm
+from myapp.models import Todo
 
 
 class TodoFormTest(TestCase):
@@ -65,6 +66,18 @@ class TodoFormTest(TestCase):
         self.assertIn('description', form.fields)
         self.assertIn('due_date', form.fields)
 
+    def test_form_version_initial(self):
+        """Test edit forms carry the todo's updated_at as their version."""
+        todo = Todo.objects.create(title="Versioned")
+        form = TodoForm(instance=todo)
+        self.assertEqual(form['version'].value(), todo.updated_at.isoformat())
+
+    def test_form_invalid_version(self):
+        """Test a malformed version is a validation error."""
+        form = TodoForm(data={'title': "Test", 'version': "yesterday"})
+        self.assertFalse(form.is_valid())
+        self.assertIn('version', form.errors)
+
     def test_form_due_date_widget(self):
         """Test that due_date field uses datetime-local widget."""
         form = TodoForm()
@@ -97,3 +110,56 @@ class TodoFormTest(TestCase):
         form_data = {'title': 'Test <>&"\''}
         form = TodoForm(data=form_data)
         self.assertTrue(form.is_valid())
+
+
+class TodoFilterFormTest(TestCase):
+    """Test cases for the list filters."""
+
+    def setUp(self):
+        """Create todos around a fixed Wednesday noon."""
+        self.now = timezone.make_aware(datetime(2030, 1, 9, 12, 0))
+        self.overdue = Todo.objects.create(title="Overdue", due_date=self.now - timedelta(hours=1))
+        self.later_today = Todo.objects.create(title="Later today", due_date=self.now + timedelta(hours=2))
+        self.friday = Todo.objects.create(title="Friday", due_date=self.now + timedelta(days=2))
+        self.next_week = Todo.objects.create(title="Next week", due_date=self.now + timedelta(days=7))
+        self.done = Todo.objects.create(title="Done", due_date=self.now - timedelta(days=1), is_resolved=True)
+        self.undated = Todo.objects.create(title="Undated")
+
+    def titles(self, data):
+        form = TodoFilterForm(data)
+        return sorted(todo.title for todo in form.filter_queryset(Todo.objects.all(), self.now))
+
+    def test_no_filters(self):
+        """Test an empty form matches everything."""
+        self.assertEqual(len(self.titles({})), 6)
+        self.assertFalse(TodoFilterForm({}).has_filters)
+        self.assertEqual(TodoFilterForm({}).sort_key, 'due')
+
+    def test_status(self):
+        """Test pending/resolved filters."""
+        self.assertEqual(self.titles({'status': 'resolved'}), ["Done"])
+        self.assertNotIn("Done", self.titles({'status': 'pending'}))
+
+    def test_overdue_only(self):
+        """Test overdue excludes resolved and future todos."""
+        self.assertEqual(self.titles({'overdue': 'on'}), ["Overdue"])
+
+    def test_due_today_and_this_week(self):
+        """Test the preset windows use local calendar days."""
+        self.assertEqual(self.titles({'due': 'today'}), ["Later today", "Overdue"])
+        self.assertEqual(self.titles({'due': 'week'}), ["Done", "Friday", "Later today", "Overdue"])
+
+    def test_custom_range_is_inclusive(self):
+        """Test the custom range includes both end dates."""
+        data = {'due_after': '2030-01-09', 'due_before': '2030-01-11'}
+        self.assertEqual(self.titles(data), ["Friday", "Later today", "Overdue"])
+
+    def test_custom_range_narrows_preset(self):
+        """Test a custom range combines with a preset window."""
+        self.assertEqual(self.titles({'due': 'week', 'due_after': '2030-01-10'}), ["Friday"])
+
+    def test_invalid_values_are_ignored(self):
+        """Test bad values are dropped instead of failing the page."""
+        form = TodoFilterForm({'status': 'bogus', 'due_after': 'soon', 'sort': 'title'})
+        self.assertEqual(len(form.filter_queryset(Todo.objects.all(), self.now)), 6)
+        self.assertEqual(form.sort_key, 'due')
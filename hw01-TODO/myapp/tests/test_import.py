@@ -0,0 +1,106 @@
+"""
+Unit tests for the bulk import command.
+"""
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from myapp import importer
+from myapp.models import Todo
+from myapp.stats import compute_stats, get_stats
+
+
+class ImportTodosCommandTest(TestCase):
+    """Test cases for import_todos."""
+
+    def write_file(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(content)
+        self.addCleanup(os.remove, path)
+        self.addCleanup(lambda: os.path.exists(path + '.errors.ndjson') and os.remove(path + '.errors.ndjson'))
+        return path
+
+    def run_import(self, path, *args):
+        out = io.StringIO()
+        call_command('import_todos', path, *args, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def read_errors(self, path):
+        with open(path + '.errors.ndjson', encoding='utf-8') as fh:
+            return [json.loads(line) for line in fh]
+
+    def test_import_csv(self):
+        """Test valid CSV rows are imported in batches."""
+        path = self.write_file('.csv', (
+            "title,description,due_date,is_resolved\n"
+            "First,Desc,2030-01-01T09:30,false\n"
+            "Second,,,1\n"
+            "Third,,,0\n"
+        ))
+        output = self.run_import(path, '--batch-size', '2')
+        self.assertIn("Imported 3 rows.", output)
+        self.assertEqual(
+            list(Todo.objects.order_by('pk').values_list('title', 'is_resolved')),
+            [("First", False), ("Second", True), ("Third", False)],
+        )
+        self.assertIsNotNone(Todo.objects.get(title="First").due_date)
+        self.assertEqual(get_stats(), compute_stats())
+        self.assertFalse(os.path.exists(path + '.errors.ndjson'))
+
+    def test_invalid_rows_go_to_error_file(self):
+        """Test rows TodoForm rejects are written to the side file."""
+        path = self.write_file('.csv', (
+            "title,due_date,is_resolved\n"
+            "Good,,\n"
+            ",,\n"
+            "Bad date,01/02/2030,\n"
+            "Bad flag,,maybe\n"
+        ))
+        output = self.run_import(path)
+        self.assertIn("3 rejected", output)
+        self.assertEqual(list(Todo.objects.values_list('title', flat=True)), ["Good"])
+        errors = self.read_errors(path)
+        self.assertEqual([row['line'] for row in errors], [3, 4, 5])
+        self.assertIn('title', errors[0]['errors'])
+        self.assertIn('due_date', errors[1]['errors'])
+        self.assertIn('is_resolved', errors[2]['errors'])
+
+    def test_import_ndjson(self):
+        """Test NDJSON input, including malformed lines."""
+        path = self.write_file('.ndjson', (
+            '{"title": "One", "is_resolved": true}\n'
+            'not json\n'
+            '\n'
+            '{"title": "Two"}\n'
+        ))
+        self.run_import(path)
+        self.assertEqual(Todo.objects.count(), 2)
+        self.assertTrue(Todo.objects.get(title="One").is_resolved)
+        self.assertEqual([row['line'] for row in self.read_errors(path)], [2])
+
+    def test_import_with_worker_processes(self):
+        """Test the multiprocess validation stage imports every row."""
+        rows = ''.join(f'{{"title": "Row {i}"}}\n' for i in range(50))
+        path = self.write_file('.ndjson', rows)
+        self.run_import(path, '--workers', '2', '--batch-size', '10')
+        self.assertEqual(Todo.objects.count(), 50)
+
+    def test_worker_processes_read_one_batch_each_ahead(self):
+        """Test the pool is fed one batch per worker, not the whole input."""
+        pulled = []
+
+        def records():
+            for i in range(100):
+                pulled.append(i)
+                yield i + 1, f'{{"title": "Row {i}"}}\n'
+
+        seen = []
+        importer.import_records(
+            records(), batch_size=10, workers=2, on_progress=lambda result: seen.append(len(pulled)),
+        )
+        self.assertEqual(Todo.objects.count(), 100)
+        self.assertLessEqual(seen[0], 2 * 10)
@@ -1,10 +1,12 @@
 """
 Unit tests for Todo model.
 """
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
-from myapp.models import Todo
+from myapp.models import ConcurrentUpdateError, Todo
 
 
 class TodoModelTest(TestCase):
@@ -117,3 +119,91 @@ class TodoModelTest(TestCase):
         self.assertEqual(todos[0].title, "First")
         self.assertEqual(todos[1].title, "Second")
         self.assertEqual(todos[2].title, "Third")
+
+
+class TodoSaveChangesTest(TestCase):
+    """Test cases for partial and conditional saves."""
+
+    def setUp(self):
+        """Create a todo."""
+        self.todo = Todo.objects.create(title="Original", description="Keep me")
+
+    def test_writes_only_named_fields(self):
+        """Test the UPDATE names only the changed fields and updated_at."""
+        self.todo.title = "Renamed"
+        with CaptureQueriesContext(connection) as ctx:
+            self.todo.save_changes(['title'])
+        # Savepoints aside, the save is a single UPDATE.
+        statements = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 1)
+        sql = statements[0]
+        self.assertIn('"title"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_no_changes_no_query(self):
+        """Test nothing is written when no field changed."""
+        with self.assertNumQueries(0):
+            self.assertFalse(self.todo.save_changes([]))
+
+    def test_stale_version_conflicts(self):
+        """Test a save against an outdated updated_at raises and writes nothing."""
+        seen = self.todo.updated_at
+        Todo.objects.filter(pk=self.todo.pk).update(
+            description="Someone else", updated_at=seen + timedelta(seconds=1)
+        )
+        self.todo.title = "Mine"
+        with self.assertRaises(ConcurrentUpdateError):
+            self.todo.save_changes(['title'], expected_updated_at=seen)
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.title, "Original")
+
+    def test_current_version_saves(self):
+        """Test a save against the current updated_at succeeds."""
+        self.todo.title = "Mine"
+        self.todo.save_changes(['title'], expected_updated_at=self.todo.updated_at)
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.title, "Mine")
+
+
+class TodoDueStatusTest(TestCase):
+    """Test cases for the with_due_status() annotations."""
+
+    def setUp(self):
+        """Set up a fixed reference time and sample todos."""
+        self.now = timezone.now()
+        Todo.objects.create(title="Past", due_date=self.now - timedelta(hours=2))
+        Todo.objects.create(title="Future", due_date=self.now + timedelta(hours=3))
+        Todo.objects.create(
+            title="Resolved past",
+            due_date=self.now - timedelta(hours=2),
+            is_resolved=True,
+        )
+        Todo.objects.create(title="No due date")
+
+    def annotated(self, title):
+        return Todo.objects.with_due_status(self.now).get(title=title)
+
+    def test_overdue_annotation(self):
+        """Test overdue is computed in SQL against the given now."""
+        self.assertTrue(self.annotated("Past").overdue)
+        self.assertFalse(self.annotated("Future").overdue)
+        self.assertFalse(self.annotated("Resolved past").overdue)
+        self.assertFalse(self.annotated("No due date").overdue)
+
+    def test_time_remaining_annotation(self):
+        """Test time_remaining is the due date minus now."""
+        self.assertEqual(self.annotated("Future").seconds_until_due(), 3 * 3600)
+        self.assertEqual(self.annotated("Past").seconds_until_due(), -2 * 3600)
+        self.assertIsNone(self.annotated("No due date").seconds_until_due())
+
+    def test_is_overdue_prefers_annotation(self):
+        """Test is_overdue() uses the annotation when present."""
+        todo = Todo.objects.with_due_status(self.now - timedelta(days=1)).get(title="Past")
+        self.assertFalse(todo.is_overdue())
+        self.assertTrue(Todo.objects.get(title="Past").is_overdue())
+
+    def test_seconds_until_due_without_annotation(self):
+        """Test seconds_until_due() falls back to Python arithmetic."""
+        todo = Todo.objects.get(title="Future")
+        self.assertEqual(todo.seconds_until_due(now=self.now), 3 * 3600)
@@ -0,0 +1,132 @@
+"""
+Unit tests for keyset pagination.
+"""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from myapp.models import Todo
+from myapp.pagination import paginate, decode_cursor, get_page_size
+
+
+class PaginateTest(TestCase):
+    """Test cases for the paginate helper."""
+
+    def setUp(self):
+        """Create todos with distinct, tied and missing due dates."""
+        now = timezone.now()
+        self.same_due = now + timedelta(days=2)
+        self.todos = [
+            Todo.objects.create(title="Due 1", due_date=now + timedelta(days=1)),
+            Todo.objects.create(title="Due 2a", due_date=self.same_due),
+            Todo.objects.create(title="Due 2b", due_date=self.same_due),
+            Todo.objects.create(title="Due 3", due_date=now + timedelta(days=3)),
+            Todo.objects.create(title="No due 1"),
+            Todo.objects.create(title="No due 2"),
+        ]
+        self.expected = [todo.title for todo in self.todos]
+
+    def walk_forward(self, page_size):
+        titles = []
+        page = paginate(Todo.objects.all(), page_size=page_size)
+        titles.extend(todo.title for todo in page)
+        while page.has_next:
+            page = paginate(Todo.objects.all(), cursor=page.next_cursor, page_size=page_size)
+            titles.extend(todo.title for todo in page)
+        return titles, page
+
+    def test_first_page_orders_nulls_last(self):
+        """Test rows are ordered by due date with NULL due dates last."""
+        page = paginate(Todo.objects.all(), page_size=10)
+        self.assertEqual([todo.title for todo in page], self.expected)
+        self.assertFalse(page.has_next)
+        self.assertFalse(page.has_previous)
+
+    def test_walk_forward_visits_every_row_once(self):
+        """Test following next cursors yields every row exactly once."""
+        for size in (1, 2, 4):
+            titles, _ = self.walk_forward(size)
+            self.assertEqual(titles, self.expected)
+
+    def test_walk_backward(self):
+        """Test following previous cursors returns to the first page."""
+        _, page = self.walk_forward(2)
+        titles = [todo.title for todo in page]
+        while page.has_previous:
+            page = paginate(Todo.objects.all(), cursor=page.previous_cursor, page_size=2)
+            titles = [todo.title for todo in page] + titles
+        self.assertEqual(titles, self.expected)
+
+    def test_previous_page_matches_earlier_page(self):
+        """Test going next then previous returns the same rows."""
+        first = paginate(Todo.objects.all(), page_size=2)
+        second = paginate(Todo.objects.all(), cursor=first.next_cursor, page_size=2)
+        back = paginate(Todo.objects.all(), cursor=second.previous_cursor, page_size=2)
+        self.assertEqual([t.pk for t in back], [t.pk for t in first])
+        self.assertTrue(back.has_next)
+        self.assertFalse(back.has_previous)
+
+    def test_page_query_count_is_constant(self):
+        """Test a page inside one segment is fetched with a single query."""
+        first = paginate(Todo.objects.all(), page_size=1)
+        with self.assertNumQueries(1):
+            paginate(Todo.objects.all(), cursor=first.next_cursor, page_size=1)
+
+    def test_boundary_page_query_count(self):
+        """Test a page straddling dated and undated rows costs two queries."""
+        first = paginate(Todo.objects.all(), page_size=3)
+        with self.assertNumQueries(2):
+            page = paginate(Todo.objects.all(), cursor=first.next_cursor, page_size=3)
+        self.assertEqual([t.title for t in page], ["Due 3", "No due 1", "No due 2"])
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        """Test an invalid cursor is ignored."""
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page = paginate(Todo.objects.all(), cursor='not-a-cursor', page_size=2)
+        self.assertEqual([t.title for t in page], self.expected[:2])
+
+    def test_sort_by_created(self):
+        """Test newest/oldest sorts walk created_at in both directions."""
+        newest = [todo.title for todo in reversed(self.todos)]
+        for sort, expected in (('newest', newest), ('oldest', newest[::-1])):
+            page = paginate(Todo.objects.all(), page_size=4, sort=sort)
+            self.assertEqual([t.title for t in page], expected[:4])
+            page = paginate(Todo.objects.all(), cursor=page.next_cursor, page_size=4, sort=sort)
+            self.assertEqual([t.title for t in page], expected[4:])
+            page = paginate(Todo.objects.all(), cursor=page.previous_cursor, page_size=4, sort=sort)
+            self.assertEqual([t.title for t in page], expected[:4])
+
+    def test_cursor_from_other_sort_is_ignored(self):
+        """Test a cursor only applies to the sort order it was issued for."""
+        page = paginate(Todo.objects.all(), page_size=2)
+        page = paginate(Todo.objects.all(), cursor=page.next_cursor, page_size=2, sort='newest')
+        self.assertEqual([t.title for t in page], ["No due 2", "No due 1"])
+        with self.assertRaises(ValueError):
+            paginate(Todo.objects.all(), sort='title')
+
+    @override_settings(TODO_PAGE_SIZE=3, TODO_MAX_PAGE_SIZE=5)
+    def test_page_size_is_clamped(self):
+        """Test page size falls back to the default and is clamped."""
+        self.assertEqual(get_page_size(None), 3)
+        self.assertEqual(get_page_size('abc'), 3)
+        self.assertEqual(get_page_size('0'), 1)
+        self.assertEqual(get_page_size('500'), 5)
+
+
+class TodoListPaginationViewTest(TestCase):
+    """Test cases for pagination in the todo_list view."""
+
+    @override_settings(TODO_PAGE_SIZE=2)
+    def test_todo_list_paginates(self):
+        """Test the list view renders one page and a next link."""
+        for i in range(5):
+            Todo.objects.create(title=f"Todo {i}")
+        response = self.client.get(reverse('todo_list'))
+        self.assertEqual(len(response.context['todos']), 2)
+        self.assertTrue(response.context['page'].has_next)
+        self.assertContains(response, 'rel="next"')
+
+        cursor = response.context['page'].next_cursor
+        response = self.client.get(reverse('todo_list'), {'cursor': cursor})
+        self.assertEqual([t.title for t in response.context['todos']], ["Todo 2", "Todo 3"])
+        self.assertContains(response, 'rel="prev"')
@@ -0,0 +1,116 @@
+"""
+Unit tests for the request performance instrumentation.
+"""
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from myapp import perf
+from myapp.models import Todo
+
+
+@override_settings(TODO_PERF_EXPOSE=True)
+class PerformanceMiddlewareTest(TestCase):
+    """Test cases for myapp.perf.PerformanceMiddleware."""
+
+    def setUp(self):
+        """Start every test from empty metrics."""
+        perf.metrics.reset()
+        self.addCleanup(perf.metrics.reset)
+        Todo.objects.create(title="Timed")
+
+    def test_server_timing_header(self):
+        """Test responses report app, database and template time."""
+        response = self.client.get(reverse('todo_list'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$')
+        self.assertNotIn('desc="0 queries"', timing)
+
+    def test_server_timing_on_async_views(self):
+        """Test the async API views are measured too."""
+        response = self.client.get(reverse('api_todo_collection'))
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+        self.assertIn('tpl;dur=0.0', response['Server-Timing'])
+
+    async def test_server_timing_under_asgi(self):
+        """Test queries run in sync_to_async threads are attributed to the request."""
+        response = await self.async_client.get(reverse('todo_list'))
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    @override_settings(TODO_PERF_EXPOSE=False)
+    def test_server_timing_hidden_unless_exposed(self):
+        """Test clients get no timings by default, while the log line is still written."""
+        with self.assertLogs('myapp.perf', 'INFO'):
+            response = self.client.get(reverse('todo_list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_log_line(self):
+        """Test one JSON line is logged per request."""
+        with self.assertLogs('myapp.perf', 'INFO') as logs:
+            self.client.get(reverse('todo_list'))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['route'], 'todo_list')
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['queries'], 0)
+        self.assertGreater(line['template_ms'], 0)
+
+    def test_repeated_queries_flagged(self):
+        """Test a statement run in a loop is logged as a likely N+1."""
+        stats = perf.RequestStats()
+        stats.statements['SELECT 1 WHERE id = %s'] = 5
+        stats.statements['SELECT 2'] = 1
+        self.assertEqual(stats.repeated_queries(3), {'SELECT 1 WHERE id = %s': 5})
+
+    @override_settings(TODO_PERF_REPEAT_THRESHOLD=1)
+    def test_repeated_queries_logged(self):
+        """Test repeated statements produce a warning and a metrics count."""
+        with self.assertLogs('myapp.perf', 'WARNING') as logs:
+            self.client.get(reverse('todo_list'))
+        warning = json.loads(logs.records[0].getMessage())
+        self.assertEqual(warning['event'], 'repeated_query')
+        self.assertEqual(perf.metrics.snapshot()['todo_list']['repeated_queries'], 1)
+
+    def test_list_has_no_repeated_queries(self):
+        """Test the list page runs no statement three times."""
+        for i in range(5):
+            Todo.objects.create(title=f"Todo {i}")
+        with self.assertNoLogs('myapp.perf', 'WARNING'):
+            self.client.get(reverse('todo_list'))
+
+
+@override_settings(TODO_PERF_EXPOSE=True)
+class MetricsEndpointTest(TestCase):
+    """Test cases for the /metrics/ endpoint."""
+
+    def setUp(self):
+        """Start every test from empty metrics."""
+        perf.metrics.reset()
+        self.addCleanup(perf.metrics.reset)
+
+    def test_percentiles_per_route(self):
+        """Test requests are aggregated per URL name."""
+        for _ in range(3):
+            self.client.get(reverse('todo_list'))
+        routes = self.client.get(reverse('todo_metrics')).json()['routes']
+        summary = routes['todo_list']
+        self.assertEqual(summary['count'], 3)
+        self.assertLessEqual(summary['p50_ms'], summary['p95_ms'])
+        self.assertLessEqual(summary['p95_ms'], summary['p99_ms'])
+
+    def test_remote_clients_refused(self):
+        """Test the endpoint only answers local clients."""
+        response = self.client.get(reverse('todo_metrics'), REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(TODO_PERF_EXPOSE=False)
+    def test_local_clients_refused_unless_exposed(self):
+        """Test loopback alone (e.g. a reverse proxy on the same host) is not enough."""
+        response = self.client.get(reverse('todo_metrics'), REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(perf.percentile(values, 0.50), 50)
+        self.assertEqual(perf.percentile(values, 0.99), 99)
+        self.assertIsNone(perf.percentile([], 0.5))
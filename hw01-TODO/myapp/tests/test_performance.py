@@ -0,0 +1,291 @@
+"""
+Performance regression tests.
+
+``QueryCountTest`` always runs: every endpoint must issue a fixed number
+of queries, whatever the table size.
+
+``LatencyRegressionTest`` seeds 10k and 100k rows and compares each
+endpoint's latency and peak memory with ``perf_baseline.json``.  It is
+slow, so it only runs when ``TODO_PERF_SUITE=1``::
+
+    TODO_PERF_SUITE=1 python manage.py test myapp.tests.test_performance
+
+Set ``TODO_PERF_UPDATE_BASELINE=1`` as well to record a new baseline
+instead of comparing (do this on the machine that runs the suite).
+``TODO_PERF_TOLERANCE`` (default 0.5) is the allowed slowdown or memory
+growth as a fraction of the baseline, and ``TODO_PERF_ROWS`` overrides
+the table sizes, e.g. ``TODO_PERF_ROWS=10000``.
+"""
+import gc
+import json
+import os
+import time
+import tracemalloc
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from myapp.models import Todo
+from myapp.stats import rebuild_counters
+
+BASELINE_PATH = Path(__file__).with_name('perf_baseline.json')
+
+RUN_SUITE = os.environ.get('TODO_PERF_SUITE') == '1'
+
+UPDATE_BASELINE = os.environ.get('TODO_PERF_UPDATE_BASELINE') == '1'
+
+TOLERANCE = float(os.environ.get('TODO_PERF_TOLERANCE', '0.5'))
+
+ROW_COUNTS = [int(n) for n in os.environ.get('TODO_PERF_ROWS', '10000,100000').split(',')]
+
+# Latency and memory below these floors are noise, not regressions.
+MIN_LATENCY_MS = 20.0
+
+MIN_PEAK_KIB = 256.0
+
+
+def calibrate(repeat=5):
+    """
+    Time a fixed CPU-bound loop, in milliseconds.
+
+    Stored with the baseline so latencies can be scaled to the speed of
+    the machine (or the load on it) at the time of each run.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sum(len(str(i)) for i in range(300_000))
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def seed_todos(count, start=0, batch_size=5000):
+    """
+    Add ``count`` todos numbered from ``start``.
+
+    A third have no due date, a fifth are resolved and due dates spread a
+    year either side of now, so every list filter matches some rows.
+    """
+    now = timezone.now()
+    for offset in range(start, start + count, batch_size):
+        Todo.objects.bulk_create([
+            Todo(
+                title=f'Task {i}',
+                description='Regression row' if i % 4 else '',
+                due_date=None if i % 3 == 0 else now + timedelta(hours=(i * 37) % 17520 - 8760),
+                is_resolved=i % 5 == 0,
+            )
+            for i in range(offset, min(offset + batch_size, start + count))
+        ])
+    rebuild_counters()
+
+
+def endpoints(pk):
+    """``(name, url, params)`` for each endpoint under test."""
+    return [
+        ('todo_list', reverse('todo_list'), {}),
+        ('todo_list_filtered', reverse('todo_list'), {'status': 'pending', 'sort': 'newest'}),
+        ('todo_list_overdue', reverse('todo_list'), {'overdue': 'on'}),
+        ('todo_list_search', reverse('todo_list'), {'q': 'task 42'}),
+        ('api_todo_collection', reverse('api_todo_collection'), {}),
+        ('api_todo_item', reverse('api_todo_item', args=[pk]), {}),
+        ('todo_edit', reverse('todo_edit', args=[pk]), {}),
+    ]
+
+
+class PerformanceTestMixin:
+
+    def fetch(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            # Drain without keeping the chunks, so peak memory is the view's.
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as ctx:
+            self.fetch(url, params)
+        return len(ctx.captured_queries)
+
+
+class QueryCountTest(PerformanceTestMixin, TestCase):
+    """Test cases for per-endpoint query counts."""
+
+    # List pages cost the ETag freshness check, the page and the stats;
+    # a search swaps the page query for the FTS one.
+    EXPECTED = {
+        'todo_list': 3,
+        'todo_list_filtered': 3,
+        'todo_list_overdue': 3,
+        'todo_list_search': 3,
+        'api_todo_collection': 1,
+        'api_todo_item': 1,
+        'todo_edit': 2,
+    }
+
+    def test_query_counts(self):
+        """Test each endpoint issues its fixed number of queries."""
+        seed_todos(200)
+        pk = Todo.objects.order_by('pk').values_list('pk', flat=True).first()
+        for name, url, params in endpoints(pk):
+            with self.subTest(endpoint=name):
+                with self.assertNumQueries(self.EXPECTED[name]):
+                    self.fetch(url, params)
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        """Test ten times the rows costs no extra queries."""
+        seed_todos(100)
+        pk = Todo.objects.order_by('pk').values_list('pk', flat=True).first()
+        small = {name: self.count_queries(url, params) for name, url, params in endpoints(pk)}
+        seed_todos(900, start=100)
+        large = {name: self.count_queries(url, params) for name, url, params in endpoints(pk)}
+        self.assertEqual(small, large)
+
+    def test_export_is_one_query(self):
+        """Test the CSV export streams every row from a single query."""
+        seed_todos(300)
+        with self.assertNumQueries(1):
+            self.fetch(reverse('todo_export'), {'format': 'csv'})
+
+    def test_toggle_query_count(self):
+        """Test a toggle is the UPDATE plus the counter update (inside a savepoint) and the stats."""
+        seed_todos(50)
+        pk = Todo.objects.values_list('pk', flat=True).first()
+        with self.assertNumQueries(5):
+            self.client.post(reverse('todo_toggle_resolved', args=[pk]), HTTP_ACCEPT='application/json')
+
+
+# The session and message storage of myproject.settings_production.
+COOKIE_PROFILE = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+    'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage',
+}
+
+
+def session_queries(captured):
+    return [query for query in captured if 'django_session' in query['sql']]
+
+
+@override_settings(TODO_SHARDS=['default'])
+class SessionQueryTest(TestCase):
+    """Test cases for the queries sessions and flash messages cost."""
+
+    def setUp(self):
+        seed_todos(20)
+
+    def test_anonymous_list_skips_the_session(self):
+        """Test an anonymous list request neither loads nor creates a session."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('todo_list'))
+        self.assertEqual(session_queries(ctx.captured_queries), [])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_anonymous_messages_skip_the_session(self):
+        """Test the message after a create reaches the list without a session."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('todo_create'), {'title': "Flashed"}, follow=True)
+        self.assertContains(response, 'TODO &quot;Flashed&quot; created successfully!')
+        self.assertEqual(session_queries(ctx.captured_queries), [])
+
+    def test_cookie_profile_saves_the_session_query(self):
+        """Test logged-in requests read django_session only with database sessions."""
+        user = User.objects.create_user('alice')
+        url = reverse('todo_list')
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as database:
+            self.client.get(url)
+        self.assertEqual(len(session_queries(database.captured_queries)), 1)
+
+        with override_settings(**COOKIE_PROFILE):
+            client = self.client_class()
+            client.force_login(user)
+            with CaptureQueriesContext(connection) as cookie:
+                response = client.post(reverse('todo_create'), {'title': "Flashed"}, follow=True)
+                client.get(url)
+        self.assertContains(response, 'TODO &quot;Flashed&quot; created successfully!')
+        self.assertEqual(session_queries(cookie.captured_queries), [])
+
+
+@unittest.skipUnless(RUN_SUITE, 'set TODO_PERF_SUITE=1 to run the latency/memory regression suite')
+class LatencyRegressionTest(PerformanceTestMixin, TestCase):
+    """Test cases comparing latency and memory with the recorded baseline."""
+
+    repeat = 9
+
+    def measure_latency(self, url, params):
+        """Best of ``repeat`` runs: the least noisy estimate on a shared machine."""
+        self.fetch(url, params)  # warm caches and compiled templates
+        gc.collect()
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            self.fetch(url, params)
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    def measure_peak_memory(self, url, params):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            self.fetch(url, params)
+            return tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    def measure(self):
+        results = {}
+        seeded = 0
+        for rows in sorted(ROW_COUNTS):
+            seed_todos(rows - seeded, start=seeded)
+            seeded = rows
+            pk = Todo.objects.order_by('pk').values_list('pk', flat=True).first()
+            cases = endpoints(pk) + [('todo_export_csv', reverse('todo_export'), {'format': 'csv'})]
+            for name, url, params in cases:
+                results[f'{name}@{rows}'] = {
+                    'queries': self.count_queries(url, params),
+                    'latency_ms': round(self.measure_latency(url, params), 3),
+                    'peak_kib': round(self.measure_peak_memory(url, params), 1),
+                }
+        return results
+
+    def test_against_baseline(self):
+        """Test no endpoint got slower, hungrier or chattier than the baseline."""
+        results = self.measure()
+        calibration_ms = calibrate()
+        if UPDATE_BASELINE:
+            baseline = {'calibration_ms': round(calibration_ms, 3), 'endpoints': results}
+            BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            return
+        if not BASELINE_PATH.exists():
+            self.skipTest(f'no baseline at {BASELINE_PATH}; run with TODO_PERF_UPDATE_BASELINE=1')
+        baseline = json.loads(BASELINE_PATH.read_text())
+        # A machine running twice as slow as when the baseline was taken
+        # gets twice the latency budget; memory and queries are unscaled.
+        speed = calibration_ms / baseline['calibration_ms']
+
+        for key, result in sorted(results.items()):
+            expected = baseline['endpoints'].get(key)
+            if expected is None:
+                continue
+            with self.subTest(endpoint=key):
+                self.assertLessEqual(result['queries'], expected['queries'], 'query count grew')
+                self.assertLessEqual(
+                    result['latency_ms'],
+                    max(expected['latency_ms'], MIN_LATENCY_MS) * speed * (1 + TOLERANCE),
+                    f'latency regressed: {result["latency_ms"]} ms vs {expected["latency_ms"]} ms'
+                    f' (machine speed factor {speed:.2f})',
+                )
+                self.assertLessEqual(
+                    result['peak_kib'],
+                    max(expected['peak_kib'], MIN_PEAK_KIB) * (1 + TOLERANCE),
+                    f'peak memory regressed: {result["peak_kib"]} KiB vs {expected["peak_kib"]} KiB',
+                )
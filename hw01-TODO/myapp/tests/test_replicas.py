@@ -0,0 +1,142 @@
+"""
+Unit tests for read replicas: routing, read-your-writes stickiness and syncing.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from myapp import replicas, sharding
+from myapp.models import Todo
+
+REPLICAS = {'default': ['replica']}
+
+
+def read_alias_view(request):
+    """Report where TODO reads would go; optionally write first."""
+    if request.GET.get('write'):
+        replicas.note_write()
+    return HttpResponse(replicas.read_alias('default'))
+
+
+@override_settings(TODO_READ_REPLICAS=REPLICAS)
+class ReplicaRoutingTest(SimpleTestCase):
+    """Test cases for choosing between the primary and a replica."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = replicas.ReplicaMiddleware(replicas.replica_reads(read_alias_view))
+
+    def read_from(self, request):
+        return self.middleware(request).content.decode()
+
+    def test_get_reads_from_replica(self):
+        """Test GETs in a replica_reads view read from the replica."""
+        self.assertEqual(self.read_from(self.factory.get('/')), 'replica')
+
+    def test_other_methods_and_views_read_from_primary(self):
+        """Test POSTs, undecorated views and code outside requests use the primary."""
+        self.assertEqual(self.read_from(self.factory.post('/')), 'default')
+        plain = replicas.ReplicaMiddleware(read_alias_view)
+        self.assertEqual(plain(self.factory.get('/')).content.decode(), 'default')
+        self.assertEqual(replicas.read_alias('default'), 'default')
+
+    def test_write_sticks_to_primary(self):
+        """Test a write moves the rest of the request and the client to the primary."""
+        response = self.middleware(self.factory.get('/', {'write': 1}))
+        self.assertEqual(response.content.decode(), 'default')
+        cookie = response.cookies[replicas.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], replicas.get_replication_lag())
+
+        request = self.factory.get('/')
+        request.COOKIES[replicas.STICKY_COOKIE] = '1'
+        self.assertEqual(self.read_from(request), 'default')
+
+    @override_settings(TODO_READ_REPLICAS={})
+    def test_no_cookie_without_replicas(self):
+        """Test nothing is pinned when no replicas are configured."""
+        response = self.middleware(self.factory.get('/', {'write': 1}))
+        self.assertNotIn(replicas.STICKY_COOKIE, response.cookies)
+
+    def test_writes_go_to_primary(self):
+        """Test rows read from a replica are written back to its primary."""
+        todo = Todo(title="Read from replica")
+        todo._state.db = 'replica'
+        self.assertEqual(sharding.ShardRouter().db_for_write(Todo, instance=todo), 'default')
+        self.assertTrue(sharding.ShardRouter().allow_migrate('replica', 'auth', 'user'))
+
+
+class ReplicaSyncTest(SimpleTestCase):
+    """Test cases for copying SQLite files and judging their freshness."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.primary = os.path.join(directory.name, 'primary.sqlite3')
+        self.replica = os.path.join(directory.name, 'replica.sqlite3')
+        with sqlite3.connect(self.primary) as db:
+            db.execute('CREATE TABLE item (name TEXT)')
+            db.execute("INSERT INTO item VALUES ('copied')")
+        db.close()
+
+    def test_copy_database(self):
+        """Test the replica gets the primary's rows and a fresh modification time."""
+        replicas.copy_database(self.primary, self.replica)
+        db = sqlite3.connect(self.replica)
+        self.addCleanup(db.close)
+        self.assertEqual(db.execute('SELECT name FROM item').fetchall(), [('copied',)])
+        self.assertLess(replicas.file_age(self.replica), 1)
+
+    def test_file_age(self):
+        """Test ages come from the modification time, and non-files have none."""
+        stale = time.time() - 60
+        os.utime(self.primary, (stale, stale))
+        self.assertGreaterEqual(replicas.file_age(self.primary), 60)
+        self.assertIsNone(replicas.file_age(self.replica))
+        self.assertIsNone(replicas.file_age('file:memorydb?mode=memory'))
+
+
+@override_settings(TODO_READ_REPLICAS={'default': ['default']})
+class ReplicaViewsTest(TestCase):
+    """
+    Test cases for the views with a read replica configured.
+
+    The primary is listed as its own replica, as test mirrors are, so
+    reads go through the replica routing but see the primary's rows.
+    """
+
+    def setUp(self):
+        Todo.objects.create(title="Existing")
+
+    def test_reads_do_not_stick(self):
+        """Test the replica-read views answer without pinning the client."""
+        for name in ('todo_list', 'todo_export', 'api_todo_collection', 'api_archive_collection'):
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn(replicas.STICKY_COOKIE, response.cookies)
+        self.assertContains(self.client.get(reverse('todo_list')), "Existing")
+
+    def test_read_your_writes_after_create(self):
+        """Test a create pins the client to the primary and the list shows the new todo."""
+        response = self.client.post(reverse('todo_create'), {'title': "Just saved"})
+        cookie = response.cookies[replicas.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], replicas.get_replication_lag())
+        self.assertTrue(cookie['httponly'])
+
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "Just saved")
+        self.assertContains(response, "Existing")
+
+        other = self.client_class()
+        self.assertNotIn(replicas.STICKY_COOKIE, other.get(reverse('todo_list')).cookies)
+
+    def test_mirrored_replica_reads_the_primary(self):
+        """Test a replica naming the primary's own database is not used."""
+        self.assertFalse(replicas.is_usable('default', 'default'))
+        request = RequestFactory().get('/')
+        middleware = replicas.ReplicaMiddleware(replicas.replica_reads(read_alias_view))
+        self.assertEqual(middleware(request).content.decode(), 'default')
@@ -0,0 +1,127 @@
+"""
+Unit tests for the due-date scheduler.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from myapp import bulk
+from myapp.models import Todo
+from myapp.scheduler import DUE_SOON, OVERDUE, DueScheduler
+from myapp.signals import todo_due_soon, todo_overdue
+
+
+class DueSchedulerTest(TestCase):
+    """Test cases for DueScheduler, stepped with an explicit clock."""
+
+    def setUp(self):
+        """Start a scheduler with a 10 minute lead and a 1 hour horizon."""
+        self.now = timezone.now()
+        self.soon = Todo.objects.create(title="Soon", due_date=self.now + timedelta(minutes=30))
+        self.later = Todo.objects.create(title="Later", due_date=self.now + timedelta(hours=5))
+        Todo.objects.create(title="Done", due_date=self.now + timedelta(minutes=20), is_resolved=True)
+        Todo.objects.create(title="Past", due_date=self.now - timedelta(minutes=5))
+        Todo.objects.create(title="Undated")
+        self.scheduler = DueScheduler(reminder_lead=600, horizon=3600, sync_interval=5)
+        self.signals = []
+        for signal in (todo_due_soon, todo_overdue):
+            signal.connect(self.record, sender=Todo)
+            self.addCleanup(signal.disconnect, self.record, sender=Todo)
+
+    def record(self, signal, sender, todo, **kwargs):
+        self.signals.append((signal, todo.title))
+
+    def at(self, **offset):
+        return self.now + timedelta(**offset)
+
+    def fired(self, now):
+        return [(kind, todo.title) for kind, todo in self.scheduler.run_pending(now)]
+
+    def test_start_loads_window_with_one_range_query(self):
+        """Test only pending deadlines inside the horizon are loaded."""
+        with CaptureQueriesContext(connection) as ctx:
+            loaded = self.scheduler.start(self.now)
+        self.assertEqual(loaded, 1)
+        self.assertEqual(list(self.scheduler.deadlines), [self.soon.pk])
+        # The watermark read plus one range query; never the whole table.
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_load_query_uses_pending_due_index(self):
+        """Test the window query is served by the partial due_date index."""
+        plan = (
+            Todo.all_owners
+            .filter(is_resolved=False, due_date__gte=self.now, due_date__lt=self.at(hours=1))
+            .values_list('pk', 'due_date')
+            .explain()
+        )
+        self.assertIn('todo_pending_due_idx', plan)
+
+    def test_fires_reminder_then_overdue_at_due_times(self):
+        """Test the reminder fires at due minus lead and the notice at due."""
+        self.scheduler.start(self.now)
+        self.assertEqual(self.fired(self.at(minutes=19)), [])
+        self.assertEqual(self.fired(self.at(minutes=20)), [(DUE_SOON, "Soon")])
+        self.assertEqual(self.fired(self.at(minutes=29)), [])
+        self.assertEqual(self.fired(self.at(minutes=30)), [(OVERDUE, "Soon")])
+        self.assertEqual(self.fired(self.at(minutes=45)), [])
+        self.assertEqual(self.signals, [(todo_due_soon, "Soon"), (todo_overdue, "Soon")])
+
+    def test_waits_until_next_deadline(self):
+        """Test the worker sleeps to the next entry, capped by the sync interval."""
+        self.scheduler.start(self.now)
+        self.assertEqual(self.scheduler.seconds_until_next(self.at(minutes=19, seconds=58)), 2)
+        self.assertEqual(self.scheduler.seconds_until_next(self.now), 5)
+
+    def test_late_run_skips_reminder(self):
+        """Test a worker that wakes after the due date sends only the overdue notice."""
+        self.scheduler.start(self.now)
+        self.assertEqual(self.fired(self.at(minutes=31)), [(OVERDUE, "Soon")])
+
+    def test_sync_schedules_new_and_moved_deadlines(self):
+        """Test creates and due date edits are picked up by sync."""
+        self.scheduler.start(self.now)
+        Todo.objects.create(title="New", due_date=self.at(minutes=40))
+        self.soon.due_date = self.at(minutes=50)
+        self.soon.save()
+        self.scheduler.sync(self.now)
+
+        self.assertEqual(self.fired(self.at(minutes=30)), [(DUE_SOON, "New")])
+        self.assertEqual(self.fired(self.at(minutes=40)), [(OVERDUE, "New"), (DUE_SOON, "Soon")])
+        self.assertEqual(self.fired(self.at(minutes=50)), [(OVERDUE, "Soon")])
+
+    def test_sync_drops_resolved_todos(self):
+        """Test resolving a todo, one by one or in bulk, cancels its notices."""
+        self.scheduler.start(self.now)
+        bulk.set_resolved([self.soon.pk], True)
+        self.scheduler.sync(self.now)
+        self.assertEqual(self.fired(self.at(hours=1)), [])
+
+    def test_unsynced_changes_are_caught_before_firing(self):
+        """Test todos deleted or resolved since the last sync are not announced."""
+        other = Todo.objects.create(title="Other", due_date=self.at(minutes=30))
+        self.scheduler.start(self.now)
+        self.soon.delete()
+        Todo.objects.filter(pk=other.pk).update(is_resolved=True)
+        self.assertEqual(self.fired(self.at(hours=1)), [])
+
+    def test_edit_without_due_change_keeps_schedule(self):
+        """Test an unrelated edit neither duplicates nor drops notices."""
+        self.scheduler.start(self.now)
+        self.soon.title = "Soon (renamed)"
+        self.soon.save()
+        self.scheduler.sync(self.at(minutes=30))
+        self.assertEqual(
+            self.fired(self.at(minutes=30)),
+            [(OVERDUE, "Soon (renamed)")],
+        )
+
+    def test_extend_loads_next_window(self):
+        """Test later deadlines are loaded once half the window has passed."""
+        self.scheduler.start(self.now)
+        self.fired(self.at(minutes=30))
+        self.assertEqual(self.scheduler.extend(self.at(minutes=20)), 0)
+        self.assertEqual(self.scheduler.extend(self.at(hours=4, minutes=30)), 1)
+        self.assertIn(self.later.pk, self.scheduler.deadlines)
+        self.assertEqual(self.fired(self.at(hours=5)), [(OVERDUE, "Later")])
@@ -0,0 +1,127 @@
+"""
+Unit tests for full-text search.
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from myapp.bulk import create_todos, delete_todos
+from myapp.models import Todo
+from myapp.search import build_match_query, filter_todos, rank_todos, search_page
+
+
+class BuildMatchQueryTest(TestCase):
+    """Test cases for turning user input into an FTS5 query."""
+
+    def test_terms_become_quoted_prefixes(self):
+        """Test each word becomes a quoted prefix term."""
+        self.assertEqual(build_match_query('buy Milk'), '"buy"* "Milk"*')
+
+    def test_operators_and_quotes_are_stripped(self):
+        """Test FTS5 syntax in the input cannot break the query."""
+        self.assertEqual(build_match_query('"milk" OR (eggs*) -bread'), '"milk"* "OR"* "eggs"* "bread"*')
+        self.assertEqual(build_match_query('  "*  '), '')
+
+
+class SearchTest(TestCase):
+    """Test cases for ranked, prefix and filtered search."""
+
+    def setUp(self):
+        """Create todos with the search term in titles and descriptions."""
+        self.in_description = Todo.objects.create(title="Errands", description="Buy groceries and milk")
+        self.in_title = Todo.objects.create(title="Groceries", description="Weekly shop")
+        Todo.objects.create(title="Write report", description="Quarterly numbers")
+
+    def titles(self, queryset):
+        return [todo.title for todo in queryset]
+
+    def test_title_matches_rank_first(self):
+        """Test title matches outrank description matches."""
+        self.assertEqual(self.titles(rank_todos(Todo.objects.all(), 'groceries')), ["Groceries", "Errands"])
+
+    def test_prefix_match(self):
+        """Test partial words match."""
+        self.assertEqual(self.titles(rank_todos(Todo.objects.all(), 'gro')), ["Groceries", "Errands"])
+
+    def test_all_terms_must_match(self):
+        """Test multiple terms are combined with AND."""
+        self.assertEqual(self.titles(rank_todos(Todo.objects.all(), 'groceries milk')), ["Errands"])
+
+    def test_case_and_diacritics_are_ignored(self):
+        """Test matching is case and accent insensitive."""
+        Todo.objects.create(title="Café visit")
+        self.assertEqual(self.titles(filter_todos(Todo.objects.all(), 'CAFE')), ["Café visit"])
+
+    def test_empty_query_matches_nothing(self):
+        """Test a query without words returns no rows."""
+        self.assertFalse(rank_todos(Todo.objects.all(), '!!!').exists())
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test edits and deletes are reflected in the index."""
+        self.in_title.title = "Pharmacy"
+        self.in_title.save()
+        self.assertEqual(self.titles(filter_todos(Todo.objects.all(), 'pharmacy')), ["Pharmacy"])
+        self.assertEqual(self.titles(filter_todos(Todo.objects.all(), 'groceries')), ["Errands"])
+
+        self.in_description.delete()
+        self.assertFalse(filter_todos(Todo.objects.all(), 'groceries').exists())
+
+    def test_index_follows_bulk_writes(self):
+        """Test bulk inserts and deletes are indexed too."""
+        created = create_todos([Todo(title=f"Bulk errand {i}") for i in range(3)])
+        self.assertEqual(filter_todos(Todo.objects.all(), 'bulk').count(), 3)
+        delete_todos([todo.pk for todo in created])
+        self.assertFalse(filter_todos(Todo.objects.all(), 'bulk').exists())
+
+    def test_composes_with_filters(self):
+        """Test search respects filters already on the queryset."""
+        Todo.objects.filter(pk=self.in_title.pk).update(is_resolved=True)
+        pending = Todo.objects.filter(is_resolved=False)
+        self.assertEqual(self.titles(rank_todos(pending, 'groceries')), ["Errands"])
+
+    def test_search_page_walks_results(self):
+        """Test search pages cover every match exactly once."""
+        for i in range(5):
+            Todo.objects.create(title=f"Groceries list {i}")
+        page = search_page(Todo.objects.all(), 'groceries', page_size=3)
+        seen = self.titles(page)
+        while page.has_next:
+            page = search_page(Todo.objects.all(), 'groceries', cursor=page.next_cursor, page_size=3)
+            seen.extend(self.titles(page))
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+        self.assertTrue(page.has_previous)
+
+
+class SearchViewTest(TestCase):
+    """Test cases for the search box on the list page and in the admin."""
+
+    def setUp(self):
+        """Create a searchable todo and a non-matching one."""
+        Todo.objects.create(title="Call plumber", description="Kitchen sink leaks")
+        Todo.objects.create(title="Pay rent")
+
+    def test_list_search(self):
+        """Test the list page shows only matching todos."""
+        response = self.client.get(reverse('todo_list'), {'q': 'sink'})
+        self.assertContains(response, "Call plumber")
+        self.assertNotContains(response, "Pay rent")
+        self.assertEqual(response.context['query'], 'sink')
+
+    def test_list_search_without_matches(self):
+        """Test an empty result shows the no-match message."""
+        response = self.client.get(reverse('todo_list'), {'q': 'nothing'})
+        self.assertContains(response, "No matching TODOs")
+
+    def test_admin_search_uses_index(self):
+        """Test admin searches go through the FTS table."""
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:myapp_todo_changelist'), {'q': 'plumb'})
+        self.assertContains(response, "Call plumber")
+        self.assertNotContains(response, "Pay rent")
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertIn('myapp_todo_fts MATCH', sql)
+        self.assertNotIn('LIKE', sql)
@@ -0,0 +1,37 @@
+"""
+Unit tests for the production settings profile.
+"""
+import importlib
+import os
+import sys
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+MODULE = 'myproject.settings_production'
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    """Test cases for myproject.settings_production."""
+
+    def load(self, secret_key=None):
+        environ = {name: value for name, value in os.environ.items() if name != 'DJANGO_SECRET_KEY'}
+        if secret_key is not None:
+            environ['DJANGO_SECRET_KEY'] = secret_key
+        # Import a fresh copy and leave the loaded modules as they were.
+        with mock.patch.dict(sys.modules), mock.patch.dict(os.environ, environ, clear=True):
+            sys.modules.pop(MODULE, None)
+            return importlib.import_module(MODULE)
+
+    def test_secret_key_is_required(self):
+        """Test the profile refuses to fall back to the committed development key."""
+        with self.assertRaises(ImproperlyConfigured):
+            self.load()
+
+    def test_secret_key_from_environment(self):
+        """Test the key comes from DJANGO_SECRET_KEY, with cookie sessions and messages."""
+        module = self.load('production-key')
+        self.assertEqual(module.SECRET_KEY, 'production-key')
+        self.assertEqual(module.SESSION_ENGINE, 'django.contrib.sessions.backends.signed_cookies')
+        self.assertEqual(module.MESSAGE_STORAGE, 'django.contrib.messages.storage.cookie.CookieStorage')
@@ -0,0 +1,225 @@
+"""
+Unit tests for per-owner sharding: placement, routing, owner scoping and moves.
+"""
+import unittest
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from myapp import search, sharding
+from myapp.models import ArchivedTodo, OwnerShard, Todo, TodoCounter
+from myapp.stats import compute_stats, get_stats
+
+SHARDS = ['default', 'shard1', 'shard2']
+
+
+@override_settings(TODO_SHARDS=SHARDS)
+class PlacementTest(SimpleTestCase):
+    """Test cases for hashed placement and the router."""
+
+    def test_hash_is_stable_and_spreads_owners(self):
+        """Test an owner always hashes to the same shard and owners spread out."""
+        owners = [f'user{i}' for i in range(60)]
+        placed = [sharding.hashed_shard(owner) for owner in owners]
+        self.assertEqual(placed, [sharding.hashed_shard(owner) for owner in owners])
+        self.assertEqual(set(placed), set(SHARDS))
+
+    def test_anonymous_owner_lives_on_first_shard(self):
+        """Test the anonymous owner is never hashed or looked up."""
+        self.assertEqual(sharding.hashed_shard(''), 'default')
+        self.assertEqual(sharding.shard_for_owner(''), 'default')
+
+    def test_router_follows_scope(self):
+        """Test TODO models route to the current shard and the rest to default."""
+        router = sharding.ShardRouter()
+        self.assertEqual(router.db_for_read(Todo), 'default')
+        with sharding.use_shard('shard2'):
+            self.assertEqual(router.db_for_read(Todo), 'shard2')
+            self.assertEqual(router.db_for_write(TodoCounter), 'shard2')
+            self.assertEqual(router.db_for_write(OwnerShard), 'default')
+            self.assertIsNone(router.db_for_read(User))
+            self.assertIsNone(sharding.current_owner())
+
+    def test_router_prefers_instance_database(self):
+        """Test a loaded instance is written back where it came from."""
+        todo = Todo(title="Loaded")
+        todo._state.db = 'shard1'
+        self.assertEqual(sharding.ShardRouter().db_for_write(Todo, instance=todo), 'shard1')
+
+    def test_allow_migrate(self):
+        """Test TODO tables exist on every shard and everything else on default only."""
+        router = sharding.ShardRouter()
+        self.assertTrue(router.allow_migrate('shard1', 'myapp', 'todo'))
+        self.assertTrue(router.allow_migrate('default', 'myapp', 'archivedtodo'))
+        self.assertFalse(router.allow_migrate('other', 'myapp', 'todo'))
+        self.assertFalse(router.allow_migrate('shard1', 'myapp', 'ownershard'))
+        self.assertTrue(router.allow_migrate('default', 'myapp', 'ownershard'))
+        self.assertFalse(router.allow_migrate('shard1', 'auth', 'user'))
+
+
+@override_settings(TODO_SHARDS=['default'])
+class OwnerScopeTest(TestCase):
+    """Test cases for owner-scoped querysets, counters and views (one shard)."""
+
+    def setUp(self):
+        """Create an anonymous todo and two of alice's."""
+        Todo.objects.create(title="Shared")
+        with sharding.owner_scope('alice'):
+            Todo.objects.create(title="Alice one", description="groceries")
+            Todo.objects.create(title="Alice two", is_resolved=True)
+
+    def test_single_shard_needs_no_lookup(self):
+        """Test placement costs no query with one shard."""
+        with self.assertNumQueries(0):
+            self.assertEqual(sharding.shard_for_owner('alice'), 'default')
+
+    def test_querysets_only_see_the_owner(self):
+        """Test Todo.objects is limited to the current owner."""
+        self.assertEqual(list(Todo.objects.values_list('title', flat=True)), ["Shared"])
+        with sharding.owner_scope('alice'):
+            self.assertEqual(Todo.objects.count(), 2)
+            self.assertEqual(Todo.objects.get(title="Alice one").owner, 'alice')
+        with sharding.use_shard('default'):
+            self.assertEqual(Todo.objects.count(), 3)
+        self.assertEqual(Todo.all_owners.count(), 3)
+
+    def test_counters_are_per_owner(self):
+        """Test each owner gets their own counter row and stats."""
+        self.assertEqual(get_stats()['total'], 1)
+        with sharding.owner_scope('alice'):
+            self.assertEqual(get_stats(), compute_stats())
+            self.assertEqual(get_stats()['resolved'], 1)
+        self.assertEqual(
+            dict(TodoCounter.objects.values_list('owner', 'total')), {'': 1, 'alice': 2},
+        )
+
+    def test_views_are_scoped_to_the_logged_in_user(self):
+        """Test a logged-in user sees and changes only their own todos."""
+        self.client.force_login(User.objects.create_user('alice'))
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "Alice one")
+        self.assertNotContains(response, "Shared")
+
+        self.client.post(reverse('todo_create'), {'title': "Alice three"})
+        self.assertEqual(Todo.all_owners.get(title="Alice three").owner, 'alice')
+
+        shared = Todo.all_owners.get(title="Shared")
+        self.assertEqual(self.client.get(reverse('todo_edit', args=[shared.pk])).status_code, 404)
+        self.assertEqual(
+            self.client.post(reverse('todo_toggle_resolved', args=[shared.pk])).status_code, 404,
+        )
+        self.assertFalse(Todo.all_owners.get(pk=shared.pk).is_resolved)
+
+    def test_anonymous_visitors_do_not_see_users_todos(self):
+        """Test the anonymous list leaves out every user's todos."""
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "Shared")
+        self.assertNotContains(response, "Alice")
+
+    def test_search_is_scoped(self):
+        """Test full-text search only matches the owner's todos."""
+        self.assertFalse(search.filter_todos(Todo.objects.all(), "groceries").exists())
+        with sharding.owner_scope('alice'):
+            self.assertTrue(search.filter_todos(Todo.objects.all(), "groceries").exists())
+
+    def test_move_to_unknown_shard_fails(self):
+        """Test moves are only made to configured shards."""
+        with self.assertRaises(ValueError):
+            sharding.move_owner('alice', 'nowhere')
+
+
+@unittest.skipUnless(
+    'shard1' in settings.DATABASES,
+    "Needs a second shard: run with TODO_SHARD_COUNT=2.",
+)
+class MultiShardTest(TestCase):
+    """Test cases across two shard databases."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        """Give alice todos and an archived todo on the first shard."""
+        OwnerShard.objects.create(owner='alice', shard='default')
+        with sharding.owner_scope('alice'):
+            self.todos = [
+                Todo.objects.create(title=f"Alice {i}", description="garden", is_resolved=i == 0)
+                for i in range(3)
+            ]
+        ArchivedTodo.objects.create(
+            id=999, owner='alice', title="Old", created_at=self.todos[0].created_at,
+            updated_at=self.todos[0].updated_at, archived_at=self.todos[0].updated_at,
+        )
+
+    def test_pinned_owner_routes_to_their_shard(self):
+        """Test writes made in an owner's scope land in their shard's database."""
+        OwnerShard.objects.create(owner='bob', shard='shard1')
+        with sharding.owner_scope('bob'):
+            Todo.objects.create(title="Bob's")
+        self.assertFalse(Todo.all_owners.filter(owner='bob').exists())
+        self.assertTrue(Todo.all_owners.using('shard1').filter(owner='bob').exists())
+
+    def test_counters_follow_the_row(self):
+        """Test a todo saved while another shard is in scope counts where it was saved."""
+        with sharding.use_shard('shard1'):
+            todo = Todo(title="Added from shard1's admin")
+            todo.save()
+        self.assertEqual(todo._state.db, 'default')
+        self.assertEqual(TodoCounter.objects.using('default').get(owner='').total, 1)
+        self.assertFalse(TodoCounter.objects.using('shard1').exists())
+
+        with sharding.use_shard('shard1'):
+            todo.delete()
+        self.assertEqual(TodoCounter.objects.using('default').get(owner='').total, 0)
+
+    def test_move_owner(self):
+        """Test a move copies todos, archive and counters, re-pins and cleans up."""
+        self.assertEqual(sharding.move_owner('alice', 'shard1'), 3)
+        self.assertEqual(sharding.shard_for_owner('alice'), 'shard1')
+        self.assertFalse(Todo.all_owners.using('default').filter(owner='alice').exists())
+        self.assertFalse(TodoCounter.objects.using('default').filter(owner='alice').exists())
+        with sharding.owner_scope('alice'):
+            self.assertEqual(
+                sorted(Todo.objects.values_list('title', flat=True)), ["Alice 0", "Alice 1", "Alice 2"],
+            )
+            self.assertEqual(get_stats(), compute_stats())
+            self.assertEqual(get_stats()['resolved'], 1)
+            self.assertEqual(search.filter_todos(Todo.objects.all(), "garden").count(), 3)
+            self.assertEqual(list(ArchivedTodo.objects.values_list('title', flat=True)), ["Old"])
+
+    def test_moved_ids_do_not_collide(self):
+        """Test moved rows take fresh ids above everything on the target."""
+        with sharding.use_shard('shard1'):
+            existing = Todo.objects.create(title="Already here")
+        sharding.move_owner('alice', 'shard1')
+        with sharding.use_shard('shard1'):
+            ids = list(Todo.objects.values_list('pk', flat=True)) + [
+                *ArchivedTodo.objects.values_list('pk', flat=True)
+            ]
+            self.assertEqual(len(ids), len(set(ids)))
+            self.assertTrue(all(pk > existing.pk for pk in ids if pk != existing.pk))
+            later = Todo.objects.create(title="Later")
+        self.assertGreater(later.pk, max(ids))
+
+    def test_rebalance_moves_misplaced_owners(self):
+        """Test rebalance_shards without --owner brings rows back to their shard."""
+        OwnerShard.objects.filter(owner='alice').update(shard='shard1')
+        out = StringIO()
+        call_command('rebalance_shards', '--dry-run', stdout=out)
+        self.assertIn("Would move 'alice' from default to shard1.", out.getvalue())
+        self.assertTrue(Todo.all_owners.filter(owner='alice').exists())
+
+        call_command('rebalance_shards', stdout=out)
+        self.assertIn("Moved 3 TODO(s) of 'alice' from default to shard1.", out.getvalue())
+        self.assertEqual(Todo.all_owners.using('shard1').filter(owner='alice').count(), 3)
+        self.assertEqual(list(sharding.misplaced_owners()), [])
+
+    def test_command_moves_one_owner(self):
+        """Test rebalance_shards --owner --to moves and pins that owner."""
+        out = StringIO()
+        call_command('rebalance_shards', '--owner', 'alice', '--to', 'shard1', stdout=out)
+        self.assertIn("Moved 3 TODO(s)", out.getvalue())
+        self.assertEqual(OwnerShard.objects.get(owner='alice').shard, 'shard1')
+        self.assertEqual(Todo.all_owners.using('shard1').filter(owner='alice').count(), 3)
@@ -0,0 +1,42 @@
+"""
+Unit tests for the SQLite connection tuning hook.
+"""
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+
+class SqlitePragmaTest(SimpleTestCase):
+    """Test cases for myapp.sqlite.apply_sqlite_pragmas."""
+
+    databases = {'default'}
+
+    def open_connection(self):
+        conn = connection.copy()
+        self.addCleanup(conn.close)
+        conn.ensure_connection()
+        return conn
+
+    def pragma(self, conn, name):
+        with conn.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234, 'cache_size': -2048, 'synchronous': 'NORMAL'})
+    def test_pragmas_applied_on_new_connections(self):
+        """Test configured pragmas are set when a connection opens."""
+        conn = self.open_connection()
+        self.assertEqual(self.pragma(conn, 'busy_timeout'), 1234)
+        self.assertEqual(self.pragma(conn, 'cache_size'), -2048)
+        self.assertEqual(self.pragma(conn, 'synchronous'), 1)  # NORMAL
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_no_pragmas_by_default(self):
+        """Test nothing is changed without SQLITE_PRAGMAS."""
+        conn = self.open_connection()
+        self.assertNotEqual(self.pragma(conn, 'busy_timeout'), 1234)
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout; DROP TABLE x': 1})
+    def test_rejects_invalid_pragma_names(self):
+        """Test pragma names are validated before being interpolated."""
+        with self.assertRaises(ValueError):
+            self.open_connection()
@@ -0,0 +1,74 @@
+"""
+Unit tests for header statistics and the materialized counters.
+"""
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from myapp.models import Todo, TodoCounter
+from myapp.stats import get_stats, compute_stats, rebuild_counters
+
+
+class StatsTest(TestCase):
+    """Test cases for get_stats and the counter signal handlers."""
+
+    def setUp(self):
+        """Create a mix of pending, resolved and overdue todos."""
+        past = timezone.now() - timedelta(days=1)
+        Todo.objects.create(title="Pending")
+        Todo.objects.create(title="Overdue", due_date=past)
+        Todo.objects.create(title="Resolved late", due_date=past, is_resolved=True)
+
+    def assertStats(self, total, resolved, overdue):
+        expected = {
+            'total': total,
+            'resolved': resolved,
+            'pending': total - resolved,
+            'overdue': overdue,
+        }
+        self.assertEqual(get_stats(), expected)
+        self.assertEqual(compute_stats(), expected)
+
+    def test_stats_after_create(self):
+        """Test counters reflect created todos."""
+        self.assertStats(total=3, resolved=1, overdue=1)
+
+    def test_get_stats_single_query(self):
+        """Test get_stats costs exactly one query."""
+        with self.assertNumQueries(1):
+            get_stats()
+
+    def test_stats_after_toggle(self):
+        """Test counters follow resolved state changes on save."""
+        todo = Todo.objects.get(title="Overdue")
+        todo.is_resolved = True
+        todo.save()
+        self.assertStats(total=3, resolved=2, overdue=0)
+
+        todo.save()  # No state change, no counter change.
+        self.assertStats(total=3, resolved=2, overdue=0)
+
+    def test_stats_after_delete(self):
+        """Test counters follow deleted todos."""
+        Todo.objects.get(title="Resolved late").delete()
+        self.assertStats(total=2, resolved=0, overdue=1)
+        Todo.objects.all().delete()
+        self.assertStats(total=0, resolved=0, overdue=0)
+
+    def test_stats_with_deferred_field(self):
+        """Test saving an instance loaded without is_resolved stays correct."""
+        todo = Todo.objects.only('id', 'title').get(title="Pending")
+        todo.is_resolved = True
+        todo.save()
+        self.assertStats(total=3, resolved=2, overdue=1)
+
+    def test_missing_counter_row_is_rebuilt(self):
+        """Test a missing counter row is rebuilt on demand."""
+        TodoCounter.objects.all().delete()
+        self.assertStats(total=3, resolved=1, overdue=1)
+        self.assertTrue(TodoCounter.objects.exists())
+
+    def test_rebuild_counters_repairs_drift(self):
+        """Test rebuild_counters overwrites drifted counts."""
+        TodoCounter.objects.update(total=99, resolved=42)
+        rebuild_counters()
+        self.assertStats(total=3, resolved=1, overdue=1)
@@ -1,11 +1,19 @@
 """
 Unit tests for views.
 """
-from django.test import TestCase, Client
+import re
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 from myapp.models import Todo
+from myapp.stats import compute_stats, get_stats
+from myapp.views import static_asset
 
 
 class TodoListViewTest(TestCase):
@@ -73,6 +81,64 @@ class TodoListViewTest(TestCase):
         self.assertEqual(todos[0].title, "Earlier")
         self.assertEqual(todos[1].title, "Later")
 
+    def test_todo_list_annotates_overdue(self):
+        """Test that overdue status comes from the queryset annotation."""
+        Todo.objects.create(title="Late", due_date=timezone.now() - timedelta(hours=1))
+        response = self.client.get(self.url)
+        todo = list(response.context['todos'])[0]
+        self.assertIn('overdue', todo.__dict__)
+        self.assertTrue(todo.overdue)
+        self.assertEqual(response.context['overdue_count'], 1)
+        self.assertContains(response, "todo-overdue")
+
+
+class TodoListFilterViewTest(TestCase):
+    """Test cases for filters and sorting on the todo_list view."""
+
+    def setUp(self):
+        """Create pending, overdue and resolved todos."""
+        now = timezone.now()
+        Todo.objects.create(title="Pending", due_date=now + timedelta(days=30))
+        Todo.objects.create(title="Late", due_date=now - timedelta(days=1))
+        Todo.objects.create(title="Finished", is_resolved=True)
+
+    def titles(self, response):
+        return [todo.title for todo in response.context['todos']]
+
+    def test_status_filter(self):
+        """Test only resolved todos are rendered."""
+        response = self.client.get(reverse('todo_list'), {'status': 'resolved'})
+        self.assertEqual(self.titles(response), ["Finished"])
+
+    def test_overdue_filter(self):
+        """Test only overdue todos are rendered."""
+        response = self.client.get(reverse('todo_list'), {'overdue': 'on'})
+        self.assertEqual(self.titles(response), ["Late"])
+
+    def test_sort_newest(self):
+        """Test the sort parameter orders by creation date."""
+        response = self.client.get(reverse('todo_list'), {'sort': 'newest'})
+        self.assertEqual(self.titles(response), ["Finished", "Late", "Pending"])
+
+    def test_filters_survive_pagination(self):
+        """Test page links keep the filters and the next page honours them."""
+        for i in range(3):
+            Todo.objects.create(title=f"Done {i}", is_resolved=True)
+        params = {'status': 'resolved', 'sort': 'oldest', 'page_size': 2}
+        response = self.client.get(reverse('todo_list'), params)
+        self.assertEqual(self.titles(response), ["Finished", "Done 0"])
+        self.assertContains(response, 'status=resolved')
+
+        cursor = response.context['page'].next_cursor
+        response = self.client.get(reverse('todo_list'), {**params, 'cursor': cursor})
+        self.assertEqual(self.titles(response), ["Done 1", "Done 2"])
+
+    def test_no_matches(self):
+        """Test the filtered empty state."""
+        Todo.objects.filter(is_resolved=True).delete()
+        response = self.client.get(reverse('todo_list'), {'status': 'resolved'})
+        self.assertContains(response, "No matching TODOs")
+
 
 class TodoCreateViewTest(TestCase):
     """Test cases for todo_create view."""
@@ -155,6 +221,40 @@ class TodoEditViewTest(TestCase):
         self.todo.refresh_from_db()
         self.assertGreater(self.todo.updated_at, original_updated)
 
+    def edit_data(self, **overrides):
+        return {'title': 'Original Title', 'version': self.todo.updated_at.isoformat(), **overrides}
+
+    def test_todo_edit_writes_changed_fields_only(self):
+        """Test the edit UPDATE names only the changed columns."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.url, self.edit_data(title='Updated Title'))
+        sql = next(q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "myapp_todo"'))
+        self.assertIn('"title"', sql)
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"is_resolved"', sql)
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.title, 'Updated Title')
+
+    def test_todo_edit_conflict(self):
+        """Test an edit based on an outdated version gets a 409 and writes nothing."""
+        data = self.edit_data(title='Mine')
+        Todo.objects.filter(pk=self.todo.pk).update(
+            title='Theirs', updated_at=self.todo.updated_at + timedelta(seconds=1)
+        )
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'changed by someone else', status_code=409)
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.title, 'Theirs')
+
+        # The re-shown form carries the current version, so resubmitting wins.
+        version = response.context['form']['version'].value()
+        self.assertEqual(version, self.todo.updated_at.isoformat())
+        response = self.client.post(self.url, self.edit_data(title='Mine', version=version))
+        self.assertRedirects(response, reverse('todo_list'))
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.title, 'Mine')
+
 
 class TodoDeleteViewTest(TestCase):
     """Test cases for todo_delete view."""
@@ -177,6 +277,15 @@ class TodoDeleteViewTest(TestCase):
         self.assertEqual(Todo.objects.count(), 0)
         self.assertRedirects(response, reverse('todo_list'))
 
+    def test_todo_delete_view_json(self):
+        """Test fetch requests get the deleted id and fresh stats."""
+        response = self.client.post(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['deleted'], self.todo.pk)
+        self.assertEqual(data['stats']['total'], 0)
+        self.assertFalse(Todo.objects.exists())
+
     def test_todo_delete_view_404(self):
         """Test delete view returns 404 for non-existent todo."""
         url = reverse('todo_delete', args=[9999])
@@ -213,3 +322,84 @@ class TodoToggleResolvedViewTest(TestCase):
         url = reverse('todo_toggle_resolved', args=[9999])
         response = self.client.post(url)
         self.assertEqual(response.status_code, 404)
+
+    def test_toggle_resolved_get_not_allowed(self):
+        """Test toggling requires POST."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+        self.todo.refresh_from_db()
+        self.assertFalse(self.todo.is_resolved)
+
+    def test_toggle_resolved_json(self):
+        """Test fetch requests get the re-rendered fragments as JSON."""
+        response = self.client.post(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['id'], self.todo.pk)
+        self.assertTrue(data['todo']['is_resolved'])
+        self.assertIn(f'data-todo-id="{self.todo.pk}"', data['html'])
+        self.assertIn('Unresolve', data['html'])
+        self.assertEqual(data['stats'], {'total': 1, 'resolved': 1, 'pending': 0, 'overdue': 0})
+
+    def test_toggle_form_works_without_javascript(self):
+        """Test the list's toggle form posts with the client's own CSRF token."""
+        client = Client(enforce_csrf_checks=True)
+        html = client.get(reverse('todo_list')).content.decode()
+        self.assertIn(f'<form method="post" action="{self.url}"', html)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html).group(1)
+        response = client.post(self.url, {'csrfmiddlewaretoken': token})
+        self.assertRedirects(response, reverse('todo_list'))
+        self.todo.refresh_from_db()
+        self.assertTrue(self.todo.is_resolved)
+
+    def test_toggle_resolved_single_update(self):
+        """Test the toggle is one UPDATE plus the counter update, then the stats read."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.url, HTTP_ACCEPT='application/json')
+        # Savepoints only appear because TestCase wraps each test in a transaction.
+        statements = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 3)
+        self.assertTrue(statements[0].startswith('UPDATE "myapp_todo" SET "is_resolved" = NOT'))
+        self.assertTrue(statements[1].startswith('UPDATE "myapp_todocounter"'))
+        self.assertTrue(statements[2].startswith('SELECT "myapp_todocounter"."total"'))
+
+    def test_toggle_resolved_keeps_counters(self):
+        """Test the materialized counters follow the toggle."""
+        self.client.post(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(get_stats()['resolved'], 1)
+        self.client.post(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(get_stats(), compute_stats())
+
+    def test_toggle_resolved_json_404(self):
+        """Test fetch requests for a missing todo get a 404."""
+        url = reverse('todo_toggle_resolved', args=[9999])
+        response = self.client.post(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 404)
+
+
+class StaticAssetViewTest(TestCase):
+    """Test cases for the static_asset view."""
+
+    def setUp(self):
+        """Create a collected hashed and an unhashed file."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / 'app.0123456789ab.css').write_text('body {}')
+        (self.root / 'app.css').write_text('body {}')
+
+    def get(self, path):
+        with override_settings(STATIC_ROOT=self.root):
+            return static_asset(RequestFactory().get('/static/' + path), path)
+
+    def test_hashed_file_is_immutable(self):
+        """Test hashed names are cached for a year."""
+        response = self.get('app.0123456789ab.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+    def test_unhashed_file_revalidates(self):
+        """Test unhashed names must be revalidated."""
+        response = self.get('app.css')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
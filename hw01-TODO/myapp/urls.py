@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, perf, views
 
 urlpatterns = [
     path('', views.todo_list, name='todo_list'),
@@ -7,4 +7,15 @@ urlpatterns = [
     path('edit/<int:pk>/', views.todo_edit, name='todo_edit'),
     path('delete/<int:pk>/', views.todo_delete, name='todo_delete'),
     path('toggle/<int:pk>/', views.todo_toggle_resolved, name='todo_toggle_resolved'),
+    path('export/', views.todo_export, name='todo_export'),
+    path('events/', views.todo_events, name='todo_events'),
+    path('metrics/', perf.metrics_view, name='todo_metrics'),
+
+    # JSON API
+    path('api/todos/', api.todo_collection, name='api_todo_collection'),
+    path('api/todos/<int:pk>/', api.todo_item, name='api_todo_item'),
+    path('api/todos/bulk/create/', api.todo_bulk_create, name='api_todo_bulk_create'),
+    path('api/todos/bulk/update/', api.todo_bulk_update, name='api_todo_bulk_update'),
+    path('api/todos/bulk/delete/', api.todo_bulk_delete, name='api_todo_bulk_delete'),
+    path('api/archive/', api.archive_collection, name='api_archive_collection'),
 ]
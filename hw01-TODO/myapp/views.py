@@ -1,19 +1,97 @@
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
 from django.utils import timezone
-from .models import Todo
-from .forms import TodoForm
+from django.utils.cache import patch_cache_control
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import require_POST
+from django.views.static import serve
+from . import bulk
+from . import cache as todo_cache
+from . import events
+from . import export
+from . import search
+from . import sharding
+from .models import ConcurrentUpdateError, Todo
+from .forms import TodoFilterForm, TodoForm
+from .conditional import alist_freshness, conditional_page, item_freshness
+from .pagination import apaginate
+from .replicas import replica_reads
+from .stats import aget_stats, get_stats
+
+
+# Rendered into cached rows in place of a CSRF token, and replaced with
+# the requesting client's token for each response.  Autoescaping turns
+# "<" in titles and descriptions into "&lt;", so no todo's text can
+# contain the marker.
+CSRF_SLOT = mark_safe('<csrf-token-slot>')
+
 
+@replica_reads
+@conditional_page(alist_freshness)
+async def todo_list(request):
+    """Display one page of TODO items, filtered and sorted, or search results."""
+    now = timezone.now()
+    query = request.GET.get('q', '').strip()
+    filters = TodoFilterForm(request.GET)
+    # Pages whose rows change as time passes (overdue, "due today") are
+    # cheap indexed reads and are not worth caching.  ``is_enabled`` runs
+    # in the thread that owns the database connection.
+    use_cache = not filters.time_sensitive and await sync_to_async(todo_cache.is_enabled)()
+    cache = todo_cache.get_cache()
+    key = await todo_cache.afragment_key('list', request.GET) if use_cache else None
+    cached = await cache.aget(key) if use_cache else None
+    # The row actions POST with fetch() and read the token from the cookie;
+    # without JavaScript the toggle forms submit the token in the page.
+    csrf_token = get_token(request)
+    if cached is None:
+        todos = filters.filter_queryset(Todo.objects.with_due_status(now), now)
+        cursor = request.GET.get('cursor')
+        page_size = request.GET.get('page_size')
+        if query:
+            page = await search.asearch_page(todos, query, cursor=cursor, page_size=page_size)
+        else:
+            page = await apaginate(todos, cursor=cursor, page_size=page_size, sort=filters.sort_key)
+        params = request.GET.copy()
+        params.pop('cursor', None)
+        items_html = render_to_string('myapp/todo_list_items.html', {
+            'todos': page,
+            'page': page,
+            'page_query': params.urlencode(),
+            'filtered': bool(query) or filters.has_filters,
+            'csrf_slot': CSRF_SLOT if use_cache else csrf_token,
+        }, request)
+        if use_cache:
+            await cache.aset(key, (items_html, page), todo_cache.page_timeout(page, now))
+    else:
+        items_html, page = cached
+
+    if use_cache:
+        # Uncached rows already hold the token; only these pay for a copy.
+        items_html = items_html.replace(CSRF_SLOT, csrf_token)
 
-def todo_list(request):
-    """Display all TODO items sorted by due date."""
-    todos = Todo.objects.all().order_by('due_date', 'created_at')
+    stats = await aget_stats(now=now)
+    # Message storage can fall back to the database-backed session; load
+    # it off the event loop so rendering below never touches the database.
+    await sync_to_async(len)(messages.get_messages(request))
     context = {
-        'todos': todos,
-        'now': timezone.now(),
-        'total_count': todos.count(),
-        'resolved_count': todos.filter(is_resolved=True).count(),
-        'pending_count': todos.filter(is_resolved=False).count(),
+        'todos': page,
+        'page': page,
+        'todo_items_html': mark_safe(items_html),
+        'now': now,
+        'query': query,
+        'filters': filters,
+        'total_count': stats['total'],
+        'resolved_count': stats['resolved'],
+        'pending_count': stats['pending'],
+        'overdue_count': stats['overdue'],
     }
     return render(request, 'myapp/todo_list.html', context)
 
@@ -32,6 +110,7 @@ def todo_create(request):
     return render(request, 'myapp/todo_form.html', {'form': form, 'action': 'Create'})
 
 
+@conditional_page(item_freshness)
 def todo_edit(request, pk):
     """Edit an existing TODO item."""
     todo = get_object_or_404(Todo, pk=pk)
@@ -39,7 +118,10 @@ def todo_edit(request, pk):
     if request.method == 'POST':
         form = TodoForm(request.POST, instance=todo)
         if form.is_valid():
-            todo = form.save()
+            try:
+                todo = form.save()
+            except ConcurrentUpdateError:
+                return _edit_conflict(request, pk)
             messages.success(request, f'TODO "{todo.title}" updated successfully!')
             return redirect('todo_list')
     else:
@@ -52,6 +134,27 @@ def todo_edit(request, pk):
     return render(request, 'myapp/todo_form.html', {'form': form, 'action': 'Edit', 'todo': todo})
 
 
+def _edit_conflict(request, pk):
+    """
+    Re-show the edit form with a 409 after a lost optimistic-concurrency race.
+
+    The user's input is kept but the version moves to the current row, so
+    saving again deliberately overwrites the other edit.
+    """
+    todo = get_object_or_404(Todo, pk=pk)
+    data = request.POST.copy()
+    data['version'] = todo.updated_at.isoformat()
+    form = TodoForm(data, instance=todo)
+    form.add_error(None, TodoForm.CONFLICT_MESSAGE)
+    context = {'form': form, 'action': 'Edit', 'todo': todo}
+    return render(request, 'myapp/todo_form.html', context, status=409)
+
+
+def _wants_json(request):
+    """Whether the client (the list page's fetch calls) asked for JSON."""
+    return 'application/json' in request.headers.get('Accept', '')
+
+
 def todo_delete(request, pk):
     """Delete a TODO item."""
     todo = get_object_or_404(Todo, pk=pk)
@@ -59,18 +162,103 @@ def todo_delete(request, pk):
     if request.method == 'POST':
         title = todo.title
         todo.delete()
+        if _wants_json(request):
+            return JsonResponse({'deleted': pk, 'stats': get_stats()})
         messages.success(request, f'TODO "{title}" deleted successfully!')
         return redirect('todo_list')
     
     return render(request, 'myapp/todo_confirm_delete.html', {'todo': todo})
 
 
+@require_POST
 def todo_toggle_resolved(request, pk):
-    """Toggle the resolved status of a TODO item."""
-    todo = get_object_or_404(Todo, pk=pk)
-    todo.is_resolved = not todo.is_resolved
-    todo.save()
-    
+    """
+    Toggle the resolved status of a TODO item.
+
+    Costs one ``UPDATE ... RETURNING`` plus the counter update.  Fetch
+    requests get the todo, its re-rendered card and row, and the new
+    stats as JSON.
+    """
+    todo = bulk.toggle_resolved(pk)
+    if todo is None:
+        raise Http404('No Todo matches the given query.')
+    if _wants_json(request):
+        todo.overdue = todo.is_overdue()
+        return JsonResponse({**events.render_todo(todo), 'stats': get_stats()})
+
     status = "resolved" if todo.is_resolved else "unresolved"
     messages.success(request, f'TODO "{todo.title}" marked as {status}!')
     return redirect('todo_list')
+
+
+@replica_reads
+async def todo_export(request):
+    """Stream TODO items as CSV or NDJSON, optionally filtered."""
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in export.EXPORT_FORMATS:
+        return HttpResponseBadRequest('format must be "csv" or "ndjson".')
+    try:
+        todos = export.filter_todos(
+            Todo.objects.all(),
+            is_resolved=request.GET.get('is_resolved'),
+            due_after=request.GET.get('due_after'),
+            due_before=request.GET.get('due_before'),
+        )
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    # Under ASGI stream from the async ORM so a slow client holds no
+    # thread; under WSGI the server consumes a plain iterator.
+    if isinstance(request, ASGIRequest):
+        chunks = export.aiter_export(export_format, export.aiter_rows(todos))
+    else:
+        chunks = export.iter_export(export_format, export.iter_rows(todos))
+    response = StreamingHttpResponse(chunks, content_type=export.EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="todos.{export_format}"'
+    return response
+
+
+async def todo_events(request):
+    """
+    Stream live change events for the list page (Server-Sent Events).
+
+    Needs an ASGI server: under WSGI each stream would pin a worker
+    thread, so the endpoint answers 204, which tells ``EventSource`` to
+    stop reconnecting.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(
+        # The owner scope ends when this view returns, before streaming.
+        events.stream(
+            last_event_id=request.headers.get('Last-Event-ID'),
+            owner=sharding.default_owner(),
+        ),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ManifestStaticFilesStorage inserts a 12-character content hash before
+# the extension, e.g. taskflow.3f2a9c1e8b7d.css.
+HASHED_STATIC_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def static_asset(request, path):
+    """
+    Serve a collected static file when no web server sits in front of Django.
+
+    Hashed names never change content, so they are cached for a year;
+    anything else is revalidated on every use.
+    """
+    response = serve(request, path, document_root=settings.STATIC_ROOT)
+    if HASHED_STATIC_NAME.search(path):
+        patch_cache_control(response, public=True, max_age=STATIC_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
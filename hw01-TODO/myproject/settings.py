@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,11 +42,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack.
+    'myapp.perf.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # After authentication: scopes TODO queries to the user's shard.
+    'myapp.sharding.OwnerMiddleware',
+    # Sends reads after a write to the primary instead of a replica.
+    'myapp.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -54,7 +61,8 @@ ROOT_URLCONF = 'myproject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus render timing for myapp.perf.
+        'BACKEND': 'myapp.perf.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,6 +89,71 @@ DATABASES = {
     }
 }
 
+# TODO data is sharded by owner (the logged-in username) across
+# TODO_SHARD_COUNT SQLite files; each has its own write lock, so owners on
+# different shards write concurrently.  "default" is the first shard and
+# also holds users, sessions and the owner -> shard pins.  Migrate every
+# shard (`manage.py migrate --database shard1`, ...) and move owners with
+# `manage.py rebalance_shards`.  See myapp.sharding.
+
+TODO_SHARD_COUNT = int(os.environ.get('TODO_SHARD_COUNT', 1))
+
+for _index in range(1, TODO_SHARD_COUNT):
+    DATABASES[f'shard{_index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_shard{_index}.sqlite3',
+    }
+
+TODO_SHARDS = ['default'] + [f'shard{_index}' for _index in range(1, TODO_SHARD_COUNT)]
+
+# Read replicas: TODO_REPLICA_COUNT copies of every shard
+# (db_replica1.sqlite3, db_shard1_replica1.sqlite3, ...), refreshed by
+# `manage.py sync_replicas`.  The list, its stats, the export and the API
+# list endpoints read from them on GET.  TODO_REPLICATION_LAG is the most
+# seconds a replica may trail: a client that wrote reads from the primary
+# for that long, and replicas not refreshed within it are skipped.  See
+# myapp.replicas.
+
+TODO_REPLICA_COUNT = int(os.environ.get('TODO_REPLICA_COUNT', 0))
+
+TODO_READ_REPLICAS = {}
+
+for _alias in TODO_SHARDS:
+    _primary = Path(DATABASES[_alias]['NAME'])
+    for _index in range(1, TODO_REPLICA_COUNT + 1):
+        DATABASES[f'{_alias}_replica{_index}'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': _primary.with_name(f'{_primary.stem}_replica{_index}.sqlite3'),
+            # Tests read the primary's test database through the replica.
+            'TEST': {'MIRROR': _alias},
+        }
+        TODO_READ_REPLICAS.setdefault(_alias, []).append(f'{_alias}_replica{_index}')
+
+TODO_REPLICATION_LAG = 5
+
+DATABASE_ROUTERS = ['myapp.sharding.ShardRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Rendered list fragments are cached here under a version key that every
+# Todo write bumps.  Swap the backend for a shared one when running more
+# than one process, e.g.
+#   'django.core.cache.backends.filebased.FileBasedCache' (LOCATION: a directory)
+#   'django.core.cache.backends.db.DatabaseCache' (LOCATION: a table name;
+#   run `manage.py createcachetable`)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'taskflow',
+    }
+}
+
+TODO_CACHE_ALIAS = 'default'
+
+TODO_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -122,3 +195,93 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# TODO list pagination
+# Default and maximum number of rows per keyset-paginated page.
+
+TODO_PAGE_SIZE = 50
+
+TODO_MAX_PAGE_SIZE = 200
+
+
+# JSON API
+# Maximum number of items accepted by a single bulk create/update/delete.
+
+TODO_BULK_MAX_BATCH_SIZE = 1000
+
+
+# Live updates (Server-Sent Events, ASGI only)
+# Seconds between keep-alive comments, and before a stream is closed so
+# the browser reconnects (bounding streams left by vanished clients).
+
+TODO_EVENTS_HEARTBEAT = 15
+
+TODO_EVENTS_MAX_AGE = 300
+
+
+# Archive (manage.py archive_todos, myapp.archive)
+# Resolved TODOs untouched for this many days move to the archive table,
+# archived ones are purged after the retention period (None keeps them),
+# and both steps work in transactions of this many rows.
+
+TODO_ARCHIVE_AFTER_DAYS = 30
+
+TODO_ARCHIVE_RETENTION_DAYS = 365
+
+TODO_ARCHIVE_BATCH_SIZE = 500
+
+
+# Due-date scheduler (manage.py run_scheduler, myapp.scheduler)
+# Seconds before a due date the reminder fires, seconds of upcoming
+# deadlines loaded into memory at a time, and the longest the worker
+# sleeps before checking for changed todos.
+
+TODO_REMINDER_LEAD = 900
+
+TODO_SCHEDULER_HORIZON = 86400
+
+TODO_SCHEDULER_SYNC_INTERVAL = 5
+
+
+# Request performance instrumentation (myapp.perf)
+# Durations kept per URL name for the /metrics/ percentiles, and how many
+# runs of one statement in a request are reported as a likely N+1 loop.
+# One JSON line per request goes to the "myapp.perf" logger, printed to
+# the console when DEBUG is on.  TODO_PERF_EXPOSE sends the timings to
+# clients too (Server-Timing header, /metrics/ for local addresses).
+
+TODO_PERF_SAMPLE_SIZE = 1000
+
+TODO_PERF_REPEAT_THRESHOLD = 3
+
+TODO_PERF_EXPOSE = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'require_debug_true': {'()': 'django.utils.log.RequireDebugTrue'},
+    },
+    'handlers': {
+        'perf_console': {
+            'class': 'logging.StreamHandler',
+            'filters': ['require_debug_true'],
+        },
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'myapp.perf': {
+            'handlers': ['perf_console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'myapp.scheduler': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
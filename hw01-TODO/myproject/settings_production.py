@@ -0,0 +1,107 @@
+"""
+Production settings for myproject.
+
+Extends ``myproject.settings``; select it with
+``DJANGO_SETTINGS_MODULE=myproject.settings_production``.
+"""
+
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, LOGGING, TEMPLATES
+from .sqlite_pragmas import SQLITE_PRAGMAS  # noqa: F401
+
+# SECURITY WARNING: keep the secret key used in production secret!
+# Sessions below are cookies signed with it, so the key committed in
+# settings.py would let anyone forge a session for any user.
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY to use the production settings.")
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+
+# Templates
+# Compile each template once per process instead of re-reading and
+# re-parsing it on every render.
+
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+# Static files
+# ``collectstatic`` writes content-hashed copies (taskflow.3f2a9c1e8b7d.css)
+# and ``{% static %}`` links to them, so they can be cached for a year:
+# a changed file gets a new name.
+
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+    },
+}
+
+# Serve STATIC_ROOT from Django itself (with far-future caching of the
+# hashed files) when no web server sits in front of the app.
+TODO_SERVE_STATIC = os.environ.get('TODO_SERVE_STATIC', '') == '1'
+
+
+# Database
+# Keep connections open between requests (with a liveness check before
+# reuse) instead of reconnecting on every request.  Applies to every shard.
+
+DATABASES = copy.deepcopy(DATABASES)
+for _database in DATABASES.values():
+    _database.update({
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# SQLITE_PRAGMAS (WAL, busy_timeout, ...; see myproject.sqlite_pragmas) is
+# applied to every new SQLite connection by myapp.sqlite.
+
+
+# Sessions and messages
+# Keep both out of the database: a signed cookie holds the session (so a
+# logged-in request no longer reads a django_session row) and flash
+# messages always travel in their own cookie instead of falling back to
+# the session.  Signed-cookie sessions cannot be revoked server-side
+# before they expire; set DJANGO_SESSION_ENGINE to
+# django.contrib.sessions.backends.cache instead when CACHES points at a
+# cache shared by every worker.  benchmarks/bench_sessions.py compares
+# the profiles.
+
+SESSION_ENGINE = os.environ.get(
+    'DJANGO_SESSION_ENGINE', 'django.contrib.sessions.backends.signed_cookies',
+)
+
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
+# Request timings
+# Server-Timing headers and /metrics/ stay off unless asked for: behind a
+# reverse proxy on this host every client looks like a loopback address.
+
+TODO_PERF_EXPOSE = os.environ.get('TODO_PERF_EXPOSE', '') == '1'
+
+
+# Logging
+# Keep the per-request performance lines (myapp.perf) with DEBUG off.
+
+LOGGING = copy.deepcopy(LOGGING)
+LOGGING['handlers']['perf_console']['filters'] = []
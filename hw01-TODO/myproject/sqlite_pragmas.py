@@ -0,0 +1,20 @@
+"""
+SQLite tuning used by ``myproject.settings_production``.
+
+Kept apart from the settings module so benchmarks can import the pragmas
+without the rest of the production profile.
+"""
+
+# Applied to every new SQLite connection by myapp.sqlite.
+# WAL lets readers and a writer proceed concurrently; synchronous=NORMAL is
+# durable across application crashes in WAL mode; busy_timeout makes
+# writers wait for the lock instead of failing with "database is locked".
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,          # milliseconds
+    'cache_size': -64000,           # negative = KiB, i.e. 64 MB per connection
+    'mmap_size': 268435456,         # 256 MB
+    'temp_store': 'MEMORY',
+}
@@ -14,10 +14,23 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from myapp.admin import shard_sites
+from myapp.views import static_asset
 
 urlpatterns = [
+    # TODO admin for the shards after the first (see myapp.sharding).
+    *[path(f'admin/{alias}/', site.urls) for alias, site in shard_sites.items()],
     path('admin/', admin.site.urls),
     path('', include('myapp.urls')),
 ]
+
+if getattr(settings, 'TODO_SERVE_STATIC', False):
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), static_asset),
+    ]